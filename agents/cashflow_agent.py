@@ -1,5 +1,7 @@
 import numpy as np
 
+from agents.records import IncomeForecast
+
 class CashflowForecastingAgent:
     def __init__(self, lookback_period=3):
         self.lookback_period = lookback_period
@@ -12,14 +14,14 @@ class CashflowForecastingAgent:
             income_history (list or np.array): List of past income values.
             
         Returns:
-            dict: {
+            IncomeForecast: read-only record, also usable as a dict {
                 'safe_income': float, # Conservative estimate (e.g., avg - std_dev)
                 'potential_income': float, # Optimistic estimate (e.g., avg + std_dev)
                 'volatility': float # Coefficient of variation
             }
         """
         if len(income_history) < 1:
-            return {'safe_income': 0, 'potential_income': 0, 'volatility': 0}
+            return IncomeForecast(0, 0, 0)
             
         # Use only recent history for relevance
         recent_data = income_history[-self.lookback_period:]
@@ -35,8 +37,185 @@ class CashflowForecastingAgent:
         
         volatility = (std_dev / avg_income) if avg_income > 0 else 0
         
-        return {
-            'safe_income': round(safe_income, 2),
-            'potential_income': round(potential_income, 2),
-            'volatility': round(volatility, 3)
-        }
+        return IncomeForecast(
+            round(safe_income, 2),
+            round(potential_income, 2),
+            round(volatility, 3)
+        )
+
+    def forecast_batch(self, income_matrix, mask=None):
+        """
+        Portfolio-wide version of forecast_income: one pass over a borrowers x months matrix.
+        
+        Args:
+            income_matrix (np.array): 2-D array, one row per borrower, one column per month.
+                Months without an income record are NaN (ragged histories).
+            mask (np.array): Optional boolean array of the same shape marking valid months.
+                Defaults to the non-NaN entries of income_matrix.
+            
+        Returns:
+            dict: Same keys as forecast_income, each a float array with one entry per borrower.
+        """
+        incomes = np.asarray(income_matrix, dtype=np.float64)
+        if incomes.ndim != 2:
+            raise ValueError("income_matrix must be 2-D (borrowers x months)")
+        if mask is None:
+            mask = ~np.isnan(incomes)
+        else:
+            mask = np.asarray(mask, dtype=bool)
+
+        window, counts = self._lookback_window(incomes, mask)
+
+        avg_income = np.zeros(len(incomes))
+        std_dev = np.zeros(len(incomes))
+        # Reduce each history length separately so the per-row summation order
+        # matches np.mean / np.std on the scalar path bit for bit.
+        for count in np.unique(counts):
+            if count == 0:
+                continue
+            rows = np.flatnonzero(counts == count)
+            recent_data = window[rows, :count]
+            avg_income[rows] = np.mean(recent_data, axis=1)
+            if count > 1:
+                std_dev[rows] = np.std(recent_data, axis=1)
+
+        return _finalize_forecast(avg_income, std_dev)
+
+    def create_rolling_state(self, n_borrowers):
+        """
+        Builds a streaming forecaster that keeps the lookback window per borrower.
+        """
+        return RollingForecastState(n_borrowers, lookback_period=self.lookback_period)
+
+    def batch_row(self, forecast, index):
+        """
+        Extracts one borrower from a forecast_batch result as a forecast_income-style record.
+        """
+        return IncomeForecast(
+            forecast['safe_income'][index],
+            forecast['potential_income'][index],
+            forecast['volatility'][index]
+        )
+
+    def _lookback_window(self, incomes, mask):
+        """
+        Left-aligns the last `lookback_period` valid months of every row.
+        
+        Returns:
+            tuple: (window, counts) where window[i, :counts[i]] holds the recent data of row i.
+        """
+        n_borrowers, n_months = incomes.shape
+        lookback = max(1, min(self.lookback_period, n_months)) if n_months else 0
+
+        if mask.all():
+            # Dense fast path: every history covers the full matrix width
+            window = np.ascontiguousarray(incomes[:, n_months - lookback:])
+            return window, np.full(n_borrowers, lookback)
+
+        # A valid month belongs to the window if it is among the last `lookback` valid ones
+        seen = np.cumsum(mask, axis=1)
+        totals = seen[:, -1] if n_months else np.zeros(n_borrowers, dtype=np.int64)
+        start = np.maximum(totals - lookback, 0)
+        in_window = mask & (seen > start[:, None])
+        rows, cols = np.nonzero(in_window)
+
+        window = np.zeros((n_borrowers, lookback))
+        window[rows, seen[rows, cols] - start[rows] - 1] = incomes[rows, cols]
+        return window, totals - start
+
+
+class RollingForecastState:
+    """
+    Streaming forecast state for many borrowers.
+    
+    Each borrower keeps a fixed-size ring buffer of its last `lookback_period` incomes
+    plus running sums, so posting one new month is O(1) in time and memory instead of
+    recomputing mean/std over the whole history.
+    """
+    def __init__(self, n_borrowers, lookback_period=3):
+        self.lookback_period = max(1, lookback_period)
+        self.buffer = np.zeros((n_borrowers, self.lookback_period))
+        self.head = np.zeros(n_borrowers, dtype=np.int64)
+        self.counts = np.zeros(n_borrowers, dtype=np.int64)
+        # Sums are kept relative to a per-borrower shift to avoid cancellation in the variance
+        self.shift = np.zeros(n_borrowers)
+        self.sums = np.zeros(n_borrowers)
+        self.sq_sums = np.zeros(n_borrowers)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def update(self, incomes, borrowers=None):
+        """
+        Posts one month of income.
+        
+        Args:
+            incomes (np.array): New income per borrower (aligned with `borrowers`).
+            borrowers (np.array): Optional indices of the borrowers receiving an income event.
+                Defaults to all borrowers. Indices must be unique.
+        """
+        idx = np.arange(len(self)) if borrowers is None else np.asarray(borrowers, dtype=np.int64)
+        incomes = np.broadcast_to(np.asarray(incomes, dtype=np.float64), idx.shape)
+
+        # First observation of a borrower anchors its shift
+        fresh = self.counts[idx] == 0
+        self.shift[idx[fresh]] = incomes[fresh]
+
+        pos = self.head[idx]
+        shift = self.shift[idx]
+        full = self.counts[idx] == self.lookback_period
+        evicted = np.where(full, self.buffer[idx, pos] - shift, 0.0)
+        added = incomes - shift
+
+        self.sums[idx] += added - evicted
+        self.sq_sums[idx] += added * added - evicted * evicted
+        self.buffer[idx, pos] = incomes
+        self.head[idx] = (pos + 1) % self.lookback_period
+        self.counts[idx] = np.minimum(self.counts[idx] + 1, self.lookback_period)
+
+        # Re-anchor whenever a buffer wraps around: amortized O(1) and stops drift
+        # from the add/subtract updates accumulating over long streams.
+        wrapped = idx[self.head[idx] == 0]
+        if len(wrapped):
+            window = self.buffer[wrapped]
+            self.shift[wrapped] = window.mean(axis=1)
+            centered = window - self.shift[wrapped][:, None]
+            self.sums[wrapped] = centered.sum(axis=1)
+            self.sq_sums[wrapped] = (centered * centered).sum(axis=1)
+
+    def forecast(self, borrowers=None):
+        """
+        Current forecast for all (or the selected) borrowers.
+        
+        Returns:
+            dict: Same columnar layout as CashflowForecastingAgent.forecast_batch.
+        """
+        idx = slice(None) if borrowers is None else np.asarray(borrowers, dtype=np.int64)
+        counts = self.counts[idx]
+        sums = self.sums[idx]
+        n = np.maximum(counts, 1)
+
+        avg_income = np.where(counts > 0, self.shift[idx] + sums / n, 0.0)
+        variance = np.maximum(self.sq_sums[idx] / n - (sums / n) ** 2, 0.0)
+        std_dev = np.where(counts > 1, np.sqrt(variance), 0.0)
+        return _finalize_forecast(avg_income, std_dev)
+
+
+def _finalize_forecast(avg_income, std_dev):
+    """
+    Shared tail of the forecast formulas for array inputs (mean and std per borrower).
+    """
+    # Conservative forecast: Lower bound of 1 std dev, but not negative
+    safe_income = np.maximum(0, avg_income - std_dev)
+
+    # Potential forecast: Average
+    potential_income = avg_income + (std_dev * 0.5)
+
+    positive = avg_income > 0
+    volatility = np.divide(std_dev, avg_income, out=np.zeros_like(avg_income), where=positive)
+
+    return {
+        'safe_income': np.round(safe_income, 2),
+        'potential_income': np.round(potential_income, 2),
+        'volatility': np.round(volatility, 3)
+    }
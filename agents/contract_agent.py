@@ -1,3 +1,31 @@
+import numpy as np
+
+from agents.records import ContractUpdate
+from agents.structuring_agent import ACTIONS
+
+# Event codes double as template ids: one message template per event type
+EVENT_STABLE, EVENT_RELIEF, EVENT_STRESS = 0, 1, 2
+EVENT_TYPES = ('Stable', 'Relief', 'Stress')
+
+# (message, contract_id) templates, rendered only when a ledger entry is shown or exported.
+# Relief and stress templates take the EMI and the tenure (%-style: cheaper than str.format per call)
+TEMPLATES = (
+    ("Income verified stable. Standard repayment schedule maintained.", 'CTR-STD-KEEP'),
+    ("Preventive Restructuring Triggered: EMI reduced to ₹%s to mitigate default risk.", 'CTR-RELIEF-%s'),
+    ("Repayment Calibration: EMI adjusted to ₹%s based on cashflow analysis.", 'CTR-ADJ-%s')
+)
+
+def _event_for_action(action):
+    if action == 'Maintain Standard':
+        return EVENT_STABLE
+    elif 'Relief' in action or 'Interest Only' in action:
+        return EVENT_RELIEF
+    else:
+        return EVENT_STRESS
+
+# Template id per structuring action code, resolved once instead of scanning strings per decision
+ACTION_TEMPLATES = np.array([_event_for_action(action) for action in ACTIONS], dtype=np.int8)
+
 class ContractEvolutionAgent:
     def __init__(self):
         pass
@@ -12,32 +40,45 @@ class ContractEvolutionAgent:
             borrower_name (str): Name of borrower.
             
         Returns:
-            dict: {
+            ContractUpdate: read-only record, also usable as a dict {
                 'message': str, # User friendly message
                 'contract_id': str # Simulated ID
             }
         """
-        action = new_terms.get('action_taken')
-        new_emi = new_terms['new_emi']
-        new_tenure = new_terms['new_tenure']
-        
-        if action == 'Maintain Standard':
-            return {
-                'message': "Income verified stable. Standard repayment schedule maintained.",
-                'contract_id': 'CTR-STD-KEEP',
-                'event_type': 'Stable'
-            }
+        template_id = _event_for_action(new_terms.get('action_taken'))
+        return self.render(template_id, new_terms['new_emi'], new_terms['new_tenure'])
+
+    def generate_batch(self, action_codes, new_emi, new_tenure):
+        """
+        Portfolio version of generate_contract_update: maps structuring action codes to
+        template ids with one table lookup and keeps (EMI, tenure) as the only parameters.
         
-        elif 'Relief' in action or 'Interest Only' in action:
-             return {
-                'message': f"Preventive Restructuring Triggered: EMI reduced to ₹{new_emi} to mitigate default risk.",
-                'contract_id': f"CTR-RELIEF-{new_tenure}",
-                'event_type': 'Relief'
-            }
-            
-        else:
-            return {
-                'message': f"Repayment Calibration: EMI adjusted to ₹{new_emi} based on cashflow analysis.",
-                'contract_id': f"CTR-ADJ-{new_tenure}",
-                'event_type': 'Stress'
+        Returns:
+            dict: {
+                'template_id': np.int8 array, # also the event code, index into EVENT_TYPES
+                'new_emi': float array,
+                'new_tenure': int array
             }
+        """
+        return {
+            'template_id': ACTION_TEMPLATES[np.asarray(action_codes)],
+            'new_emi': new_emi,
+            'new_tenure': new_tenure
+        }
+
+    def render(self, template_id, new_emi, new_tenure):
+        """
+        Renders one contract update from its template id and parameters.
+        """
+        message, contract_id = TEMPLATES[template_id]
+        if template_id != EVENT_STABLE:
+            message, contract_id = message % (new_emi,), contract_id % (new_tenure,)
+        return ContractUpdate(message, contract_id, EVENT_TYPES[template_id])
+
+    def batch_row(self, contracts, index):
+        """
+        Renders one borrower of a generate_batch result.
+        """
+        return self.render(
+            contracts['template_id'][index], contracts['new_emi'][index], contracts['new_tenure'][index]
+        )
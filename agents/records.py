@@ -0,0 +1,94 @@
+from collections.abc import Mapping
+
+class ResultRecord(Mapping):
+    """
+    Base of the immutable, slotted agent results, with a read-only dict view.
+
+    Fields are plain attributes (forecast.safe_income) backed by __slots__, so a record
+    carries no per-instance __dict__. The Mapping view (forecast['safe_income'], .get,
+    .items, == dict) keeps code written against the old result dicts working. Fields
+    left as None are absent from the view, like keys missing from a dict.
+    """
+    __slots__ = ()
+    # Dict keys of the view, one per slot (default: the slot names)
+    KEYS = None
+    # Trailing fields that default to None in the constructor
+    OPTIONAL = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._KEY_FIELDS = dict(zip(cls.KEYS or cls.__slots__, cls.__slots__))
+        # Slot descriptors' setters, bound once: records block normal assignment, and calling
+        # these directly skips object.__setattr__'s lookup of the slot by name per field
+        cls._SETTERS = tuple(getattr(cls, field).__set__ for field in cls.__slots__)
+        cls._REQUIRED = len(cls.__slots__) - len(cls.OPTIONAL)
+
+    def __init__(self, *values):
+        # Positional, one value per slot; missing OPTIONAL fields are padded with None
+        setters = self._SETTERS
+        if len(values) != len(setters):
+            if not self._REQUIRED <= len(values) <= len(setters):
+                expected = f"{self._REQUIRED} to {len(setters)}" if self.OPTIONAL else len(setters)
+                raise TypeError(f"{type(self).__name__} takes {expected} fields, got {len(values)}")
+            values += (None,) * (len(setters) - len(values))
+        for set_field, value in zip(setters, values):
+            set_field(self, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return (type(self), tuple(getattr(self, field) for field in self.__slots__))
+
+    def __getitem__(self, key):
+        value = getattr(self, self._KEY_FIELDS[key])
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        # Mapping.get goes through __getitem__ and a KeyError; records answer directly
+        field = self._KEY_FIELDS.get(key)
+        value = None if field is None else getattr(self, field)
+        return default if value is None else value
+
+    def __iter__(self):
+        for key, field in self._KEY_FIELDS.items():
+            if getattr(self, field) is not None:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __hash__(self):
+        return hash(tuple(self.items()))
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+    def to_dict(self):
+        """
+        Plain dict copy (nested records included), e.g. for JSON encoding.
+        """
+        return {key: value.to_dict() if isinstance(value, ResultRecord) else value for key, value in self.items()}
+
+class IncomeForecast(ResultRecord):
+    __slots__ = ('safe_income', 'potential_income', 'volatility')
+
+class RiskBreakdown(ResultRecord):
+    __slots__ = ('affordability_stress', 'income_volatility', 'missed_payments')
+    KEYS = ('Affordability Stress', 'Income Volatility', 'Missed Payments')
+
+class RiskAssessment(ResultRecord):
+    __slots__ = ('risk_score', 'status', 'zone', 'zone_color', 'breakdown')
+    # Zone fields stay unset when the forecast has no safe income (score and status only)
+    OPTIONAL = ('zone', 'zone_color', 'breakdown')
+
+class LoanStructure(ResultRecord):
+    __slots__ = ('new_emi', 'new_tenure', 'action_taken', 'rationale')
+
+class ContractUpdate(ResultRecord):
+    __slots__ = ('message', 'contract_id', 'event_type')
@@ -1,3 +1,12 @@
+import numpy as np
+
+from agents.records import RiskAssessment, RiskBreakdown
+
+# Zone codes used by the batch scorer: index into ZONES / ZONE_COLORS
+ZONE_SAFE, ZONE_WATCH, ZONE_CRITICAL = 0, 1, 2
+ZONES = ('Safe', 'Watch', 'Critical')
+ZONE_COLORS = ('green', 'orange', 'red')
+
 class RiskIntelligenceAgent:
     def __init__(self):
         pass
@@ -12,7 +21,7 @@ class RiskIntelligenceAgent:
             missed_payments (int): Number of recent missed payments.
             
         Returns:
-            dict: {
+            RiskAssessment: read-only record, also usable as a dict {
                 'risk_score': int, # 0-100 (Higher is riskier)
                 'status': str # 'Healthy', 'At Risk', 'Critical'
             }
@@ -21,7 +30,7 @@ class RiskIntelligenceAgent:
         volatility = income_forecast['volatility']
         
         if safe_income == 0:
-            return {'risk_score': 100, 'status': 'Critical'}
+            return RiskAssessment(100, 'Critical')
             
         # Calculate Repayment Stress (DTI based on safe income)
         stress_ratio = current_emi / safe_income
@@ -52,14 +61,81 @@ class RiskIntelligenceAgent:
             
         status = zone
             
-        return {
-            'risk_score': int(final_score),
-            'status': status,
-            'zone': zone,
-            'zone_color': zone_color,
-            'breakdown': {
-                'Affordability Stress': int(base_score),
-                'Income Volatility': int(volatility_penalty),
-                'Missed Payments': int(missed_penalty)
+        return RiskAssessment(
+            int(final_score),
+            status,
+            zone,
+            zone_color,
+            RiskBreakdown(
+                int(base_score),
+                int(volatility_penalty),
+                int(missed_penalty)
+            )
+        )
+
+    def assess_batch(self, income_forecast, current_emi, missed_payments=0):
+        """
+        Vectorized assess_risk over a portfolio, returning columns instead of nested dicts.
+        
+        Args:
+            income_forecast (dict): Columnar output of CashflowForecastingAgent.forecast_batch.
+            current_emi (np.array): Current monthly installment per borrower.
+            missed_payments (np.array or int): Recent missed payments per borrower.
+            
+        Returns:
+            dict: {
+                'risk_score': np.int8 array, # 0-100 (Higher is riskier)
+                'zone_code': np.int8 array, # ZONE_SAFE / ZONE_WATCH / ZONE_CRITICAL
+                'affordability_stress': np.int32 array,
+                'income_volatility': np.int32 array,
+                'missed_penalty': np.int32 array
             }
+        """
+        safe_income = np.asarray(income_forecast['safe_income'], dtype=np.float64)
+        volatility = np.asarray(income_forecast['volatility'], dtype=np.float64)
+        current_emi = np.broadcast_to(np.asarray(current_emi, dtype=np.float64), safe_income.shape)
+        missed_payments = np.broadcast_to(np.asarray(missed_payments), safe_income.shape)
+
+        no_income = safe_income == 0
+
+        # Same scoring formula as assess_risk, evaluated on whole columns
+        stress_ratio = np.divide(current_emi, safe_income, out=np.zeros_like(safe_income), where=~no_income)
+        base_score = np.minimum(100, stress_ratio * 100)
+        volatility_penalty = np.minimum(20, volatility * 50)
+        missed_penalty = missed_payments * 15
+
+        final_score = np.clip(base_score + volatility_penalty + missed_penalty, 0, 100)
+
+        # Zero safe income is always a full-score critical case with no breakdown
+        final_score[no_income] = 100
+        for component in (base_score, volatility_penalty):
+            component[no_income] = 0
+        missed_penalty = np.where(no_income, 0, missed_penalty)
+
+        zone_code = (final_score > 40).astype(np.int8) + (final_score > 70)
+
+        return {
+            'risk_score': final_score.astype(np.int8),
+            'zone_code': zone_code,
+            'affordability_stress': base_score.astype(np.int32),
+            'income_volatility': volatility_penalty.astype(np.int32),
+            'missed_penalty': missed_penalty.astype(np.int32)
         }
+
+    def batch_row(self, risk, index):
+        """
+        Expands one borrower of an assess_batch result into an assess_risk-style record.
+        Zero-income rows also carry the zone fields (Critical, zeroed breakdown).
+        """
+        zone = ZONES[risk['zone_code'][index]]
+        return RiskAssessment(
+            int(risk['risk_score'][index]),
+            zone,
+            zone,
+            ZONE_COLORS[risk['zone_code'][index]],
+            RiskBreakdown(
+                int(risk['affordability_stress'][index]),
+                int(risk['income_volatility'][index]),
+                int(risk['missed_penalty'][index])
+            )
+        )
@@ -1,7 +1,38 @@
+import numpy as np
+
+from agents.records import LoanStructure
+from utils.annuity import ANNUITY_CACHE
+
+# Action codes returned by structure_batch: index into ACTIONS
+(ACTION_MAINTAIN, ACTION_ADJUST_TENURE, ACTION_EXTEND_TENURE,
+ ACTION_INTEREST_ONLY, ACTION_SAFEGUARD, ACTION_PAID_OFF) = range(6)
+
+ACTIONS = (
+    'Maintain Standard',
+    'Adjust Tenure (Minor)',
+    'Extend Tenure (Relief)',
+    'Interest Only / Relief Mode',
+    'Safeguard: Interest Only',
+    'Loan Paid Off'
+)
+
+# Reverse lookup from an action_taken label to its code
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+RATIONALES = (
+    'Income is sufficient to support standard repayment schedule.',
+    'Income dip detected. EMI re-calibrated to {dti_pct}% of safe income to maintain affordability.',
+    'High stress detected. Extending tenure to lower monthly burden.',
+    'Critical income drop. Freezing principal repayment to prevent default. Interest-only mode activated.',
+    'Tenure extension cap ({max_allowed_tenure}m) reached. Switching to Interest-Only to prevent eternal debt.',
+    'Debt cleared.'
+)
+
 class LoanStructuringAgent:
-    def __init__(self, target_dti=0.40, interest_rate_annual=0.12):
+    def __init__(self, target_dti=0.40, interest_rate_annual=0.12, tenure_cap_multiple=2):
         self.target_dti = target_dti # Target Debt-to-Income ratio
         self.interest_rate_monthly = interest_rate_annual / 12
+        self.tenure_cap_multiple = tenure_cap_multiple # Max tenure as a multiple of the original
 
     def structure_loan(self, income_forecast, remaining_principal, current_tenure, original_tenure):
         """
@@ -11,12 +42,15 @@ class LoanStructuringAgent:
             remaining_principal (float): Outstanding loan.
             current_tenure (int): Current months remaining.
             original_tenure (int): Baseline tenure for cap calculation.
+        Returns:
+            LoanStructure: read-only record (also usable as a dict) with
+                'new_emi', 'new_tenure', 'action_taken' and 'rationale'.
         """
         safe_income = income_forecast['safe_income']
-        max_allowed_tenure = original_tenure * 2 # Cap at 2x original
+        max_allowed_tenure = original_tenure * self.tenure_cap_multiple # Cap at 2x original by default
         
         if remaining_principal <= 0:
-            return {'new_emi': 0, 'new_tenure': 0, 'action_taken': 'Loan Paid Off', 'rationale': 'Debt cleared.'}
+            return LoanStructure(0, 0, ACTIONS[ACTION_PAID_OFF], self.rationale(ACTION_PAID_OFF, original_tenure))
 
         # Calculate minimal interest coverage
         interest_due = remaining_principal * self.interest_rate_monthly
@@ -39,20 +73,20 @@ class LoanStructuringAgent:
             standard_emi = self._calculate_pmt(remaining_principal, self.interest_rate_monthly, current_tenure)
             
             if standard_emi <= adaptive_emi:
-                return {
-                    'new_emi': round(standard_emi, 2),
-                    'new_tenure': current_tenure,
-                    'action_taken': 'Maintain Standard',
-                    'rationale': 'Income is sufficient to support standard repayment schedule.'
-                }
+                return LoanStructure(
+                    round(standard_emi, 2),
+                    current_tenure,
+                    ACTIONS[ACTION_MAINTAIN],
+                    self.rationale(ACTION_MAINTAIN, original_tenure)
+                )
             else:
                 # Need to extend slightly or pay what we can
-                return {
-                    'new_emi': round(adaptive_emi, 2),
-                    'new_tenure': self._calculate_tenure(remaining_principal, self.interest_rate_monthly, adaptive_emi),
-                    'action_taken': 'Adjust Tenure (Minor)',
-                    'rationale': f'Income dip detected. EMI re-calibrated to {int(self.target_dti*100)}% of safe income to maintain affordability.'
-                }
+                return LoanStructure(
+                    round(adaptive_emi, 2),
+                    self._calculate_tenure(remaining_principal, self.interest_rate_monthly, adaptive_emi),
+                    ACTIONS[ACTION_ADJUST_TENURE],
+                    self.rationale(ACTION_ADJUST_TENURE, original_tenure)
+                )
 
         # Scenario: Income is weak (Adaptive Mode)
         else:
@@ -65,8 +99,8 @@ class LoanStructuringAgent:
                  # For safety, lets say we pay interest only at minimum
                  payable_emi = interest_due
                  new_tenure = current_tenure + 1 # Extends indefinitely basically
-                 action = 'Interest Only / Relief Mode'
-                 rationale = 'Critical income drop. Freezing principal repayment to prevent default. Interest-only mode activated.'
+                 action = ACTIONS[ACTION_INTEREST_ONLY]
+                 rationale = self.rationale(ACTION_INTEREST_ONLY, original_tenure)
              else:
                  calculated_metric = self._calculate_tenure(remaining_principal, self.interest_rate_monthly, payable_emi)
                  
@@ -75,32 +109,142 @@ class LoanStructuringAgent:
                      # Cap Reached -> Interest Only Mode
                      payable_emi = interest_due
                      new_tenure = current_tenure # Pause tenure countdown ideally, or just drift
-                     action = 'Safeguard: Interest Only'
-                     rationale = f'Tenure extension cap ({max_allowed_tenure}m) reached. Switching to Interest-Only to prevent eternal debt.'
+                     action = ACTIONS[ACTION_SAFEGUARD]
+                     rationale = self.rationale(ACTION_SAFEGUARD, original_tenure)
                  else:
                      new_tenure = calculated_metric
-                     action = 'Extend Tenure (Relief)'
-                     rationale = 'High stress detected. Extending tenure to lower monthly burden.'
+                     action = ACTIONS[ACTION_EXTEND_TENURE]
+                     rationale = self.rationale(ACTION_EXTEND_TENURE, original_tenure)
                  
-             return {
-                 'new_emi': round(payable_emi, 2),
-                 'new_tenure': int(new_tenure),
-                 'action_taken': action,
-                 'rationale': rationale
-             }
+             return LoanStructure(
+                 round(payable_emi, 2),
+                 int(new_tenure),
+                 action,
+                 rationale
+             )
+
+    def structure_batch(self, income_forecast, remaining_principal, current_tenure, original_tenure,
+                        target_dti=None, interest_rate_monthly=None, tenure_cap_multiple=None):
+        """
+        Vectorized structure_loan: every decision branch is evaluated as a mask over the portfolio.
+        Args:
+            income_forecast (dict): Columnar output of CashflowForecastingAgent.forecast_batch.
+            remaining_principal (np.array): Outstanding loan per borrower.
+            current_tenure (np.array): Current months remaining per borrower.
+            original_tenure (np.array or int): Baseline tenure for cap calculation.
+            target_dti, interest_rate_monthly, tenure_cap_multiple: Optional policy overrides
+                (default: the agent's own settings). Arrays broadcast against the borrower
+                columns, e.g. shape (settings, 1) evaluates a policy grid in one pass.
+        Returns:
+            dict: {
+                'action_code': np.int8 array, # index into ACTIONS
+                'new_emi': float array,
+                'new_tenure': int array,
+                'tenure_fallback': bool array # a closed-form tenure of the decision fell back to 999
+            }
+        Rationale text is not built here; use rationale() / batch_row() for the rows being shown.
+        """
+        safe_income = np.asarray(income_forecast['safe_income'], dtype=np.float64)
+        target_dti = self.target_dti if target_dti is None else target_dti
+        r = self.interest_rate_monthly if interest_rate_monthly is None else interest_rate_monthly
+        cap_multiple = self.tenure_cap_multiple if tenure_cap_multiple is None else tenure_cap_multiple
+
+        # Policy arrays may add leading axes, so the output takes the broadcast shape
+        shape = np.broadcast_shapes(safe_income.shape, np.shape(target_dti), np.shape(r), np.shape(cap_multiple))
+        safe_income = np.broadcast_to(safe_income, shape)
+        principal = np.broadcast_to(np.asarray(remaining_principal, dtype=np.float64), shape)
+        tenure = np.broadcast_to(np.asarray(current_tenure, dtype=np.float64), shape)
+        max_allowed_tenure = np.broadcast_to(
+            np.asarray(original_tenure, dtype=np.float64) * np.asarray(cap_multiple, dtype=np.float64), shape
+        )
+
+        paid_off = principal <= 0
+        interest_due = principal * r
+        adaptive_emi = safe_income * target_dti
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            # Scenario: Income is strong
+            strong = adaptive_emi >= interest_due + (principal / tenure)
+            standard_emi = self._pmt_array(principal, r, tenure)
+            maintain = strong & (standard_emi <= adaptive_emi)
+            adjust = strong & ~maintain
+
+            # Scenario: Income is weak (Adaptive Mode)
+            payable_emi = np.maximum(adaptive_emi, 100) # Minimum token amount
+            interest_only = ~strong & (payable_emi <= interest_due)
+            relief_tenure, relief_fallback = self._tenure_array(principal, r, payable_emi)
+            adjust_tenure, adjust_fallback = self._tenure_array(principal, r, adaptive_emi)
+            safeguard = ~strong & ~interest_only & (relief_tenure > max_allowed_tenure)
+
+            new_emi = np.select(
+                [paid_off, maintain, adjust, interest_only | safeguard],
+                [0.0, standard_emi, adaptive_emi, interest_due],
+                default=payable_emi
+            )
+            new_tenure = np.select(
+                [paid_off, maintain | safeguard, adjust, interest_only],
+                [0, tenure, adjust_tenure, tenure + 1],
+                default=relief_tenure
+            )
+
+        action_code = np.select(
+            [paid_off, maintain, adjust, interest_only, safeguard],
+            [ACTION_PAID_OFF, ACTION_MAINTAIN, ACTION_ADJUST_TENURE, ACTION_INTEREST_ONLY, ACTION_SAFEGUARD],
+            default=ACTION_EXTEND_TENURE
+        ).astype(np.int8)
+        # The rows whose branch needs a tenure, as in structure_loan's _calculate_tenure calls
+        tenure_fallback = ~paid_off & ((adjust & adjust_fallback) | (~strong & ~interest_only & relief_fallback))
+
+        return {
+            'action_code': action_code,
+            'new_emi': np.round(new_emi, 2),
+            'new_tenure': new_tenure.astype(np.int64),
+            'tenure_fallback': tenure_fallback
+        }
+
+    def rationale(self, action_code, original_tenure):
+        """
+        Renders the explanation for one decision.
+        """
+        return RATIONALES[action_code].format(
+            dti_pct=int(self.target_dti*100),
+            max_allowed_tenure=original_tenure * self.tenure_cap_multiple
+        )
+
+    def batch_row(self, structure, index, original_tenure):
+        """
+        Expands one borrower of a structure_batch result into a structure_loan-style record.
+        """
+        action_code = structure['action_code'][index]
+        return LoanStructure(
+            float(structure['new_emi'][index]),
+            int(structure['new_tenure'][index]),
+            ACTIONS[action_code],
+            self.rationale(action_code, original_tenure)
+        )
+
+    def _pmt_array(self, p, r, n):
+        if not np.ndim(r):
+            if r == 0: return p / n
+            growth = ANNUITY_CACHE.growth_array(r, n)
+            return p * r * growth / (growth - 1)
+        growth = ANNUITY_CACHE.growth_array(r, n)
+        return np.where(r == 0, p / n, p * r * growth / (growth - 1))
+
+    def _tenure_array(self, p, r, emi):
+        # Same closed form as _calculate_tenure; 999 marks a perpetual / undefined tenure.
+        # Returns (tenure, fallback mask of the rows set to 999)
+        shape = np.broadcast_shapes(np.shape(p), np.shape(r), np.shape(emi))
+        if not np.ndim(r) and r == 0:
+            return np.full(shape, 999.0), np.ones(shape, dtype=bool)
+        perpetual = (emi <= p * r) | (r == 0)
+        ratio = np.where(perpetual, 0.0, (r * p) / np.where(perpetual, 1.0, emi))
+        tenure = np.ceil(-np.log(1 - ratio) / ANNUITY_CACHE.log_growth_array(r))
+        fallback = np.broadcast_to(perpetual | ~np.isfinite(tenure), shape)
+        return np.where(fallback, 999.0, tenure), fallback
 
     def _calculate_pmt(self, p, r, n):
-        if r == 0: return p / n
-        return p * r * ((1 + r)**n) / (((1 + r)**n) - 1)
+        return ANNUITY_CACHE.payment(p, r, n)
 
     def _calculate_tenure(self, p, r, emi):
-        import math
-        if emi <= p * r:
-            return 999 # Perpetual
-        try:
-             # Formula for n = -log(1 - (r*P)/EMI) / log(1+r)
-             numerator = -math.log(1 - (r * p) / emi)
-             denominator = math.log(1 + r)
-             return math.ceil(numerator / denominator)
-        except:
-            return 999
+        return ANNUITY_CACHE.tenure(p, r, emi)
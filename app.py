@@ -1,13 +1,23 @@
+import uuid
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-from agents.cashflow_agent import CashflowForecastingAgent
-from agents.risk_agent import RiskIntelligenceAgent
-from agents.structuring_agent import LoanStructuringAgent
-from agents.contract_agent import ContractEvolutionAgent
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from utils.data_generator import generate_profile_data
-from utils.visuals import plot_income_forecast, plot_risk_gauge
-from utils.comparison_logic import calculate_fixed_loan_trajectory
+from utils.simulation_engine import PortfolioSimulationEngine
+from utils.history import SimulationHistory
+from agents.risk_agent import ZONES
+from agents.structuring_agent import ACTIONS
+from agents.contract_agent import ACTION_TEMPLATES
+from utils.visuals import plot_income_forecast, plot_risk_gauge, plot_distress_comparison, plot_affordability, plot_zone_mix
+from utils.comparison_logic import FixedLoanBaseline
+from utils.background_run import BackgroundPortfolioRun, FAILED
+
+# Seconds between progress refreshes while a portfolio run is in flight
+PORTFOLIO_REFRESH_SECONDS = 1.0
+# A run whose browser session has been disconnected this long (tab closed) stops itself
+PORTFOLIO_GRACE_SECONDS = 30.0
+# Borrowers simulated at a time: bounds a session's income matrix to 16,384 x months floats
+PORTFOLIO_BLOCK_SIZE = 16384
 
 # Page Config
 st.set_page_config(page_title="SafeLoan Platform", layout="wide")
@@ -26,8 +36,90 @@ st.markdown("""
 
 st.title("SafeLoan: Adaptive Lending Platform")
 
+# --- Rerun Caches ---
+# Streamlit re-executes this script on every interaction; these entries are keyed on the
+# simulation inputs (profile, principal, tenure, DTI, month) and hold a single entry each,
+# so a changed input evicts the stale value. The fixed-loan baseline needs no cache: it
+# advances incrementally in session state.
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_profile_data(profile):
+    return generate_profile_data(profile)
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def build_distress_figure(run_id, profile, principal, tenure, month, _history):
+    return plot_distress_comparison(_history.column('month'), _history.column('fixed_distress'), _history.column('distress'))
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def build_affordability_figure(run_id, dti, month, _history):
+    return plot_affordability(_history.column('month'), _history.column('emi'), _history.column('safe_forecast'), dti)
+
+# --- Portfolio Mode ---
+# The simulation runs on a worker thread; only the progress fragment below reruns on a
+# timer, reading the worker's latest snapshot, so the page stays interactive meanwhile.
+def session_liveness():
+    """
+    Callable telling a background run whether this browser session is still connected.
+    Switching views keeps the session (and its run) alive; closing the tab does not.
+    """
+    ctx = get_script_run_ctx()
+    if ctx is None or not Runtime.exists():
+        return None
+    runtime, session_id = Runtime.instance(), ctx.session_id
+    return lambda: runtime.is_active_session(session_id)
+
+def render_portfolio_progress():
+    run = st.session_state.portfolio_run
+    snapshot = run.snapshot()
+    st.progress(
+        snapshot['progress'],
+        text=f"Month {snapshot['month']} / {snapshot['months']} · Borrowers {snapshot['borrowers']:,} / {snapshot['n_borrowers']:,} · "
+             f"{snapshot['status'].title()} · {snapshot['elapsed']:.1f}s"
+    )
+    if snapshot['status'] == FAILED:
+        st.error(snapshot['error'])
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Defaults Avoided", f"{snapshot['defaults_avoided']:,}", delta="SafeLoan Protected")
+    c2.metric("Financial Stress (Traditional)", f"₹{snapshot['fixed_distress_total']:,.0f}")
+    c3.metric("Financial Stress (SafeLoan)", f"₹{snapshot['distress_total']:,.0f}", delta="Optimized")
+    c4.metric("Critical Zone", f"{snapshot['zone_mix']['Critical']:,} / {snapshot['borrowers']:,}")
+
+    if snapshot['month']:
+        series = snapshot['series']
+        g1, g2 = st.columns(2)
+        g1.plotly_chart(plot_zone_mix(series['month'], series['zone_counts']), use_container_width=True)
+        g2.plotly_chart(plot_distress_comparison(series['month'], series['fixed_distress'], series['distress']), use_container_width=True)
+
+    # Once the worker stops, rerun the whole page a final time so the refresh timer is dropped
+    if not run.is_running and st.session_state.get('portfolio_polling'):
+        st.session_state.portfolio_polling = False
+        st.rerun()
+
+def render_portfolio_mode(profile, principal, tenure, dti):
+    st.sidebar.divider()
+    n_borrowers = st.sidebar.number_input("Borrowers", min_value=100, max_value=1_000_000, value=10_000, step=1000)
+    months = st.sidebar.slider("Simulated Months", 12, 120, 36)
+
+    run = st.session_state.get('portfolio_run')
+    col_head, col_start, col_cancel = st.columns([3, 1, 1])
+    col_head.subheader("Portfolio Simulation")
+    if col_start.button("Start Run ▶", use_container_width=True, type="primary", disabled=run is not None and run.is_running):
+        run = st.session_state.portfolio_run = BackgroundPortfolioRun(
+            n_borrowers, months, profile=profile, principal=principal, tenure=tenure, target_dti=dti,
+            block_size=PORTFOLIO_BLOCK_SIZE, alive=session_liveness(), grace_seconds=PORTFOLIO_GRACE_SECONDS
+        ).start()
+    if col_cancel.button("Cancel ⏹", use_container_width=True, disabled=run is None or not run.is_running):
+        run.cancel()
+
+    if run is None:
+        st.info(f"Simulate {n_borrowers:,} '{profile}' borrowers for {months} months in the background.")
+        return
+    st.session_state.portfolio_polling = run.is_running
+    st.fragment(run_every=PORTFOLIO_REFRESH_SECONDS if run.is_running else None)(render_portfolio_progress)()
+
 # --- Sidebar Controls ---
 st.sidebar.markdown("### Configuration")
+mode = st.sidebar.radio("Mode", ["Single Borrower", "Portfolio"], horizontal=True)
 profile_type = st.sidebar.selectbox("Borrower Profile", ["Gig Worker", "Freelancer", "Small Business"])
 st.sidebar.divider()
 initial_loan_amount = st.sidebar.number_input("Principal Amount (INR)", value=500000, step=10000)
@@ -35,19 +127,30 @@ initial_tenure = st.sidebar.slider("Tenure (Months)", 12, 60, 36)
 target_dti = st.sidebar.slider("Target Affordability (DTI)", 0.2, 0.6, 0.4)
 
 if st.sidebar.button("Reset Simulation", use_container_width=True):
+    if 'portfolio_run' in st.session_state:
+        st.session_state.portfolio_run.cancel()
     st.session_state.clear()
     st.rerun()
 
+if mode == "Portfolio":
+    render_portfolio_mode(profile_type, initial_loan_amount, initial_tenure, target_dti)
+    st.stop()
+
 # --- Initialize Session State ---
 if 'history' not in st.session_state:
-    st.session_state.history = []
-    st.session_state.current_month = 0
-    st.session_state.income_data = generate_profile_data(profile_type)
-    st.session_state.remaining_principal = initial_loan_amount
-    st.session_state.remaining_tenure = initial_tenure
-    st.session_state.current_emi = (initial_loan_amount / initial_tenure) * 1.1 
-    st.session_state.contract_logs = []
-    st.session_state.distress_balance = 0 
+    st.session_state.history = SimulationHistory(capacity=64)
+    st.session_state.run_id = uuid.uuid4().hex
+    st.session_state.profile_type = profile_type
+    st.session_state.income_data = load_profile_data(profile_type)
+    # Single-borrower portfolio: the dashboard is a view over the headless engine
+    st.session_state.engine = PortfolioSimulationEngine(
+        st.session_state.income_data['Income'].to_numpy(),
+        initial_loan_amount,
+        initial_tenure,
+        target_dti=target_dti
+    )
+    # Traditional loan comparison advances alongside the engine instead of replaying history
+    st.session_state.fixed_baseline = FixedLoanBaseline(initial_loan_amount, initial_tenure)
     
     st.session_state.agent_thoughts = {
         'cashflow': {},
@@ -55,143 +158,100 @@ if 'history' not in st.session_state:
         'structuring': {}
     }
 
-# --- Initialize Agents ---
-cashflow_agent = CashflowForecastingAgent()
-risk_agent = RiskIntelligenceAgent()
-structuring_agent = LoanStructuringAgent(target_dti=target_dti)
-contract_agent = ContractEvolutionAgent()
+engine = st.session_state.engine
+engine.structuring_agent.target_dti = target_dti
+# The tenure slider sets the 2x tenure cap on every rerun, like the DTI slider
+engine.original_tenure[:] = initial_tenure
+# The traditional comparison follows the current principal and tenure: replay it when they move
+if (st.session_state.fixed_baseline.initial_principal, st.session_state.fixed_baseline.initial_tenure) != (initial_loan_amount, initial_tenure):
+    st.session_state.fixed_baseline = FixedLoanBaseline(initial_loan_amount, initial_tenure)
+    st.session_state.history.column('fixed_distress')[:] = [
+        st.session_state.fixed_baseline.advance(income)['Fixed_Distress']
+        for income in st.session_state.history.column('income')
+    ]
 
 # --- Simulation Stepper ---
 col_head, col_btn = st.columns([4, 1])
 with col_btn:
     if st.button("Advance Month ⏩", use_container_width=True, type="primary"):
-        st.session_state.current_month += 1
-        current_m = st.session_state.current_month
+        month_result = engine.step()
         
-        if current_m > len(st.session_state.income_data):
+        if month_result is None:
             st.warning("Simulation Complete.")
         else:
-            past_income = st.session_state.income_data.iloc[:current_m]['Income'].tolist()
-            last_income = past_income[-1]
-            
             # --- AGENT EXECUTION ---
-            forecast = cashflow_agent.forecast_income(past_income)
-            risk_state = risk_agent.assess_risk(forecast, st.session_state.current_emi)
-            new_structure = structuring_agent.structure_loan(
-                forecast, 
-                st.session_state.remaining_principal, 
-                st.session_state.remaining_tenure,
-                original_tenure=initial_tenure
-            )
-            
-            # --- UPDATE STATE ---
-            old_terms = {'emi': st.session_state.current_emi, 'tenure': st.session_state.remaining_tenure}
-            contract_update = contract_agent.generate_contract_update(old_terms, new_structure)
-            
-            st.session_state.remaining_principal = max(0, st.session_state.remaining_principal - (new_structure['new_emi'] * 0.7))
-            st.session_state.remaining_tenure = new_structure['new_tenure'] - 1 if new_structure['new_tenure'] < 999 else 999
-            st.session_state.current_emi = new_structure['new_emi']
-            
-            shortfall = max(0, new_structure['new_emi'] - last_income)
-            st.session_state.distress_balance += shortfall
+            decision = engine.decision(month_result, 0)
+            st.session_state.agent_thoughts['cashflow'] = decision['forecast']
+            st.session_state.agent_thoughts['risk'] = decision['risk']
+            st.session_state.agent_thoughts['structuring'] = decision['structure']
             
-            st.session_state.agent_thoughts['cashflow'] = forecast
-            st.session_state.agent_thoughts['risk'] = risk_state
-            st.session_state.agent_thoughts['structuring'] = new_structure
-            
-            snapshot = {
-                'Month': current_m,
-                'Income': last_income,
-                'Safe Forecast': forecast['safe_income'],
-                'Risk Score': risk_state['risk_score'],
-                'Zone': risk_state['zone'],
-                'EMI': new_structure['new_emi'],
-                'Action': new_structure['action_taken'],
-                'Contract': contract_update,
-                'Adaptive_Distress': st.session_state.distress_balance
-            }
-            st.session_state.history.append(snapshot)
-            st.session_state.contract_logs.insert(0, snapshot)
+            structure = month_result['structure']
+            fixed_month = st.session_state.fixed_baseline.advance(month_result['income'][0])
+            st.session_state.history.append(
+                month=month_result['month'],
+                income=month_result['income'][0],
+                safe_forecast=month_result['forecast']['safe_income'][0],
+                risk_score=month_result['risk']['risk_score'][0],
+                zone_code=month_result['risk']['zone_code'][0],
+                emi=structure['new_emi'][0],
+                tenure=structure['new_tenure'][0],
+                action_code=structure['action_code'][0],
+                distress=engine.distress[0],
+                fixed_distress=fixed_month['Fixed_Distress']
+            )
 
 # --- Main Interface ---
-if st.session_state.history:
+history = st.session_state.history
+if len(history):
     # Key Stats Row
-    latest = st.session_state.history[-1]
+    latest = history.last()
+    latest_zone = ZONES[latest['zone_code']]
+    latest_action = ACTIONS[latest['action_code']]
     s1, s2, s3, s4 = st.columns(4)
-    s1.metric("Month", st.session_state.current_month)
-    s2.metric("Rating", f"{latest['Risk Score']} ({latest['Zone']})")
-    s3.metric("Outstanding Principal", f"₹{st.session_state.remaining_principal:,.0f}")
-    s4.metric("Current EMI", f"₹{latest['EMI']:,.0f}")
+    s1.metric("Month", engine.month)
+    s2.metric("Rating", f"{latest['risk_score']} ({latest_zone})")
+    s3.metric("Outstanding Principal", f"₹{engine.principal[0]:,.0f}")
+    s4.metric("Current EMI", f"₹{latest['emi']:,.0f}")
     
     st.divider()
 
-    # Tabs
-    tab1, tab2, tab3 = st.tabs(["Dashboard", "Decision Engine", "Audit Trail"])
+    # Views: unlike st.tabs, only the selected view runs, so hidden figures are never built
+    view = st.radio("View", ["Dashboard", "Decision Engine", "Audit Trail"], horizontal=True, label_visibility="collapsed", key="view")
     
-    with tab1:
+    if view == "Dashboard":
         st.subheader("Performance & Impact Analysis")
         # Run Comparison
-        current_incomes = st.session_state.income_data.iloc[:st.session_state.current_month]['Income'].tolist()
-        fixed_hist, fixed_defaults, fixed_penalties = calculate_fixed_loan_trajectory(current_incomes, initial_loan_amount, initial_tenure)
-        fixed_df = pd.DataFrame(fixed_hist)
+        run_key = (st.session_state.run_id, st.session_state.profile_type, initial_loan_amount, initial_tenure, engine.month)
+        fixed_defaults = st.session_state.fixed_baseline.missed_payments_count
         
         c1, c2, c3 = st.columns(3)
         c1.metric("Defaults Avoided", f"{fixed_defaults}", delta="SafeLoan Protected")
-        c2.metric("Financial Stress (Traditional)", f"₹{fixed_df.iloc[-1]['Fixed_Distress']:,.0f}")
-        c3.metric("Financial Stress (SafeLoan)", f"₹{st.session_state.distress_balance:,.0f}", delta="Optimized")
+        c2.metric("Financial Stress (Traditional)", f"₹{latest['fixed_distress']:,.0f}")
+        c3.metric("Financial Stress (SafeLoan)", f"₹{engine.distress[0]:,.0f}", delta="Optimized")
         
         # Chart
-        fig_comp = go.Figure()
-        fig_comp.add_trace(go.Bar(x=fixed_df['Month'], y=fixed_df['Fixed_Distress'], name='Traditional Distress', marker_color='#EF553B'))
-        fig_comp.add_trace(go.Bar(x=[h['Month'] for h in st.session_state.history], y=[h['Adaptive_Distress'] for h in st.session_state.history], name='SafeLoan Distress', marker_color='#00CC96'))
-        fig_comp.update_layout(title="Stress Accumulation Analysis", barmode='group', template='plotly_white', height=400)
-        st.plotly_chart(fig_comp, use_container_width=True)
+        st.plotly_chart(build_distress_figure(*run_key, history), use_container_width=True)
 
         # --- NEW: Affordability Chart ---
         st.markdown("#### 📉 Affordability Logic: EMI vs Safe Income")
         
-        months = [h['Month'] for h in st.session_state.history]
-        safe_incomes = [h['Safe Forecast'] for h in st.session_state.history]
-        emis = [h['EMI'] for h in st.session_state.history]
-        
-        # Calculate Ratios (Handle div by 0)
-        ratios = []
-        for emi, safe in zip(emis, safe_incomes):
-            if safe > 0:
-                ratios.append((emi / safe) * 100)
-            else:
-                ratios.append(0) # Or Handle as 100%? Default to 0 for chart safety
-        
-        target_line = [target_dti * 100] * len(months)
-        
-        fig_afford = go.Figure()
-        fig_afford.add_trace(go.Scatter(x=months, y=ratios, mode='lines+markers', name='Actual EMI Burden (%)', line=dict(color='#636EFA', width=3)))
-        fig_afford.add_trace(go.Scatter(x=months, y=target_line, mode='lines', name=f'Target DTI Limit ({int(target_dti*100)}%)', line=dict(color='gray', dash='dot')))
-        
-        fig_afford.update_layout(
-            yaxis_title="Percentage of Safe Income",
-            xaxis_title="Month",
-            template='plotly_white',
-            height=350,
-            yaxis=dict(range=[0, 100]) # Fix range to 0-100% for clarity
-        )
-        st.plotly_chart(fig_afford, use_container_width=True)
+        st.plotly_chart(build_affordability_figure(st.session_state.run_id, target_dti, engine.month, history), use_container_width=True)
 
         # --- NEW: Explain EMI Logic ---
-        with st.expander(f"💡 Why is my EMI ₹{latest['EMI']:,.0f}? (Click to Explain)"):
+        with st.expander(f"💡 Why is my EMI ₹{latest['emi']:,.0f}? (Click to Explain)"):
             c1, c2, c3, c4 = st.columns(4)
-            c1.metric("1. Safe Income", f"₹{latest['Safe Forecast']:,.0f}", help="Conservative monthly capacity")
+            c1.metric("1. Safe Income", f"₹{latest['safe_forecast']:,.0f}", help="Conservative monthly capacity")
             c2.metric("2. Target DTI", f"{int(target_dti*100)}%", help="Affordability Limit")
-            c3.metric("3. Risk Score", f"{latest['Risk Score']}/100", help="Influence on decision")
+            c3.metric("3. Risk Score", f"{latest['risk_score']}/100", help="Influence on decision")
             
             # Tenure Logic
-            is_cap_reached = 'Interest Only' in latest['Action']
+            is_cap_reached = 'Interest Only' in latest_action
             cap_status = "🛑 Max Cap" if is_cap_reached else "✅ Standard"
             c4.metric("4. Tenure", cap_status, help="Safeguard status")
             
             st.caption(f"**rationale:** {st.session_state.agent_thoughts['structuring'].get('rationale', 'Standard calculation.')}")
         
-    with tab2:
+    elif view == "Decision Engine":
         st.subheader("Agent Intelligence Breakdown")
         
         c_forecast = st.session_state.agent_thoughts['cashflow']
@@ -267,15 +327,23 @@ if st.session_state.history:
             else:
                 st.info("Awaiting decision...")
             
-    with tab3:
+    elif view == "Audit Trail":
         st.subheader("Contract Evolution Ledger")
-        for log in st.session_state.contract_logs:
-            event_type = log['Contract'].get('event_type')
+        # Newest first, read straight from reversed column views; text is rendered only here
+        ledger = zip(
+            history.column('month', reverse=True),
+            ACTION_TEMPLATES[history.column('action_code', reverse=True)],
+            history.column('emi', reverse=True),
+            history.column('tenure', reverse=True)
+        )
+        for month, template_id, emi, tenure in ledger:
+            contract = engine.contract_agent.render(template_id, emi, tenure)
+            event_type = contract.get('event_type')
             color = "green" if event_type == 'Stable' else "red" if event_type == 'Stress' else "orange"
             
             st.markdown(f"""
-            **Month {log['Month']}** | <span style='color:{color}'>{event_type}</span> <br>
-            {log['Contract']['message']}
+            **Month {month}** | <span style='color:{color}'>{event_type}</span> <br>
+            {contract['message']}
             <hr style='margin: 5px 0;'>
             """, unsafe_allow_html=True)
 
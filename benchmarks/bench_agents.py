@@ -0,0 +1,242 @@
+"""
+Throughput benchmarks for the agents, the fixed-loan comparison, the data generator and
+the full simulated month.
+
+    python benchmarks/bench_agents.py                      # run, compare with baseline.json
+    python benchmarks/bench_agents.py --update-baseline    # record a new baseline
+    python benchmarks/bench_agents.py --sizes 1000 --threshold 0.3
+
+Results are written as JSON. When a baseline exists, the run fails (exit code 1) if any
+benchmark's throughput drops by more than --threshold relative to it.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import platform
+import time
+
+import numpy as np
+
+from agents.cashflow_agent import CashflowForecastingAgent
+from agents.risk_agent import RiskIntelligenceAgent
+from agents.structuring_agent import LoanStructuringAgent
+from agents.contract_agent import ContractEvolutionAgent
+from utils.comparison_logic import calculate_fixed_loan_trajectory, calculate_fixed_loan_batch
+from utils.data_generator import generate_income_matrix
+from utils.simulation_engine import PortfolioSimulationEngine
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_SIZES = (1000, 100000, 1000000)
+SCALAR_CALLS = 20000
+MONTHS = 36
+
+BENCHMARKS = []
+
+def benchmark(name, unit, sized=False):
+    """
+    Registers a benchmark. The function returns the number of items processed per run;
+    sized benchmarks are run once per portfolio size and receive a prepared portfolio
+    (built outside the timed section).
+    """
+    def register(fn):
+        BENCHMARKS.append({'name': name, 'unit': unit, 'sized': sized, 'fn': fn})
+        return fn
+    return register
+
+def _portfolio(n):
+    incomes = generate_income_matrix(n, months=MONTHS, seed=1)
+    return {
+        'n': n,
+        'incomes': incomes,
+        'forecast': CashflowForecastingAgent().forecast_batch(incomes),
+        'principal': np.full(n, 500000.0),
+        'tenure': np.full(n, 36)
+    }
+
+# --- Per-call (scalar) benchmarks ---
+
+@benchmark('forecast_income', 'calls')
+def bench_forecast_income():
+    agent = CashflowForecastingAgent()
+    history = [50000, 52000, 48000, 30000, 41000, 39000]
+    for _ in range(SCALAR_CALLS):
+        agent.forecast_income(history)
+    return SCALAR_CALLS
+
+@benchmark('assess_risk', 'calls')
+def bench_assess_risk():
+    agent = RiskIntelligenceAgent()
+    forecast = {'safe_income': 33764.87, 'potential_income': 48117.57, 'volatility': 0.221}
+    for _ in range(SCALAR_CALLS):
+        agent.assess_risk(forecast, 15000, 1)
+    return SCALAR_CALLS
+
+@benchmark('structure_loan', 'calls')
+def bench_structure_loan():
+    agent = LoanStructuringAgent()
+    forecasts = [{'safe_income': income} for income in (60000.0, 20000.0, 8000.0, 1000.0)]
+    for i in range(SCALAR_CALLS):
+        agent.structure_loan(forecasts[i % 4], 400000, 30, 36)
+    return SCALAR_CALLS
+
+@benchmark('generate_contract_update', 'calls')
+def bench_generate_contract_update():
+    agent = ContractEvolutionAgent()
+    old_terms = {'emi': 15000, 'tenure': 30}
+    decisions = [
+        {'new_emi': 13000.0, 'new_tenure': 30, 'action_taken': 'Maintain Standard'},
+        {'new_emi': 4000.0, 'new_tenure': 31, 'action_taken': 'Interest Only / Relief Mode'},
+        {'new_emi': 9000.0, 'new_tenure': 52, 'action_taken': 'Adjust Tenure (Minor)'}
+    ]
+    for i in range(SCALAR_CALLS):
+        agent.generate_contract_update(old_terms, decisions[i % 3])
+    return SCALAR_CALLS
+
+@benchmark('calculate_fixed_loan_trajectory', 'borrower-months')
+def bench_fixed_trajectory():
+    incomes = generate_income_matrix(200, months=MONTHS, seed=2)
+    for row in incomes:
+        calculate_fixed_loan_trajectory(row.tolist(), 500000, 36)
+    return incomes.size
+
+# --- Batch benchmarks, one run per portfolio size ---
+
+@benchmark('forecast_batch', 'borrowers', sized=True)
+def bench_forecast_batch(portfolio):
+    CashflowForecastingAgent().forecast_batch(portfolio['incomes'])
+    return portfolio['n']
+
+@benchmark('assess_batch', 'borrowers', sized=True)
+def bench_assess_batch(portfolio):
+    RiskIntelligenceAgent().assess_batch(portfolio['forecast'], portfolio['principal'] / 36, 0)
+    return portfolio['n']
+
+@benchmark('structure_batch', 'borrowers', sized=True)
+def bench_structure_batch(portfolio):
+    LoanStructuringAgent().structure_batch(
+        portfolio['forecast'], portfolio['principal'], portfolio['tenure'], portfolio['tenure']
+    )
+    return portfolio['n']
+
+@benchmark('generate_contract_batch', 'borrowers', sized=True)
+def bench_contract_batch(portfolio):
+    n = portfolio['n']
+    codes = np.arange(n, dtype=np.int8) % 6
+    ContractEvolutionAgent().generate_batch(codes, portfolio['principal'] / 36, portfolio['tenure'])
+    return n
+
+@benchmark('calculate_fixed_loan_batch', 'borrower-months', sized=True)
+def bench_fixed_batch(portfolio):
+    calculate_fixed_loan_batch(portfolio['incomes'], portfolio['principal'], portfolio['tenure'])
+    return portfolio['incomes'].size
+
+@benchmark('simulated_month', 'borrowers', sized=True)
+def bench_simulated_month(portfolio):
+    engine = PortfolioSimulationEngine(portfolio['incomes'], portfolio['principal'], portfolio['tenure'])
+    engine.run(months=3) # warm the rolling forecast window
+    started = time.perf_counter()
+    engine.step()
+    return portfolio['n'], time.perf_counter() - started
+
+@benchmark('generate_income_matrix', 'borrower-months', sized=True)
+def bench_data_generator(portfolio):
+    generate_income_matrix(portfolio['n'], months=MONTHS, seed=3)
+    return portfolio['n'] * MONTHS
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat=3, names=None):
+    """
+    Runs the registered benchmarks and returns {name: {'per_second', 'seconds', 'items', 'unit'}}.
+    Each benchmark keeps its best of `repeat` runs.
+    """
+    selected = [bench for bench in BENCHMARKS if not names or bench['name'] in names]
+    results = {}
+    for size in (None,) + tuple(sizes):
+        portfolio = _portfolio(size) if size is not None and any(b['sized'] for b in selected) else None
+        for bench in selected:
+            if bench['sized'] != (size is not None):
+                continue
+            key = bench['name'] if size is None else f"{bench['name']}[{size}]"
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                outcome = bench['fn']() if size is None else bench['fn'](portfolio)
+                elapsed = time.perf_counter() - started
+                # A benchmark may time only its own section by returning (items, seconds)
+                items, elapsed = outcome if isinstance(outcome, tuple) else (outcome, elapsed)
+                if best is None or elapsed < best[1]:
+                    best = (items, elapsed)
+            items, elapsed = best
+            results[key] = {
+                'per_second': items / elapsed if elapsed > 0 else float('inf'),
+                'seconds': elapsed,
+                'items': items,
+                'unit': bench['unit']
+            }
+    return results
+
+def find_regressions(results, baseline, threshold):
+    """
+    Lists benchmarks whose throughput fell more than `threshold` (a fraction) below the baseline.
+    """
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        change = result['per_second'] / reference['per_second'] - 1
+        if change < -threshold:
+            regressions.append((key, change))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='comma-separated portfolio sizes for batch benchmarks')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', default='', help='comma-separated benchmark names to run')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--output', default=None, help='write this run as JSON (default: stdout only)')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed throughput drop before failing, as a fraction (default 0.25)')
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    names = {name for name in args.only.split(',') if name}
+    results = run_benchmarks(sizes=sizes, repeat=args.repeat, names=names)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')
+        },
+        'benchmarks': results
+    }
+    for key, result in results.items():
+        print(f"{key:<45} {result['per_second']:>16,.0f} {result['unit']}/s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)['benchmarks']
+    regressions = find_regressions(results, baseline, args.threshold)
+    for key, change in regressions:
+        print(f"REGRESSION {key}: {change:+.1%} vs baseline")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+Memory per decision: bytes retained by one borrower-month of agent results (forecast,
+risk, structure, contract) as slotted result records versus the plain dicts they replace.
+
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py --decisions 50000 --output memory.json
+
+Allocations are traced with tracemalloc while the decisions are produced and kept alive,
+once through the scalar agent methods and once through the engine's batch_row expansion.
+Records trade construction time for memory, so the per-call time of each scalar agent
+method and of a whole decision is reported next to the bytes.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import gc
+import json
+import platform
+import time
+import timeit
+import tracemalloc
+
+import numpy as np
+
+from agents.cashflow_agent import CashflowForecastingAgent
+from agents.risk_agent import RiskIntelligenceAgent
+from agents.structuring_agent import LoanStructuringAgent
+from agents.contract_agent import ContractEvolutionAgent
+from utils.data_generator import generate_income_matrix
+from utils.simulation_engine import PortfolioSimulationEngine
+
+def retained_bytes(build):
+    """
+    Bytes still allocated after build() returns, with its result kept alive.
+
+    Returns:
+        tuple: (bytes, build() result)
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return after - before, result
+
+def seconds_per_call(call, number=2000, repeat=7):
+    """
+    Best-of-`repeat` wall time of one call(), in seconds.
+    """
+    return min(timeit.repeat(call, number=number, repeat=repeat)) / number
+
+def _as_dicts(decision):
+    return tuple(part.to_dict() for part in decision)
+
+def scalar_decisions(n):
+    """
+    Returns a callable producing n decisions through the scalar agent methods.
+    """
+    cashflow = CashflowForecastingAgent()
+    risk = RiskIntelligenceAgent()
+    structuring = LoanStructuringAgent()
+    contract = ContractEvolutionAgent()
+    histories = generate_income_matrix(n, months=6, seed=3).tolist()
+
+    def decide(history):
+        forecast = cashflow.forecast_income(history)
+        assessment = risk.assess_risk(forecast, 15000)
+        structure = structuring.structure_loan(forecast, 400000, 30, 36)
+        update = contract.generate_contract_update({'emi': 15000, 'tenure': 30}, structure)
+        return forecast, assessment, structure, update
+
+    return lambda convert=None: [(convert or tuple)(decide(history)) for history in histories]
+
+def scalar_call_times():
+    """
+    Per-call time of each scalar agent method on a representative borrower.
+
+    Returns:
+        dict: {method name: seconds per call}
+    """
+    cashflow = CashflowForecastingAgent()
+    risk = RiskIntelligenceAgent()
+    structuring = LoanStructuringAgent()
+    contract = ContractEvolutionAgent()
+    history = generate_income_matrix(1, months=6, seed=3)[0].tolist()
+    forecast = cashflow.forecast_income(history)
+    structure = structuring.structure_loan(forecast, 400000, 30, 36)
+    calls = {
+        'forecast_income': lambda: cashflow.forecast_income(history),
+        'assess_risk': lambda: risk.assess_risk(forecast, 15000),
+        'structure_loan': lambda: structuring.structure_loan(forecast, 400000, 30, 36),
+        'generate_contract_update': lambda: contract.generate_contract_update({'emi': 15000, 'tenure': 30}, structure)
+    }
+    return {name: seconds_per_call(call) for name, call in calls.items()}
+
+def batch_row_decisions(n):
+    """
+    Returns a callable expanding every borrower of one simulated month with engine.decision.
+    """
+    engine = PortfolioSimulationEngine(generate_income_matrix(n, months=6, seed=3), 500000, 36)
+    month = engine.step()
+
+    def expand(convert=None):
+        decisions = []
+        for i in range(n):
+            decision = engine.decision(month, i)
+            parts = (decision['forecast'], decision['risk'], decision['structure'], decision['contract'])
+            decisions.append((convert or tuple)(parts))
+        return decisions
+
+    return expand
+
+def run_memory_benchmarks(n=5000):
+    """
+    Returns:
+        dict: {path: {'records': bytes per decision, 'dicts': bytes per decision, 'saving': fraction,
+            'seconds': time per decision}}
+    """
+    results = {}
+    for name, factory in (('scalar', scalar_decisions), ('batch_row', batch_row_decisions)):
+        build = factory(n)
+        record_bytes, kept = retained_bytes(build)
+        del kept
+        dict_bytes, kept = retained_bytes(lambda: build(_as_dicts))
+        del kept
+        results[name] = {
+            'records': record_bytes / n,
+            'dicts': dict_bytes / n,
+            'saving': 1 - record_bytes / dict_bytes,
+            'seconds': seconds_per_call(build, number=1, repeat=3) / n
+        }
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--decisions', type=int, default=5000)
+    parser.add_argument('--output', default=None, help='write this run as JSON (default: stdout only)')
+    args = parser.parse_args(argv)
+
+    results = run_memory_benchmarks(args.decisions)
+    calls = scalar_call_times()
+    for name, result in results.items():
+        print(f"{name:<10} records {result['records']:>8,.0f} B/decision   "
+              f"dicts {result['dicts']:>8,.0f} B/decision   saving {result['saving']:.0%}   "
+              f"{result['seconds'] * 1e6:>7.2f} us/decision")
+    for method, seconds in calls.items():
+        print(f"{method:<26} {seconds * 1e6:>7.2f} us/call")
+
+    if args.output:
+        report = {
+            'meta': {
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'decisions': args.decisions,
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')
+            },
+            'benchmarks': results,
+            'calls': calls
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
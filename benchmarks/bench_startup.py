@@ -0,0 +1,148 @@
+"""
+Cold-start benchmarks: import time of the agents and helpers in a fresh interpreter, and
+the dashboard's first render and first simulated month.
+
+    python benchmarks/bench_startup.py                     # run, compare with startup_baseline.json
+    python benchmarks/bench_startup.py --update-baseline   # record a new baseline
+    python benchmarks/bench_startup.py --no-app            # imports only (no Streamlit needed)
+
+Every measurement runs in a new process, so nothing is served from an already warm
+sys.modules. The run fails (exit code 1) if any timing grows by more than --threshold
+relative to the baseline.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'startup_baseline.json')
+
+IMPORT_TARGETS = (
+    'agents.cashflow_agent',
+    'agents.risk_agent',
+    'agents.structuring_agent',
+    'agents.contract_agent',
+    'utils.simulation_engine',
+    'utils.data_generator',
+    'utils.visuals'
+)
+# Dependencies that headless imports should not pull in
+HEAVY_MODULES = ('pandas', 'plotly', 'streamlit', 'pyarrow')
+
+_IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+_APP_SCRIPT = """
+import json, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=120).run()
+first_render = time.perf_counter() - start
+start = time.perf_counter()
+[b for b in at.button if 'Advance' in b.label][0].click().run()
+first_month = time.perf_counter() - start
+print(json.dumps({{'first_render': first_render, 'first_month': first_month}}))
+"""
+
+def _run_python(code):
+    completed = subprocess.run(
+        [sys.executable, '-c', code], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def measure_import(module, repeat=3):
+    """
+    Best-of-`repeat` import time of `module` in a fresh interpreter.
+
+    Returns:
+        dict: {'seconds': float, 'heavy_modules': list of HEAVY_MODULES it loaded}
+    """
+    runs = [_run_python(_IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES)) for _ in range(repeat)]
+    return {'seconds': min(run['seconds'] for run in runs), 'heavy_modules': runs[0]['heavy']}
+
+def measure_first_render(repeat=3):
+    """
+    Best-of-`repeat` time for the dashboard's first script run and its first 'Advance Month'
+    rerun, driven through Streamlit's AppTest in a fresh interpreter.
+    """
+    runs = [_run_python(_APP_SCRIPT.format(app=os.path.join(ROOT_DIR, 'app.py'))) for _ in range(repeat)]
+    return {
+        'app.first_render': {'seconds': min(run['first_render'] for run in runs)},
+        'app.first_month': {'seconds': min(run['first_month'] for run in runs)}
+    }
+
+def run_startup_benchmarks(modules=IMPORT_TARGETS, repeat=3, app=True):
+    results = {f"import {module}": measure_import(module, repeat) for module in modules}
+    if app:
+        results.update(measure_first_render(repeat))
+    return results
+
+def find_slowdowns(results, baseline, threshold):
+    """
+    Lists timings that grew more than `threshold` (a fraction) over the baseline.
+    """
+    slowdowns = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        change = result['seconds'] / reference['seconds'] - 1
+        if change > threshold:
+            slowdowns.append((key, change))
+    return slowdowns
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-app', action='store_true', help='skip the Streamlit first-render timings')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--output', default=None, help='write this run as JSON (default: stdout only)')
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help='allowed slowdown before failing, as a fraction (default 0.5)')
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    results = run_startup_benchmarks(repeat=args.repeat, app=not args.no_app)
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')
+        },
+        'benchmarks': results
+    }
+    for key, result in results.items():
+        heavy = ', '.join(result.get('heavy_modules', []))
+        print(f"{key:<35} {result['seconds'] * 1000:>10.1f} ms  {heavy}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)['benchmarks']
+    slowdowns = find_slowdowns(results, baseline, args.threshold)
+    for key, change in slowdowns:
+        print(f"REGRESSION {key}: {change:+.1%} vs baseline")
+    return 1 if slowdowns else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
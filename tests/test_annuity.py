@@ -0,0 +1,36 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import math
+
+import numpy as np
+
+from utils.annuity import AnnuityFactorCache
+
+
+def test_payment_and_tenure_match_closed_form():
+    cache = AnnuityFactorCache()
+    r = 0.01
+    expected = 400000 * r * ((1 + r)**36) / (((1 + r)**36) - 1)
+    assert cache.payment(400000, r, 36) == expected
+    assert cache.tenure(400000, r, expected) == math.ceil(-math.log(1 - (r * 400000) / expected) / math.log(1 + r))
+    assert cache.tenure(400000, r, 4000) == 999
+    assert cache.tenure(400000, 0, 5000) == 999
+
+
+def test_hits_misses_and_lru_eviction():
+    cache = AnnuityFactorCache(maxsize=2)
+    cache.growth(0.01, 12)
+    cache.growth(0.01, 12)
+    cache.growth(0.01, 24)
+    cache.growth(0.01, 12) # refresh 12 so 24 is the eviction candidate
+    cache.growth(0.01, 36)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (2, 3, 1)
+    cache.growth(0.01, 12)
+    assert cache.stats()['hits'] == 3
+
+    table = cache.growth_array(0.01, np.array([[12, 36], [36, 12]]))
+    assert table.shape == (2, 2)
+    assert table[0, 1] == (1.01)**36
@@ -0,0 +1,59 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from utils.background_run import BackgroundPortfolioRun, CANCELLED, DONE
+from utils.comparison_logic import calculate_fixed_loan_batch
+from utils.data_generator import generate_income_matrix
+from utils.simulation_engine import PortfolioSimulationEngine
+
+
+def test_background_run_publishes_engine_aggregates():
+    run = BackgroundPortfolioRun(200, 12, profile='Gig Worker', principal=300000, tenure=24, seed=3).start()
+    assert run.join(timeout=60)
+    snapshot = run.snapshot()
+    assert snapshot['status'] == DONE and snapshot['progress'] == 1.0
+
+    incomes = generate_income_matrix(200, 12, profile='Gig Worker', seed=3)
+    engine = PortfolioSimulationEngine(incomes, 300000, 24)
+    engine.run()
+    fixed = calculate_fixed_loan_batch(incomes, 300000, 24)
+    assert np.isclose(snapshot['distress_total'], engine.distress.sum())
+    assert np.isclose(snapshot['fixed_distress_total'], fixed['Fixed_Distress'][:, -1].sum())
+    assert snapshot['defaults_avoided'] == fixed['missed_payments'].sum()
+    assert sum(snapshot['zone_mix'].values()) == 200
+    assert snapshot['series']['zone_counts'].shape == (12, 3)
+
+
+def test_cancel_stops_at_a_month_boundary():
+    run = BackgroundPortfolioRun(20000, 120, seed=1)
+    run.cancel()
+    run.start()
+    assert run.join(timeout=60)
+    snapshot = run.snapshot()
+    assert snapshot['status'] == CANCELLED and snapshot['month'] < 120
+    assert len(snapshot['series']['distress']) == snapshot['month']
+
+
+def test_blocks_fold_in_month_by_month():
+    # A single block publishes each month before the block is done
+    seen = []
+    run = BackgroundPortfolioRun(300, 12, seed=5, block_size=64, alive=lambda: not seen.append(run.snapshot()))
+    run.start()
+    assert run.join(timeout=60)
+    first = [s for s in seen if s['month']][0]
+    assert first['borrowers'] == 64 and first['month'] < 12
+
+    snapshot = run.snapshot()
+    assert snapshot['borrowers'] == 300 and sum(snapshot['zone_mix'].values()) == 300
+    engine = PortfolioSimulationEngine(generate_income_matrix(300, 12, seed=5, block_size=64), 500000, 36)
+    engine.run()
+    assert np.isclose(snapshot['distress_total'], engine.distress.sum())
+
+
+def test_a_closed_session_stops_the_run_after_the_grace_period():
+    run = BackgroundPortfolioRun(20000, 120, seed=1, alive=lambda: False, grace_seconds=0).start()
+    assert run.join(timeout=60)
+    assert run.status == CANCELLED and run.error == 'Session closed'
@@ -0,0 +1,122 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from agents.cashflow_agent import CashflowForecastingAgent
+from agents.risk_agent import RiskIntelligenceAgent, ZONE_CRITICAL
+from agents.structuring_agent import LoanStructuringAgent, ACTIONS, ACTION_PAID_OFF
+from agents.contract_agent import ContractEvolutionAgent
+
+
+def _random_incomes(n_borrowers=300, months=18, seed=7):
+    rng = np.random.default_rng(seed)
+    incomes = np.maximum(0, rng.normal(50000, 20000, (n_borrowers, months))).round()
+    # Ragged histories: random gaps plus a few borrowers with no data at all
+    incomes[rng.random(incomes.shape) < 0.2] = np.nan
+    incomes[:5] = np.nan
+    return incomes
+
+
+def test_forecast_batch_matches_scalar():
+    incomes = _random_incomes()
+    for lookback in (1, 3, 12):
+        agent = CashflowForecastingAgent(lookback_period=lookback)
+        batch = agent.forecast_batch(incomes)
+        for i, row in enumerate(incomes):
+            history = row[~np.isnan(row)].tolist()
+            assert agent.batch_row(batch, i) == agent.forecast_income(history)
+
+
+def test_forecast_batch_dense_and_single_month():
+    agent = CashflowForecastingAgent()
+    incomes = np.array([[50000, 52000, 48000, 30000], [0, 0, 0, 0]])
+    batch = agent.forecast_batch(incomes)
+    assert agent.batch_row(batch, 0) == agent.forecast_income([50000, 52000, 48000, 30000])
+    assert batch['volatility'][1] == 0
+
+    single = agent.forecast_batch(np.array([[42000.0]]))
+    assert single['safe_income'][0] == 42000.0
+    assert single['volatility'][0] == 0
+
+
+def test_rolling_state_tracks_batch_forecast():
+    incomes = np.maximum(0, np.random.default_rng(3).normal(50000, 20000, (200, 30))).round()
+    incomes[::4] = 30000  # flat income must give zero volatility
+    agent = CashflowForecastingAgent()
+    state = agent.create_rolling_state(len(incomes))
+    for month in range(incomes.shape[1]):
+        state.update(incomes[:, month])
+        streamed = state.forecast()
+        replayed = agent.forecast_batch(incomes[:, :month + 1])
+        for key in streamed:
+            np.testing.assert_allclose(streamed[key], replayed[key], atol=0.011)
+    assert (streamed['volatility'][::4] == 0).all()
+
+
+def test_rolling_state_partial_updates():
+    agent = CashflowForecastingAgent()
+    state = agent.create_rolling_state(3)
+    state.update([10000, 20000], borrowers=[0, 2])
+    state.update([12000], borrowers=[0])
+    forecast = state.forecast()
+    assert agent.batch_row(forecast, 0) == agent.forecast_income([10000, 12000])
+    assert agent.batch_row(forecast, 1) == agent.forecast_income([])
+    assert agent.batch_row(forecast, 2) == agent.forecast_income([20000])
+
+
+def test_assess_batch_matches_scalar():
+    rng = np.random.default_rng(11)
+    n = 2000
+    forecast = {
+        'safe_income': np.where(rng.random(n) < 0.1, 0, rng.uniform(0, 80000, n).round(2)),
+        'volatility': rng.uniform(0, 1, n).round(3)
+    }
+    emis = rng.uniform(0, 30000, n).round(2)
+    missed = rng.integers(0, 4, n)
+
+    agent = RiskIntelligenceAgent()
+    batch = agent.assess_batch(forecast, emis, missed)
+    for i in range(n):
+        scalar = agent.assess_risk(
+            {'safe_income': forecast['safe_income'][i], 'volatility': forecast['volatility'][i]},
+            emis[i], int(missed[i])
+        )
+        row = agent.batch_row(batch, i)
+        assert {key: row[key] for key in scalar} == scalar
+
+    no_income = forecast['safe_income'] == 0
+    assert (batch['risk_score'][no_income] == 100).all()
+    assert (batch['zone_code'][no_income] == ZONE_CRITICAL).all()
+
+
+def test_structure_batch_matches_scalar():
+    rng = np.random.default_rng(5)
+    n = 3000
+    safe_incomes = np.where(rng.random(n) < 0.05, 0, rng.uniform(0, 150000, n).round(2))
+    principals = np.where(rng.random(n) < 0.05, 0, rng.uniform(1000, 800000, n).round(2))
+    tenures = rng.integers(1, 120, n)
+    original_tenures = rng.integers(12, 60, n)
+
+    for target_dti, rate in ((0.4, 0.12), (0.3, 0.0)):
+        agent = LoanStructuringAgent(target_dti=target_dti, interest_rate_annual=rate)
+        batch = agent.structure_batch({'safe_income': safe_incomes}, principals, tenures, original_tenures)
+        for i in range(n):
+            scalar = agent.structure_loan(
+                {'safe_income': safe_incomes[i]}, principals[i], int(tenures[i]), int(original_tenures[i])
+            )
+            assert agent.batch_row(batch, i, int(original_tenures[i])) == scalar
+
+    assert (batch['action_code'][principals == 0] == ACTION_PAID_OFF).all()
+
+
+def test_contract_batch_renders_like_scalar():
+    agent = ContractEvolutionAgent()
+    codes = np.arange(len(ACTIONS), dtype=np.int8)
+    emis = np.array([4719.12, 8000.5, 3100.0, 2500.25, 2500.25, 1234.5])
+    tenures = np.array([30, 44, 52, 31, 36, 12])
+    batch = agent.generate_batch(codes, emis, tenures)
+    for i, action in enumerate(ACTIONS):
+        new_terms = {'action_taken': action, 'new_emi': float(emis[i]), 'new_tenure': int(tenures[i])}
+        assert agent.batch_row(batch, i) == agent.generate_contract_update({}, new_terms)
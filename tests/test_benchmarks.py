@@ -0,0 +1,25 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.bench_agents import run_benchmarks, find_regressions
+from benchmarks.bench_startup import run_startup_benchmarks, find_slowdowns
+
+
+def test_small_benchmark_run_and_regression_check():
+    results = run_benchmarks(sizes=[200], repeat=1, names={'forecast_batch', 'simulated_month'})
+    assert set(results) == {'forecast_batch[200]', 'simulated_month[200]'}
+    assert all(result['per_second'] > 0 for result in results.values())
+
+    baseline = {key: dict(result, per_second=result['per_second'] * 2) for key, result in results.items()}
+    assert len(find_regressions(results, baseline, threshold=0.25)) == 2
+    assert find_regressions(results, results, threshold=0.25) == []
+
+
+def test_headless_imports_skip_heavy_dependencies():
+    modules = ('agents.structuring_agent', 'utils.simulation_engine', 'utils.data_generator', 'utils.visuals')
+    results = run_startup_benchmarks(modules=modules, repeat=1, app=False)
+    assert all(result['heavy_modules'] == [] for result in results.values())
+
+    baseline = {key: dict(result, seconds=result['seconds'] / 2) for key, result in results.items()}
+    assert len(find_slowdowns(results, baseline, threshold=0.5)) == len(modules)
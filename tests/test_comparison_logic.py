@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+
+import numpy as np
+
+from utils.comparison_logic import FixedLoanBaseline, calculate_fixed_loan_trajectory, calculate_fixed_loan_batch
+
+
+def test_batch_matches_scalar_trajectory():
+    rng = np.random.default_rng(4)
+    incomes = np.maximum(0, rng.normal(20000, 12000, (40, 48))).round()
+    principals = rng.uniform(100000, 900000, 40).round()
+    tenures = rng.integers(6, 60, 40)
+
+    batch = calculate_fixed_loan_batch(incomes, principals, tenures)
+    for i in range(len(incomes)):
+        history, missed, penalties = calculate_fixed_loan_trajectory(incomes[i].tolist(), principals[i], int(tenures[i]))
+        assert batch['missed_payments'][i] == missed
+        assert np.isclose(batch['penalties'][i], penalties)
+        np.testing.assert_allclose(batch['Fixed_Balance'][i], [h['Fixed_Balance'] for h in history], atol=1e-6)
+        np.testing.assert_allclose(batch['Fixed_Distress'][i], [h['Fixed_Distress'] for h in history], atol=1e-6)
+        np.testing.assert_array_equal(batch['Is_Default'][i], [h['Is_Default'] for h in history])
+        assert np.isclose(batch['Fixed_EMI'][i], history[0]['Fixed_EMI'])
+
+
+def test_baseline_resumes_from_serialized_state():
+    incomes = [20000, 5000, 30000, 0, 25000, 18000]
+    history, missed, penalties = calculate_fixed_loan_trajectory(incomes, 400000, 24)
+
+    baseline = FixedLoanBaseline(400000, 24)
+    for income in incomes[:3]:
+        baseline.advance(income)
+    restored = FixedLoanBaseline.from_dict(json.loads(json.dumps(baseline.to_dict())))
+    rows = [restored.advance(income) for income in incomes[3:]]
+
+    assert rows[-1]['Fixed_Distress'] == history[-1]['Fixed_Distress']
+    assert (restored.missed_payments_count, restored.penalties) == (missed, penalties)
+
+
+def test_baseline_advances_whole_portfolio():
+    incomes = np.maximum(0, np.random.default_rng(9).normal(15000, 9000, (30, 12))).round()
+    baseline = FixedLoanBaseline(np.full(30, 300000.0), 24)
+    for month in range(incomes.shape[1]):
+        baseline.advance(incomes[:, month])
+    batch = calculate_fixed_loan_batch(incomes, 300000.0, 24)
+    np.testing.assert_array_equal(baseline.missed_payments_count, batch['missed_payments'])
+    np.testing.assert_allclose(baseline.distress_balance + baseline.penalties, batch['Fixed_Distress'][:, -1])
@@ -0,0 +1,32 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from utils.data_generator import generate_income_matrix, iter_income_blocks, PROFILE_PRESETS
+
+
+def test_income_matrix_is_reproducible_and_streamable():
+    first = generate_income_matrix(1000, months=24, seed=7, block_size=256)
+    again = generate_income_matrix(1000, months=24, seed=7, block_size=256)
+    np.testing.assert_array_equal(first, again)
+
+    streamed = np.vstack([block for _, block in iter_income_blocks(1000, months=24, seed=7, block_size=256)])
+    np.testing.assert_array_equal(streamed, first)
+
+    # A borrower's series does not depend on how the cohort is split into blocks
+    for block_size in (1, 100, 4096):
+        np.testing.assert_array_equal(generate_income_matrix(1000, months=24, seed=7, block_size=block_size), first)
+    np.testing.assert_array_equal(generate_income_matrix(300, months=24, seed=7)[250:], first[250:300])
+
+    assert not np.array_equal(first, generate_income_matrix(1000, months=24, seed=8, block_size=256))
+    # Borrowers are independent series, unlike the globally seeded demo generator
+    assert len(np.unique(first[:, 0])) > 900
+    assert (first >= 0).all() and (first == np.floor(first)).all()
+
+
+def test_profile_presets():
+    preset = PROFILE_PRESETS['Small Business']
+    incomes = generate_income_matrix(20000, months=6, profile='Small Business')
+    assert abs(incomes.mean() - preset['base_income']) < 0.02 * preset['base_income']
@@ -0,0 +1,129 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import json
+
+from agents.cashflow_agent import CashflowForecastingAgent
+from agents.risk_agent import RiskIntelligenceAgent
+from agents.structuring_agent import LoanStructuringAgent
+from utils.decision_service import DecisionService, InProcessClient, serve
+
+
+def _state(i):
+    return {
+        'income_history': [50000 - 700 * i, 52000, 48000 - 900 * i, 30000 + 100 * i][:1 + i % 4],
+        'principal': 400000,
+        'tenure': 30,
+        'original_tenure': 36,
+        'emi': 15000,
+        'missed_payments': i % 2
+    }
+
+
+def test_concurrent_requests_are_batched_and_match_scalar_agents():
+    async def scenario():
+        service = DecisionService(max_batch_size=16, max_wait_ms=20)
+        client = InProcessClient(service)
+        responses = await asyncio.gather(*(client.post('/decide', _state(i)) for i in range(40)))
+        health = await client.get('/health')
+        await service.stop()
+        return responses, health
+
+    responses, (_, health) = asyncio.run(scenario())
+    assert health['requests'] == 40 and health['batches'] < 40
+
+    cashflow, risk, structuring = CashflowForecastingAgent(), RiskIntelligenceAgent(), LoanStructuringAgent()
+    for i, (status, decision) in enumerate(responses):
+        state = _state(i)
+        forecast = cashflow.forecast_income(state['income_history'])
+        assert status == 200
+        assert decision['forecast'] == forecast
+        assert decision['risk']['risk_score'] == risk.assess_risk(forecast, 15000, state['missed_payments'])['risk_score']
+        assert decision['structure'] == structuring.structure_loan(forecast, 400000, 30, 36)
+        assert decision['contract']['message']
+
+
+def test_bad_requests_and_http_transport():
+    async def scenario():
+        service = DecisionService(max_wait_ms=1)
+        status, error = await InProcessClient(service).post('/decide', {'principal': 1})
+
+        server = await serve(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        body = json.dumps(_state(3)).encode()
+        writer.write(b'POST /decide HTTP/1.1\r\nContent-Length: %d\r\nConnection: close\r\n\r\n' % len(body) + body)
+        raw = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        await service.stop()
+        return status, error, raw
+
+    status, error, raw = asyncio.run(scenario())
+    assert status == 400 and 'missing fields' in error['error']
+    head, _, payload = raw.partition(b'\r\n\r\n')
+    assert head.startswith(b'HTTP/1.1 200')
+    assert 'structure' in json.loads(payload)
+
+
+def test_memoized_service_matches_uncached_and_reports_hits():
+    async def scenario(service):
+        client = InProcessClient(service)
+        # The second round repeats the first, so it is served from the cache
+        responses = []
+        for _ in range(2):
+            responses += await asyncio.gather(*(client.post('/decide', _state(i)) for i in range(20)))
+        health = await client.get('/health')
+        await service.stop()
+        return responses, health[1]
+
+    plain, _ = asyncio.run(scenario(DecisionService(max_wait_ms=5)))
+    cached, health = asyncio.run(scenario(DecisionService(max_wait_ms=5, cache_size=64)))
+    assert cached == plain
+    assert health['cache']['forecast']['hits'] >= 20
+    assert health['cache']['structure']['size'] <= 20
+
+
+def test_full_queue_answers_503_and_large_batches_leave_the_loop():
+    async def scenario():
+        service = DecisionService(max_batch_size=8, max_wait_ms=5, max_queue_size=10, executor_batch_size=4)
+        client = InProcessClient(service)
+        # Posted in one tick: the batch worker cannot drain the queue before it fills
+        responses = await asyncio.gather(*(client.post('/decide', _state(i)) for i in range(25)))
+        health = await client.get('/health')
+        await service.stop()
+        return responses, health[1]
+
+    responses, health = asyncio.run(scenario())
+    statuses = [status for status, _ in responses]
+    assert statuses.count(503) == health['rejected'] > 0
+    assert statuses.count(200) == health['requests'] >= 10
+
+
+def test_failed_batch_answers_500_over_http():
+    class FailingService(DecisionService):
+        def decide_batch(self, requests):
+            raise ValueError('agent blew up')
+
+    async def scenario():
+        service = FailingService(max_wait_ms=1)
+        status, error = await InProcessClient(service).post('/decide', _state(1))
+
+        server = await serve(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        body = json.dumps(_state(2)).encode()
+        writer.write(b'POST /decide HTTP/1.1\r\nContent-Length: %d\r\nConnection: close\r\n\r\n' % len(body) + body)
+        raw = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        await service.stop()
+        return status, error, raw
+
+    status, error, raw = asyncio.run(scenario())
+    assert status == 500 and error['error'] == 'ValueError: agent blew up'
+    assert raw.startswith(b'HTTP/1.1 500 Internal Server Error')
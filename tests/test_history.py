@@ -0,0 +1,34 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from utils.history import SimulationHistory
+
+
+def _row(month):
+    return dict(month=month, income=1000.0 * month, safe_forecast=900.0 * month, risk_score=month,
+                zone_code=month % 3, emi=300.0 * month, tenure=36 - month, action_code=month % 6,
+                distress=10.0 * month, fixed_distress=20.0 * month)
+
+
+def test_append_grows_and_views_share_memory():
+    history = SimulationHistory(capacity=2)
+    for month in range(1, 6):
+        history.append(**_row(month))
+
+    assert len(history) == 5 and history.capacity == 8
+    np.testing.assert_array_equal(history.column('month'), [1, 2, 3, 4, 5])
+    np.testing.assert_array_equal(history.column('month', reverse=True), [5, 4, 3, 2, 1])
+    assert np.shares_memory(history.column('emi', reverse=True), history.column('emi'))
+    assert history.column('risk_score').dtype == np.int8
+    assert history.last()['distress'] == 50.0
+
+
+def test_to_frame():
+    history = SimulationHistory()
+    history.append(**_row(1))
+    frame = history.to_frame()
+    assert list(frame.columns) == list(SimulationHistory.COLUMNS)
+    assert frame['tenure'].iloc[0] == 35
@@ -0,0 +1,56 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from utils.incremental import IncrementalPortfolio
+from utils.simulation_engine import PortfolioSimulationEngine
+
+
+def test_full_event_stream_reproduces_engine():
+    rng = np.random.default_rng(8)
+    incomes = np.maximum(0, rng.normal(40000, 18000, (30, 15))).round()
+    principals = rng.uniform(100000, 800000, 30).round()
+    tenures = rng.integers(12, 60, 30)
+
+    engine = PortfolioSimulationEngine(incomes, principals, tenures)
+    book = IncrementalPortfolio(principals, tenures)
+    everyone = np.arange(30)
+    for month in range(incomes.shape[1]):
+        result = engine.step()
+        book.record_income(everyone, incomes[:, month])
+        book.run()
+        for key in ('risk', 'structure'):
+            for column, values in result[key].items():
+                np.testing.assert_array_equal(book.decisions[key][column], values)
+        book.record_payment(everyone)
+        np.testing.assert_allclose(book.principal, engine.principal)
+        np.testing.assert_array_equal(book.tenure, engine.tenure)
+
+
+def test_only_changed_accounts_are_reevaluated():
+    book = IncrementalPortfolio(300000, 24, n_borrowers=1000)
+    book.record_income(np.arange(1000), np.full(1000, 50000.0))
+    first = book.run()
+    assert len(first['structure']) == 1000
+    # The adopted EMIs are re-scored once; nothing else is stale
+    settle = book.run()
+    assert len(settle['forecast']) == len(settle['structure']) == 0 and len(settle['risk']) == 1000
+    assert len(book.pending()) == 0
+    snapshot = {key: column.copy() for key, column in book.decisions['structure'].items()}
+
+    # A quiet day: three income events, one payment, one missed payment
+    book.record_income([3, 7, 9], [20000.0, 90000.0, 0.0])
+    book.record_payment([500])
+    book.record_missed_payment([42])
+    refreshed = book.run()
+    assert list(refreshed['forecast']) == [3, 7, 9]
+    assert set(refreshed['structure']) == {3, 7, 9, 500}
+    assert set(refreshed['risk']) == {3, 7, 9, 42}
+
+    untouched = np.setdiff1d(np.arange(1000), refreshed['structure'])
+    for key, column in book.decisions['structure'].items():
+        np.testing.assert_array_equal(column[untouched], snapshot[key][untouched])
+    assert book.decision(42)['risk']['breakdown']['Missed Payments'] == 15
+    assert book.stats()['evaluated']['risk'] == 2004
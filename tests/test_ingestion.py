@@ -0,0 +1,96 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from utils.ingestion import load_income_matrix, iter_income_records
+
+
+def _write_history(path):
+    # Borrower 20 starts late and skips a month; one income value is unparseable
+    frame = pd.DataFrame({
+        'borrower_id': [20, 10, 10, 10, 20, 20],
+        'month': [3, 1, 2, 3, 5, 4],
+        'income': ['40000', '50000', 'n/a', '52000.5', '41000', '']
+    })
+    frame.to_csv(path, index=False)
+    return frame
+
+
+def test_csv_is_streamed_into_a_ragged_matrix(tmp_path):
+    source = str(tmp_path / 'incomes.csv')
+    _write_history(source)
+
+    matrix, ids, first_month = load_income_matrix(source, chunksize=2)
+    np.testing.assert_array_equal(ids, [10, 20])
+    assert first_month == 1
+    expected = np.array([
+        [50000, np.nan, 52000.5, np.nan, np.nan],
+        [np.nan, np.nan, 40000, np.nan, 41000]
+    ])
+    np.testing.assert_array_equal(matrix, expected)
+
+    chunk = next(iter_income_records(source, chunksize=3))
+    assert chunk['income'].dtype == np.float64 and chunk['month'].dtype == np.int64
+
+
+def test_memmap_cache_is_reused(tmp_path):
+    source = str(tmp_path / 'incomes.parquet')
+    frame = _write_history(str(tmp_path / 'unused.csv'))
+    frame['income'] = pd.to_numeric(frame['income'], errors='coerce')
+    frame.to_parquet(source)
+
+    cache = str(tmp_path / 'incomes.npy')
+    matrix, ids, _ = load_income_matrix(source, cache_path=cache, chunksize=4)
+    assert isinstance(matrix, np.memmap)
+
+    os.remove(source)
+    open(source, 'w').close()
+    os.utime(source, (0, 0))
+    cached, cached_ids, first_month = load_income_matrix(source, cache_path=cache)
+    np.testing.assert_array_equal(cached, matrix)
+    np.testing.assert_array_equal(cached_ids, ids)
+    assert first_month == 1
+
+
+def test_blank_months_are_dropped_and_ids_keep_their_spelling(tmp_path):
+    source = str(tmp_path / 'incomes.csv')
+    with open(source, 'w') as f:
+        f.write('borrower_id,month,income\n007,1,100\n7,1,200\n2,,200\n007,2,300\n')
+
+    # The first chunk holds only numeric-looking ids; the kind is still decided for the whole file
+    matrix, ids, first_month = load_income_matrix(source, chunksize=2)
+    np.testing.assert_array_equal(ids, ['007', '7'])
+    assert first_month == 1
+    np.testing.assert_array_equal(matrix, [[100, 300], [200, np.nan]])
+
+
+def test_mixed_month_kinds_name_the_column(tmp_path):
+    source = str(tmp_path / 'incomes.csv')
+    with open(source, 'w') as f:
+        f.write('id,period,income\n1,3,100\n1,2024-01,200\n')
+
+    try:
+        load_income_matrix(source, chunksize=1, borrower_col='id', month_col='period')
+    except ValueError as exc:
+        assert "'period'" in str(exc)
+    else:
+        raise AssertionError('mixed month kinds were accepted')
+
+
+def test_cache_is_rebuilt_for_other_columns_or_dtype(tmp_path):
+    source = str(tmp_path / 'incomes.csv')
+    frame = _write_history(source)
+    frame.rename(columns={'income': 'salary'}).assign(income=0).to_csv(source, index=False)
+
+    cache = str(tmp_path / 'incomes.npy')
+    default, _, _ = load_income_matrix(source, cache_path=cache)
+    assert np.nanmax(default) == 0
+
+    salary, _, _ = load_income_matrix(source, cache_path=cache, income_col='salary')
+    assert np.nanmax(salary) == 52000.5
+
+    narrow, _, _ = load_income_matrix(source, cache_path=cache, income_col='salary', dtype=np.float32)
+    assert narrow.dtype == np.float32 and np.nanmax(narrow) == np.float32(52000.5)
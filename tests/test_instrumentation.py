@@ -0,0 +1,67 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from agents.risk_agent import RiskIntelligenceAgent
+from agents.structuring_agent import LoanStructuringAgent
+from utils.instrumentation import AgentMetrics, instrument, uninstrument
+from utils.simulation_engine import PortfolioSimulationEngine
+
+
+def test_scalar_agents_are_counted_and_restored():
+    metrics = AgentMetrics()
+    structuring = LoanStructuringAgent(interest_rate_annual=0)
+    risk = RiskIntelligenceAgent()
+    instrument(metrics, structuring, risk)
+
+    structuring.structure_loan({'safe_income': 5000}, 400000, 30, 36)
+    risk.assess_risk({'safe_income': 0, 'volatility': 0}, 10000)
+
+    snapshot = metrics.snapshot()
+    assert snapshot['counters']['structuring_actions'] == {'Safeguard: Interest Only': 1}
+    assert snapshot['counters']['tenure_fallbacks'] == {'total': 1}
+    assert snapshot['counters']['risk_zones'] == {'Critical': 1}
+    assert snapshot['latency']['LoanStructuringAgent.structure_loan']['count'] == 1
+
+    uninstrument(structuring, risk)
+    assert 'structure_loan' not in vars(structuring)
+
+
+def test_engine_metrics_export():
+    metrics = AgentMetrics()
+    incomes = np.maximum(0, np.random.default_rng(1).normal(30000, 15000, (50, 6)))
+    engine = PortfolioSimulationEngine(incomes, 400000, 24)
+    instrument(metrics, engine)
+    engine.run()
+
+    counters = metrics.snapshot()['counters']
+    assert sum(counters['structuring_actions'].values()) == 50 * 6
+    assert sum(counters['risk_zones'].values()) == 50 * 6
+    text = metrics.to_prometheus()
+    assert 'safeloan_agent_call_seconds_count{method="LoanStructuringAgent.structure_batch"} 6' in text
+    assert 'safeloan_agent_call_seconds_bucket{method="RollingForecastState.update",le="+Inf"} 6' in text
+
+
+def test_batch_fallback_counts_match_scalar_calls_under_a_rate_override():
+    rng = np.random.default_rng(8)
+    safe_incomes = rng.uniform(0, 60000, 40)
+    principals = rng.uniform(-1000, 800000, 40)
+    # The agent's own rate is 12%; the batch overrides it with zero for half the rows
+    rates = np.where(np.arange(40) % 2, 0.0, 0.12 / 12)
+
+    batch_metrics, scalar_metrics = AgentMetrics(), AgentMetrics()
+    agent = LoanStructuringAgent()
+    instrument(batch_metrics, agent)
+    agent.structure_batch({'safe_income': safe_incomes}, principals, 30, 36, interest_rate_monthly=rates)
+
+    scalar = {rate: LoanStructuringAgent(interest_rate_annual=rate * 12) for rate in (0.0, 0.12 / 12)}
+    instrument(scalar_metrics, *scalar.values())
+    for safe_income, principal, rate in zip(safe_incomes, principals, rates):
+        scalar[rate].structure_loan({'safe_income': safe_income}, principal, 30, 36)
+
+    batch, expected = batch_metrics.snapshot()['counters'], scalar_metrics.snapshot()['counters']
+    assert expected['tenure_fallbacks']['total'] > 0
+    assert batch['tenure_fallbacks'] == expected['tenure_fallbacks']
+    assert batch['structuring_actions'] == expected['structuring_actions']
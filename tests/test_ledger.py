@@ -0,0 +1,60 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+
+import numpy as np
+
+from agents.contract_agent import ContractEvolutionAgent
+from agents.structuring_agent import ACTION_MAINTAIN, ACTION_EXTEND_TENURE, ACTION_ADJUST_TENURE
+from utils.ledger import ContractLedger
+
+
+def _contracts(n):
+    codes = np.array([ACTION_MAINTAIN, ACTION_EXTEND_TENURE, ACTION_ADJUST_TENURE])[np.arange(n) % 3]
+    return ContractEvolutionAgent().generate_batch(codes, 1000.0 + np.arange(n), np.full(n, 30))
+
+
+def test_monthly_bulk_writes_and_indexed_reads(tmp_path):
+    ledger = ContractLedger(str(tmp_path / 'ledger.db'))
+    for month in (1, 2, 3):
+        assert ledger.record_month(month, range(30), _contracts(30)) == 30
+
+    trail = ledger.borrower_history(4)
+    assert [row['month'] for row in trail] == [1, 2, 3]
+    assert trail[0]['event_type'] == 'Relief'
+    assert trail[0]['message'] == "Preventive Restructuring Triggered: EMI reduced to ₹1004.0 to mitigate default risk."
+    assert trail[0]['contract_id'] == 'CTR-RELIEF-30'
+
+    relief = ledger.events(month=2, event_type='Relief')
+    assert len(relief) == 10 and all(row['month'] == 2 for row in relief)
+    assert ledger.count(event_type='Stable') == 30
+
+    assert ledger.count(month=3) == 30 and len(ledger.events(month=3)) == 30
+
+    with ledger.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM contract_events WHERE month = ? AND event_type = ? ORDER BY month, borrower_id",
+            (2, 1)
+        ).fetchall()
+        assert [row[3] for row in plan] == [
+            'SEARCH contract_events USING INDEX idx_events_type_month_borrower (event_type=? AND month=?)'
+        ]
+    ledger.close()
+
+
+def test_pooled_connections_across_threads(tmp_path):
+    ledger = ContractLedger(str(tmp_path / 'ledger.db'), pool_size=2)
+    writers = [
+        threading.Thread(target=ledger.record_month, args=(month, range(50), _contracts(50)))
+        for month in range(1, 7)
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    assert ledger.count() == 300
+    assert ledger._created <= 2
+    ledger.close()
@@ -0,0 +1,59 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from agents.cashflow_agent import CashflowForecastingAgent
+from agents.structuring_agent import LoanStructuringAgent
+from utils.decision_service import DecisionService
+from utils.memoized_pipeline import LRUCache, MemoizedPipeline
+
+
+def test_pipeline_matches_agents_and_serves_duplicates():
+    pipeline = MemoizedPipeline(CashflowForecastingAgent(lookback_period=3), maxsize=128)
+    reference = MemoizedPipeline(maxsize=0)
+    rng = np.random.default_rng(5)
+    for _ in range(3):
+        for i in range(30):
+            # Older months outside the lookback window must not change the key
+            history = [float(rng.integers(1000, 90000))] + [60000.0, 60000.0, 40000.0 + 1000 * (i % 5)]
+            decision = pipeline.decide(history, 15000, 300000, 24, 36, missed_payments=i % 2)
+            assert decision == reference.decide(history, 15000, 300000, 24, 36, missed_payments=i % 2)
+
+    stats = pipeline.stats()
+    assert stats['forecast']['size'] == 5
+    assert stats['forecast']['misses'] == 5 and stats['forecast']['hits'] == 85
+    assert stats['hit_rate'] > 0.9
+
+
+def test_structure_key_tracks_policy_and_lru_bounds():
+    structuring = LoanStructuringAgent()
+    pipeline = MemoizedPipeline(structuring_agent=structuring, maxsize=2)
+    before = pipeline.decide([20000, 20000, 20000], 9000, 300000, 24, 24)
+    structuring.target_dti = 0.6
+    after = pipeline.decide([20000, 20000, 20000], 9000, 300000, 24, 24)
+    assert after['structure'] != before['structure']
+
+    cache = LRUCache(maxsize=2)
+    for key in 'abc':
+        cache.put(key, key.upper())
+    assert cache.get('a') is None and cache.get('c') == 'C'
+    assert cache.stats()['evictions'] == 1
+
+
+def test_ragged_nan_histories_match_the_uncached_batch_path():
+    rng = np.random.default_rng(9)
+    requests = []
+    for i in range(40):
+        history = rng.integers(5000, 90000, 2 + i % 6).astype(float)
+        history[rng.random(len(history)) < 0.3] = np.nan
+        requests.append({
+            'income_history': history.tolist(), 'emi': 15000.0, 'principal': 300000.0,
+            'tenure': 24, 'original_tenure': 36, 'missed_payments': i % 2
+        })
+    uncached = DecisionService().decide_batch(requests)
+    cached = DecisionService(cache_size=64).decide_batch(requests)
+    for plain, memoized in zip(uncached, cached):
+        for stage in ('forecast', 'risk', 'structure'):
+            assert memoized[stage] == plain[stage]
@@ -0,0 +1,23 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from utils.monte_carlo import run_monte_carlo
+
+
+def test_sharded_run_matches_single_process():
+    single = run_monte_carlo(n_scenarios=60, months=12, workers=1, return_paths=True)
+    pooled = run_monte_carlo(n_scenarios=60, months=12, workers=2, shard_size=25, return_paths=True)
+
+    np.testing.assert_allclose(pooled['distress'], single['distress'])
+    np.testing.assert_array_equal(pooled['shortfall_months'], single['shortfall_months'])
+    for profile, summary in single['profiles'].items():
+        assert pooled['profiles'][profile]['defaults'] == summary['defaults']
+        assert pooled['profiles'][profile]['action_mix'] == summary['action_mix']
+
+    overall = single['overall']
+    assert overall['paths'] == 180
+    assert sum(overall['distress_histogram']) == 180
+    assert sum(overall['action_mix'].values()) == 180 * 12
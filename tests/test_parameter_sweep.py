@@ -0,0 +1,59 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from agents.structuring_agent import LoanStructuringAgent
+from utils.parameter_sweep import SWEEP_METRICS, run_parameter_sweep
+from utils.simulation_engine import PortfolioSimulationEngine
+
+
+def test_sweep_matches_one_engine_run_per_setting():
+    rng = np.random.default_rng(11)
+    incomes = np.maximum(0, rng.normal(40000, 20000, (40, 18))).round()
+    incomes[rng.random(incomes.shape) < 0.1] = np.nan
+    principals = rng.uniform(100000, 800000, 40).round()
+    tenures = rng.integers(12, 60, 40)
+
+    sweep = run_parameter_sweep(incomes, principals, tenures, target_dti=(0.3, 0.45),
+                                interest_rate_annual=(0.0, 0.12, 0.18), tenure_cap_multiple=(1.5, 2))
+    assert sweep.cube.shape == (12, 40, len(SWEEP_METRICS))
+
+    for s in range(sweep.n_settings):
+        setting = sweep.setting(s)
+        engine = PortfolioSimulationEngine(incomes, principals, tenures, target_dti=setting['target_dti'],
+                                           interest_rate_annual=setting['interest_rate_annual'])
+        engine.structuring_agent.tenure_cap_multiple = setting['tenure_cap_multiple']
+        engine.run()
+        np.testing.assert_allclose(sweep.metric('distress')[s], engine.distress)
+        np.testing.assert_allclose(sweep.metric('principal')[s], engine.principal)
+        np.testing.assert_array_equal(sweep.metric('tenure')[s], engine.tenure)
+        np.testing.assert_array_equal(sweep.metric('shortfall_months')[s], engine.shortfall_months)
+
+
+def test_summary_and_tidy_frame():
+    incomes = np.maximum(0, np.random.default_rng(4).normal(30000, 15000, (10, 12))).round()
+    sweep = run_parameter_sweep(incomes, 400000, 24, target_dti=(0.2, 0.6), default_after=2)
+    summary = sweep.summary()
+    assert [row['target_dti'] for row in summary] == [0.2, 0.6]
+    assert summary[0]['defaults'] == int((sweep.metric('shortfall_months')[0] >= 2).sum())
+
+    frame = sweep.to_frame()
+    assert len(frame) == 2 * 10 * len(SWEEP_METRICS)
+    row = frame[(frame.setting == 1) & (frame.borrower == 3) & (frame.metric == 'distress')]
+    assert row['value'].iloc[0] == sweep.metric('distress')[1, 3]
+
+
+def test_structure_batch_policy_overrides_broadcast():
+    agent = LoanStructuringAgent()
+    forecast = {'safe_income': np.array([60000.0, 20000.0, 5000.0])}
+    principal, tenure = np.array([300000.0, 300000.0, 300000.0]), np.array([24, 24, 24])
+    grid = agent.structure_batch(forecast, principal, tenure, 24, target_dti=np.array([[0.3], [0.5]]),
+                                 interest_rate_monthly=np.array([[0.12 / 12], [0.0]]))
+    assert grid['new_emi'].shape == (2, 3)
+    for row, (dti, rate) in enumerate(((0.3, 0.12), (0.5, 0.0))):
+        single = LoanStructuringAgent(target_dti=dti, interest_rate_annual=rate)
+        expected = single.structure_batch(forecast, principal, tenure, 24)
+        for key in expected:
+            np.testing.assert_array_equal(grid[key][row], expected[key])
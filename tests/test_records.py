@@ -0,0 +1,45 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import pickle
+
+import pytest
+
+from agents.cashflow_agent import CashflowForecastingAgent
+from agents.risk_agent import RiskIntelligenceAgent
+from agents.records import RiskAssessment
+from benchmarks.bench_memory import run_memory_benchmarks
+
+
+def test_records_are_immutable_dict_views():
+    forecast = CashflowForecastingAgent().forecast_income([50000, 52000, 48000, 30000])
+    risk = RiskIntelligenceAgent().assess_risk(forecast, 15000)
+
+    assert forecast.safe_income == forecast['safe_income'] == 33764.87
+    assert risk['breakdown']['Affordability Stress'] == risk.breakdown.affordability_stress == 44
+    assert dict(risk)['zone'] == 'Watch' and risk.get('missing', 'default') == 'default'
+    assert risk == {
+        'risk_score': 55, 'status': 'Watch', 'zone': 'Watch', 'zone_color': 'orange',
+        'breakdown': {'Affordability Stress': 44, 'Income Volatility': 11, 'Missed Payments': 0}
+    }
+    assert not hasattr(risk, '__dict__')
+    with pytest.raises(AttributeError):
+        risk.risk_score = 0
+
+    assert json.loads(json.dumps(risk.to_dict()))['breakdown']['Income Volatility'] == 11
+    assert pickle.loads(pickle.dumps(risk)) == risk
+
+
+def test_unset_fields_are_absent_from_the_view():
+    critical = RiskAssessment(100, 'Critical')
+    assert dict(critical) == {'risk_score': 100, 'status': 'Critical'}
+    assert 'zone' not in critical and critical.get('zone', 'Unknown') == 'Unknown'
+    with pytest.raises(KeyError):
+        critical['breakdown']
+
+
+def test_records_use_less_memory_than_dicts():
+    results = run_memory_benchmarks(200)
+    assert all(result['records'] < result['dicts'] for result in results.values())
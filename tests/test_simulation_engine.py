@@ -0,0 +1,76 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from agents.cashflow_agent import CashflowForecastingAgent
+from agents.risk_agent import RiskIntelligenceAgent
+from agents.structuring_agent import LoanStructuringAgent
+from utils.ledger import ContractLedger
+from utils.simulation_engine import PortfolioSimulationEngine
+
+
+def _scalar_run(incomes, principal, tenure, target_dti):
+    """The original one-borrower dashboard loop, month by month."""
+    cashflow = CashflowForecastingAgent()
+    risk = RiskIntelligenceAgent()
+    structuring = LoanStructuringAgent(target_dti=target_dti)
+    remaining_principal, remaining_tenure = principal, tenure
+    current_emi = (principal / tenure) * 1.1
+    distress = 0
+    rows = []
+    for month in range(1, len(incomes) + 1):
+        forecast = cashflow.forecast_income(incomes[:month])
+        risk_state = risk.assess_risk(forecast, current_emi)
+        structure = structuring.structure_loan(forecast, remaining_principal, remaining_tenure, original_tenure=tenure)
+        remaining_principal = max(0, remaining_principal - (structure['new_emi'] * 0.7))
+        remaining_tenure = structure['new_tenure'] - 1 if structure['new_tenure'] < 999 else 999
+        current_emi = structure['new_emi']
+        distress += max(0, structure['new_emi'] - incomes[month - 1])
+        rows.append((risk_state['risk_score'], structure['action_taken'], structure['new_emi'], distress))
+    return rows, remaining_principal
+
+
+def test_engine_matches_dashboard_loop():
+    rng = np.random.default_rng(2)
+    incomes = np.maximum(0, rng.normal(40000, 18000, (25, 24))).round()
+    principals = rng.uniform(100000, 800000, 25).round()
+    tenures = rng.integers(12, 60, 25)
+
+    engine = PortfolioSimulationEngine(incomes, principals, tenures, target_dti=0.35)
+    results = []
+    engine.run(on_step=results.append)
+    assert engine.is_complete and engine.step() is None
+
+    for i in range(len(incomes)):
+        expected, final_principal = _scalar_run(incomes[i].tolist(), principals[i], int(tenures[i]), 0.35)
+        for month_result, (score, action, emi, distress) in zip(results, expected):
+            decision = engine.decision(month_result, i)
+            assert decision['risk']['risk_score'] == score
+            assert decision['structure']['action_taken'] == action
+            assert decision['structure']['new_emi'] == emi
+        assert np.isclose(engine.distress[i], distress)
+        assert np.isclose(engine.principal[i], final_principal)
+
+
+def test_engine_skips_months_without_income():
+    incomes = np.array([[30000, np.nan, 31000, 29000]])
+    engine = PortfolioSimulationEngine(incomes, 200000, 24)
+    engine.run(months=2)
+    assert engine.month == 2
+    assert engine.forecast_state.counts[0] == 1
+    assert engine.shortfall_months[0] == 0
+
+
+def test_engine_writes_monthly_contracts_to_ledger(tmp_path):
+    incomes = np.maximum(0, np.random.default_rng(6).normal(30000, 15000, (20, 5))).round()
+    ledger = ContractLedger(str(tmp_path / 'ledger.db'))
+    engine = PortfolioSimulationEngine(incomes, 300000, 24, ledger=ledger)
+    results = []
+    engine.run(on_step=results.append)
+
+    assert ledger.count() == 20 * 5
+    trail = ledger.borrower_history(7)
+    assert [entry['message'] for entry in trail] == [engine.decision(r, 7)['contract']['message'] for r in results]
+    ledger.close()
@@ -0,0 +1,57 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import plotly.graph_objects as go
+
+from utils.visuals import (
+    lttb_indices, minmax_indices, scatter_trace, bar_trace, plot_zone_mix, risk_density, risk_score_histogram, RISK_BINS
+)
+
+
+def test_downsampling_keeps_endpoints_and_extremes():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=100_000)
+    y[54_321] = 50.0
+
+    kept = lttb_indices(np.arange(len(y)), y, 500)
+    assert len(kept) == 500 and kept[0] == 0 and kept[-1] == len(y) - 1
+    assert np.all(np.diff(kept) > 0) and 54_321 in kept
+
+    kept = minmax_indices(y, 500)
+    assert len(kept) <= 500 and 54_321 in kept and np.argmin(y) in kept
+
+
+def test_traces_switch_to_webgl_only_for_long_series():
+    short = scatter_trace(np.arange(36), np.ones(36), mode='lines')
+    assert isinstance(short, go.Scatter) and len(short.y) == 36
+
+    long = scatter_trace(np.arange(200_000), np.sin(np.arange(200_000) / 100.0), mode='lines')
+    assert isinstance(long, go.Scattergl) and len(long.y) == 2000
+
+    assert isinstance(bar_trace(np.arange(12), np.ones(12)), go.Bar)
+    # Long bar series become a downsampled line, small enough to stay on SVG
+    filled = bar_trace(np.arange(50_000), np.arange(50_000) % 97, marker_color='red')
+    assert isinstance(filled, go.Scatter) and len(filled.y) <= 1000 and filled.y.max() == 96
+
+
+def test_long_zone_mix_still_stacks():
+    months = np.arange(5000)
+    counts = np.random.default_rng(2).integers(0, 50, size=(5000, 3))
+    fig = plot_zone_mix(months, counts)
+
+    assert all(trace.stackgroup == 'zones' and trace.fill is None for trace in fig.data)
+    np.testing.assert_array_equal(fig.data[0].x, fig.data[-1].x)
+    assert len(fig.data[0].x) <= 1000
+    assert all(isinstance(trace, go.Bar) for trace in plot_zone_mix(months[:24], counts[:24]).data)
+
+
+def test_risk_density_matches_per_month_histograms():
+    scores = np.random.default_rng(1).integers(0, 101, size=(5000, 24))
+    density = risk_density(scores)
+
+    assert density.shape == (len(RISK_BINS) - 1, 24)
+    for month in (0, 11, 23):
+        np.testing.assert_array_equal(density[:, month], risk_score_histogram(scores[:, month]))
+    assert density.sum() == scores.size
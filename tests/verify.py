@@ -27,7 +27,7 @@ def test_workflow():
     print(f"   Risk State: {risk_state}")
     
     print("3. Structuring Loan...")
-    structure = structuring.structure_loan(forecast, remaining_principal=400000, current_tenure=30)
+    structure = structuring.structure_loan(forecast, remaining_principal=400000, current_tenure=30, original_tenure=36)
     print(f"   New Structure: {structure}")
     
     print("4. Evolving Contract...")
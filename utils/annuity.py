@@ -0,0 +1,99 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+
+def _growth(r, n):
+    return (1 + r)**n
+
+def _log_growth(r):
+    return math.log(1 + r)
+
+class AnnuityFactorCache:
+    """
+    Bounded LRU cache of annuity growth factors keyed by (monthly rate, n).
+    
+    A portfolio only uses a handful of (rate, tenure) pairs, so the (1 + r)**n powers
+    behind every PMT and the log(1 + r) behind every tenure calculation are computed
+    once and shared by the structuring agent and the comparison module. The scalar
+    lookups are functools.lru_cache wrappers (C implementation, thread-safe), so a hit
+    costs less than recomputing the power.
+    """
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        # growth(r, n) -> (1 + r)**n, computed at most once per (r, n) while cached
+        self.growth = lru_cache(maxsize=maxsize)(_growth)
+        # log_growth(r) -> log(1 + r), the denominator of the closed-form tenure
+        self.log_growth = lru_cache(maxsize=maxsize)(_log_growth)
+
+    def growth_array(self, r, n):
+        """
+        Vector lookup of (1 + r)**n: one cache access per distinct n in the array.
+        An array of rates is broadcast against n and looked up one distinct rate at a time.
+        """
+        n = np.asarray(n)
+        if np.ndim(r):
+            r, n = np.broadcast_arrays(np.asarray(r, dtype=np.float64), n)
+            growth = np.empty(r.shape)
+            for rate in np.unique(r).tolist():
+                selected = r == rate
+                growth[selected] = self.growth_array(rate, n[selected])
+            return growth
+        distinct, inverse = np.unique(n, return_inverse=True)
+        table = np.array([self.growth(r, value) for value in distinct.tolist()], dtype=np.float64)
+        return table[inverse].reshape(n.shape)
+
+    def log_growth_array(self, r):
+        """
+        log(1 + r) for a scalar rate or elementwise for an array of rates.
+        """
+        if not np.ndim(r):
+            return self.log_growth(r)
+        r = np.asarray(r, dtype=np.float64)
+        distinct, inverse = np.unique(r, return_inverse=True)
+        table = np.array([self.log_growth(value) for value in distinct.tolist()], dtype=np.float64)
+        return table[inverse].reshape(r.shape)
+
+    def payment(self, p, r, n):
+        """
+        Standard EMI formula: P * r * (1+r)^n / ((1+r)^n - 1).
+        """
+        if r == 0: return p / n
+        growth = self.growth(r, n)
+        return p * r * growth / (growth - 1)
+
+    def tenure(self, p, r, emi):
+        """
+        Months needed to repay p at the given EMI; 999 when the EMI never amortizes the loan.
+        """
+        if emi <= p * r:
+            return 999 # Perpetual
+        try:
+            # Formula for n = -log(1 - (r*P)/EMI) / log(1+r)
+            numerator = -math.log(1 - (r * p) / emi)
+            return math.ceil(numerator / self.log_growth(r))
+        except (ValueError, ZeroDivisionError, OverflowError):
+            return 999
+
+    def stats(self):
+        infos = (self.growth.cache_info(), self.log_growth.cache_info())
+        hits = sum(info.hits for info in infos)
+        misses = sum(info.misses for info in infos)
+        size = sum(info.currsize for info in infos)
+        return {
+            'size': size,
+            'maxsize': self.maxsize,
+            'hits': hits,
+            'misses': misses,
+            # Every miss inserts one entry, so entries missing from the cache were evicted
+            'evictions': misses - size,
+            'hit_rate': (hits / (hits + misses)) if hits + misses else 0.0
+        }
+
+    def clear(self):
+        self.growth.cache_clear()
+        self.log_growth.cache_clear()
+
+
+# Process-wide cache shared by the agents and the comparison logic
+ANNUITY_CACHE = AnnuityFactorCache()
@@ -0,0 +1,178 @@
+import threading
+import time
+
+import numpy as np
+
+from agents.risk_agent import ZONES
+from utils.comparison_logic import FixedLoanBaseline
+from utils.data_generator import iter_income_blocks
+from utils.simulation_engine import PortfolioSimulationEngine
+
+# Lifecycle of a background run
+PENDING, RUNNING, DONE, CANCELLED, FAILED = 'pending', 'running', 'done', 'cancelled', 'failed'
+
+class BackgroundPortfolioRun:
+    """
+    Multi-borrower, multi-month simulation on a daemon worker thread.
+
+    The cohort is streamed in blocks of `block_size` borrowers (iter_income_blocks), so
+    memory stays at one block's income matrix whatever the cohort size. The worker advances
+    the headless engine and the fixed-EMI baseline one month at a time and folds each
+    month's aggregates (zone mix, distress totals, defaults avoided) into the run totals
+    under a lock, so a UI can poll snapshot() on its own schedule and see every month as
+    soon as it is simulated. cancel() stops the worker at the next month boundary; an
+    optional `alive` callable (e.g. "is the browser session still connected") stops it
+    once it has returned False for `grace_seconds`. The vectorized month step spends most
+    of its time in NumPy, which releases the GIL, so the polling thread stays responsive.
+    """
+    def __init__(self, n_borrowers, months, profile=None, principal=500000, tenure=36,
+                 target_dti=0.40, interest_rate_annual=0.12, seed=42, block_size=65536,
+                 alive=None, grace_seconds=30.0):
+        self.n_borrowers = n_borrowers
+        self.months = months
+        self.profile = profile
+        self.principal = principal
+        self.tenure = tenure
+        self.target_dti = target_dti
+        self.interest_rate_annual = interest_rate_annual
+        self.seed = seed
+        self.block_size = block_size
+        self.alive = alive
+        self.grace_seconds = grace_seconds
+
+        self.status = PENDING
+        self.error = None
+        # Borrowers of finished blocks, and the rows / months done of the block in flight
+        self._finished_rows = 0
+        self._block_rows = 0
+        self._block_month = 0
+        self._started = None
+        self._finished = None
+        self._orphaned = None
+        # Per-month aggregates over every borrower that reached the month, filled in place by the worker
+        self._zone_counts = np.zeros((months, len(ZONES)), dtype=np.int64)
+        self._distress = np.zeros(months)
+        self._fixed_distress = np.zeros(months)
+        self._fixed_defaults = np.zeros(months, dtype=np.int64)
+        self._shortfalls = np.zeros(months, dtype=np.int64)
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def is_running(self):
+        return self.status in (PENDING, RUNNING) and self._thread is not None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='portfolio-simulation', daemon=True)
+            self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.is_running
+
+    def snapshot(self):
+        """
+        Consistent copy of the progress so far.
+
+        Returns:
+            dict: 'status', 'error', 'month' (months in the series), 'months', 'borrowers'
+                (borrowers counted in the last series month), 'n_borrowers', 'progress',
+                'elapsed', the latest 'zone_mix' ({zone: borrowers}), running totals
+                'distress_total', 'fixed_distress_total', 'defaults_avoided' (missed
+                fixed-EMI payments) and 'safeloan_shortfalls', plus per-month 'series'
+                arrays for progressive charts. Each series month counts every borrower
+                simulated through it, so while a later block is in flight its earlier
+                months already include part of that block.
+        """
+        with self._lock:
+            # Once a block has finished, every month has data for its borrowers
+            month = self.months if self._finished_rows else self._block_month
+            borrowers = self._finished_rows or (self._block_rows if month else 0)
+            done = self._finished_rows + self._block_rows * self._block_month / max(1, self.months)
+            end = self._finished or time.perf_counter()
+            series = {
+                'month': np.arange(1, month + 1),
+                'zone_counts': self._zone_counts[:month].copy(),
+                'distress': self._distress[:month].copy(),
+                'fixed_distress': self._fixed_distress[:month].copy()
+            }
+            last = month - 1
+            return {
+                'status': self.status,
+                'error': self.error,
+                'month': month,
+                'months': self.months,
+                'borrowers': borrowers,
+                'n_borrowers': self.n_borrowers,
+                'progress': min(1.0, done / self.n_borrowers) if self.n_borrowers else 1.0,
+                'elapsed': (end - self._started) if self._started else 0.0,
+                'zone_mix': dict(zip(ZONES, self._zone_counts[last].tolist() if month else [0] * len(ZONES))),
+                'distress_total': float(self._distress[last]) if month else 0.0,
+                'fixed_distress_total': float(self._fixed_distress[last]) if month else 0.0,
+                'defaults_avoided': int(self._fixed_defaults[last]) if month else 0,
+                'safeloan_shortfalls': int(self._shortfalls[last]) if month else 0,
+                'series': series
+            }
+
+    def _run(self):
+        with self._lock:
+            self.status = RUNNING
+            self._started = time.perf_counter()
+        try:
+            blocks = iter_income_blocks(self.n_borrowers, self.months, profile=self.profile,
+                                        seed=self.seed, block_size=self.block_size)
+            for start, incomes in blocks:
+                engine = PortfolioSimulationEngine(
+                    incomes, self.principal, self.tenure,
+                    target_dti=self.target_dti, interest_rate_annual=self.interest_rate_annual
+                )
+                baseline = FixedLoanBaseline(self.principal, self.tenure, self.interest_rate_annual)
+                with self._lock:
+                    self._block_rows, self._block_month = len(incomes), 0
+                while not engine.is_complete:
+                    orphaned = self._is_orphaned()
+                    if orphaned or self._cancel.is_set():
+                        self._finish(CANCELLED, 'Session closed' if orphaned else None)
+                        return
+                    result = engine.step()
+                    fixed = baseline.advance(result['income'])
+                    zone_counts = np.bincount(result['risk']['zone_code'], minlength=len(ZONES))
+                    with self._lock:
+                        m = result['month'] - 1
+                        self._zone_counts[m] += zone_counts
+                        self._distress[m] += engine.distress.sum()
+                        self._fixed_distress[m] += np.sum(fixed['Fixed_Distress'])
+                        self._fixed_defaults[m] += np.sum(baseline.missed_payments_count)
+                        self._shortfalls[m] += engine.shortfall_months.sum()
+                        self._block_month = result['month']
+                with self._lock:
+                    self._finished_rows = start + len(incomes)
+                    self._block_rows, self._block_month = 0, 0
+            self._finish(DONE)
+        except Exception as exc: # reported through snapshot() instead of dying silently
+            self._finish(FAILED, f'{type(exc).__name__}: {exc}')
+
+    def _is_orphaned(self):
+        """
+        True once alive() has kept returning False for grace_seconds (brief disconnects pass).
+        """
+        if self.alive is None or self.alive():
+            self._orphaned = None
+            return False
+        now = time.perf_counter()
+        if self._orphaned is None:
+            self._orphaned = now
+        return now - self._orphaned >= self.grace_seconds
+
+    def _finish(self, status, error=None):
+        with self._lock:
+            self.status = status
+            self.error = error
+            self._finished = time.perf_counter()
@@ -1,54 +1,199 @@
-def calculate_fixed_loan_trajectory(income_history, initial_principal, initial_tenure, interest_rate_annual=0.12):
+import numpy as np
+
+from utils.annuity import ANNUITY_CACHE
+
+class FixedLoanBaseline:
     """
-    Simulates a traditional fixed EMI loan against the same income history.
+    Resumable state of the traditional fixed-EMI loan, advanced one month at a time.
     
-    Returns:
-        list of dicts: Snapshot of fixed loan state [Month, Balance, Distress_Accumulated]
+    Fields may be scalars (one borrower) or arrays (one entry per borrower); either way a
+    month costs O(1) per borrower and the state round-trips through to_dict/from_dict, so
+    callers never have to replay the income history.
     """
-    r = interest_rate_annual / 12
-    # Calculate Fixed EMI once
-    fixed_emi = (initial_principal * r * ((1+r)**initial_tenure)) / (((1+r)**initial_tenure) - 1)
-    
-    balance = initial_principal
-    history = []
-    default_count = 0
-    distress_balance = 0 
-    penalties = 0
-    consecutive_defaults = 0
-    missed_payments_count = 0
-    
-    for i, income in enumerate(income_history):
-        month = i + 1
+    STATE_FIELDS = ('month', 'balance', 'distress_balance', 'penalties', 'consecutive_defaults', 'missed_payments_count')
+
+    def __init__(self, initial_principal, initial_tenure, interest_rate_annual=0.12):
+        self.initial_principal = initial_principal
+        self.initial_tenure = initial_tenure
+        self.interest_rate_annual = interest_rate_annual
+        self.r = interest_rate_annual / 12
+        # Calculate Fixed EMI once
+        if np.ndim(initial_principal) or np.ndim(initial_tenure):
+            principal = np.asarray(initial_principal, dtype=np.float64)
+            growth = ANNUITY_CACHE.growth_array(self.r, initial_tenure) if self.r else None
+            self.fixed_emi = principal / initial_tenure if growth is None else principal * self.r * growth / (growth - 1)
+        else:
+            self.fixed_emi = ANNUITY_CACHE.payment(initial_principal, self.r, initial_tenure)
+        # One borrower advances with plain Python arithmetic (decided once, np.ndim is slow per month)
+        self._scalar = np.ndim(self.fixed_emi) == 0
+
+        self.month = 0
+        self.balance = initial_principal
+        self.distress_balance = 0
+        self.penalties = 0
+        self.consecutive_defaults = 0
+        self.missed_payments_count = 0
+
+    def advance(self, income):
+        """
+        Applies one month of income.
         
+        Returns:
+            dict: Snapshot of fixed loan state for the month (same keys as the trajectory rows).
+        """
+        fixed_emi = self.fixed_emi
+        if self._scalar and not isinstance(income, np.ndarray):
+            return self._advance_scalar(fixed_emi, income)
+        self.month += 1
+
         # Interest Component
-        interest = balance * r
+        interest = self.balance * self.r
         principal_comp = fixed_emi - interest
-        
-        balance -= principal_comp
-        if balance < 0: balance = 0
-        
+        self.balance = np.maximum(self.balance - principal_comp, 0)
+
+        # Check affordability
+        is_default = fixed_emi > income
+        shortfall = np.where(is_default, fixed_emi - income, 0)
+        # If surplus, pay down distress
+        self.distress_balance = np.where(
+            is_default,
+            self.distress_balance + shortfall,
+            np.maximum(0, self.distress_balance - (income - fixed_emi))
+        )
+        self.consecutive_defaults = np.where(is_default, self.consecutive_defaults + 1, 0)
+        self.missed_payments_count = self.missed_payments_count + is_default
+
+        # Simulated Penalty: 500 INR + 2% of shortfall
+        self.penalties = self.penalties + np.where(is_default, 500 + (shortfall * 0.02), 0)
+
+        return {
+            'Month': self.month,
+            'Fixed_Balance': self.balance,
+            'Fixed_Distress': self.distress_balance + self.penalties, # Total financial impact
+            'Fixed_EMI': fixed_emi,
+            'Is_Default': is_default
+        }
+
+    def _advance_scalar(self, fixed_emi, income):
+        # NumPy calls on Python scalars cost ~20x more per month than this plain arithmetic
+        self.month += 1
+        # Interest Component
+        interest = self.balance * self.r
+        principal_comp = fixed_emi - interest
+        self.balance = max(self.balance - principal_comp, 0)
+
         # Check affordability
-        if fixed_emi > income:
+        is_default = fixed_emi > income
+        if is_default:
             shortfall = fixed_emi - income
-            distress_balance += shortfall
-            consecutive_defaults += 1
-            missed_payments_count += 1
-            
+            self.distress_balance += shortfall
+            self.consecutive_defaults += 1
+            self.missed_payments_count += 1
             # Simulated Penalty: 500 INR + 2% of shortfall
-            penalty = 500 + (shortfall * 0.02)
-            penalties += penalty
+            self.penalties += 500 + (shortfall * 0.02)
         else:
             # If surplus, pay down distress
-            surplus = income - fixed_emi
-            distress_balance = max(0, distress_balance - surplus)
-            consecutive_defaults = 0
-            
-        history.append({
-            'Month': month,
-            'Fixed_Balance': balance,
-            'Fixed_Distress': distress_balance + penalties, # Total financial impact
+            self.distress_balance = max(0, self.distress_balance - (income - fixed_emi))
+            self.consecutive_defaults = 0
+
+        return {
+            'Month': self.month,
+            'Fixed_Balance': self.balance,
+            'Fixed_Distress': self.distress_balance + self.penalties, # Total financial impact
             'Fixed_EMI': fixed_emi,
-            'Is_Default': fixed_emi > income
-        })
-        
-    return history, missed_payments_count, penalties
+            'Is_Default': is_default
+        }
+
+    def to_dict(self):
+        """
+        Plain (JSON-serializable) snapshot of the state.
+        """
+        state = {
+            'initial_principal': np.asarray(self.initial_principal).tolist(),
+            'initial_tenure': np.asarray(self.initial_tenure).tolist(),
+            'interest_rate_annual': self.interest_rate_annual
+        }
+        for field in self.STATE_FIELDS:
+            state[field] = np.asarray(getattr(self, field)).tolist()
+        return state
+
+    @classmethod
+    def from_dict(cls, state):
+        baseline = cls(
+            _restore(state['initial_principal']),
+            _restore(state['initial_tenure']),
+            state['interest_rate_annual']
+        )
+        for field in cls.STATE_FIELDS:
+            setattr(baseline, field, _restore(state[field]))
+        return baseline
+
+def _restore(value):
+    return np.asarray(value) if isinstance(value, list) else value
+
+def calculate_fixed_loan_trajectory(income_history, initial_principal, initial_tenure, interest_rate_annual=0.12):
+    """
+    Simulates a traditional fixed EMI loan against the same income history.
+    
+    Returns:
+        list of dicts: Snapshot of fixed loan state [Month, Balance, Distress_Accumulated]
+    """
+    baseline = FixedLoanBaseline(initial_principal, initial_tenure, interest_rate_annual)
+    # One borrower: drive the baseline's plain-arithmetic step directly, skipping advance's dispatch
+    step, fixed_emi = baseline._advance_scalar, baseline.fixed_emi
+    history = [step(fixed_emi, income) for income in income_history]
+    return history, baseline.missed_payments_count, baseline.penalties
+
+def calculate_fixed_loan_batch(income_matrix, initial_principal, initial_tenure, interest_rate_annual=0.12):
+    """
+    Columnar version of calculate_fixed_loan_trajectory for a borrowers x months income matrix.
+    
+    The running distress paydown is the recursion d = max(0, d + EMI - income), which is
+    evaluated for all months at once as the cumulative shortfall minus its running minimum.
+    
+    Returns:
+        dict: {
+            'Month': (months,) array,
+            'Fixed_Balance', 'Fixed_Distress', 'Is_Default': (borrowers, months) arrays,
+            'Fixed_EMI', 'missed_payments', 'penalties': (borrowers,) arrays
+        }
+    """
+    incomes = np.asarray(income_matrix, dtype=np.float64)
+    if incomes.ndim == 1:
+        incomes = incomes[None, :]
+    n_borrowers, n_months = incomes.shape
+    r = interest_rate_annual / 12
+    principal = np.broadcast_to(np.asarray(initial_principal, dtype=np.float64), (n_borrowers,))
+    tenure = np.broadcast_to(np.asarray(initial_tenure), (n_borrowers,))
+    months = np.arange(1, n_months + 1)
+
+    # Fixed EMI and balance do not depend on income: closed-form amortization schedule
+    if r == 0:
+        fixed_emi = principal / tenure
+        balance = principal[:, None] - fixed_emi[:, None] * months
+    else:
+        growth = ANNUITY_CACHE.growth_array(r, tenure)
+        fixed_emi = principal * r * growth / (growth - 1)
+        compounding = (1 + r)**months
+        balance = principal[:, None] * compounding - fixed_emi[:, None] * (compounding - 1) / r
+    balance = np.maximum(balance, 0)
+
+    # Check affordability
+    shortfall = fixed_emi[:, None] - incomes
+    is_default = shortfall > 0
+    cumulative = np.cumsum(shortfall, axis=1)
+    distress = cumulative - np.minimum(np.minimum.accumulate(cumulative, axis=1), 0)
+
+    # Simulated Penalty: 500 INR + 2% of shortfall
+    penalty = np.where(is_default, 500 + (shortfall * 0.02), 0.0)
+    cumulative_penalties = np.cumsum(penalty, axis=1)
+
+    return {
+        'Month': months,
+        'Fixed_Balance': balance,
+        'Fixed_Distress': distress + cumulative_penalties, # Total financial impact
+        'Fixed_EMI': fixed_emi,
+        'Is_Default': is_default,
+        'missed_payments': is_default.sum(axis=1),
+        'penalties': cumulative_penalties[:, -1] if n_months else np.zeros(n_borrowers)
+    }
@@ -1,5 +1,4 @@
 import numpy as np
-import pandas as pd
 
 def generate_irregular_income(months=12, base_income=50000, volatility=0.3):
     """
@@ -28,17 +27,92 @@ def generate_irregular_income(months=12, base_income=50000, volatility=0.3):
         income = max(0, (current_trend + noise) * event_multiplier)
         incomes.append(int(income))
         
+    # pandas is only needed for the dashboard frame; the matrix generators stay NumPy-only
+    import pandas as pd
     return pd.DataFrame({
         'Month': range(1, months + 1),
         'Income': incomes
     })
 
+# Income parameters of the demo borrower profiles
+PROFILE_PRESETS = {
+    "Gig Worker": {'base_income': 30000, 'volatility': 0.4},
+    "Freelancer": {'base_income': 60000, 'volatility': 0.5},
+    "Small Business": {'base_income': 100000, 'volatility': 0.2}
+}
+DEFAULT_PRESET = {'base_income': 40000, 'volatility': 0.1}
+
 def generate_profile_data(profile_type):
-    if profile_type == "Gig Worker":
-        return generate_irregular_income(base_income=30000, volatility=0.4)
-    elif profile_type == "Freelancer":
-        return generate_irregular_income(base_income=60000, volatility=0.5)
-    elif profile_type == "Small Business":
-        return generate_irregular_income(base_income=100000, volatility=0.2)
-    else:
-        return generate_irregular_income(base_income=40000, volatility=0.1)
+    return generate_irregular_income(**PROFILE_PRESETS.get(profile_type, DEFAULT_PRESET))
+
+def generate_income_matrix(n_borrowers, months=12, base_income=50000, volatility=0.3,
+                           profile=None, seed=42, block_size=65536, dtype=np.float64):
+    """
+    Generates many independent irregular income series in one vectorized call.
+    
+    Args:
+        n_borrowers (int): Number of income series (rows).
+        months (int): Number of months (columns).
+        base_income (float): Average target income.
+        volatility (float): Factor for random fluctuation (0.0 to 1.0).
+        profile (str): Optional PROFILE_PRESETS name overriding base_income/volatility.
+        seed (int or tuple): Root seed. Borrower i draws a fixed-size slice of one
+            counter-based (Philox) stream keyed on the seed, so its series depends only on
+            (seed, i, months): not on block_size, nor on whether the cohort is generated
+            at once or streamed with iter_income_blocks.
+        block_size (int): Borrowers generated per step (bounds temporary memory).
+        dtype: Output dtype.
+        
+    Returns:
+        np.array: (n_borrowers, months) matrix of whole-rupee incomes.
+    """
+    incomes = np.empty((n_borrowers, months), dtype=dtype)
+    for start, block in iter_income_blocks(n_borrowers, months, base_income, volatility,
+                                           profile=profile, seed=seed, block_size=block_size, dtype=dtype):
+        incomes[start:start + len(block)] = block
+    return incomes
+
+def iter_income_blocks(n_borrowers, months=12, base_income=50000, volatility=0.3,
+                       profile=None, seed=42, block_size=65536, dtype=np.float64):
+    """
+    Streaming form of generate_income_matrix: yields (first_borrower_index, block) pairs
+    of at most `block_size` rows without materializing the whole cohort.
+    """
+    if profile is not None:
+        preset = PROFILE_PRESETS.get(profile, DEFAULT_PRESET)
+        base_income, volatility = preset['base_income'], preset['volatility']
+    entropy = list(seed) if isinstance(seed, (tuple, list)) else seed
+    key = np.random.SeedSequence(entropy).generate_state(2, dtype=np.uint64)
+
+    # Uniforms per borrower: Box-Muller pairs for the noise, one event draw per month,
+    # padded to whole Philox counter steps (4 draws) so any borrower's slice can be jumped to
+    pairs = (months + 1) // 2
+    width = -(-(2 * pairs + months) // 4) * 4
+
+    for start in range(0, n_borrowers, block_size):
+        rows = min(block_size, n_borrowers - start)
+        bit_generator = np.random.Philox(key=key)
+        bit_generator.advance(start * width // 4)
+        uniforms = np.random.Generator(bit_generator).random((rows, width))
+
+        # Random fluctuation (Box-Muller: a fixed number of draws per borrower, unlike ziggurat),
+        # built in place with the radius already scaled to the noise standard deviation
+        radius = np.log1p(-uniforms[:, :pairs])
+        radius *= -2 * (volatility * base_income) ** 2
+        np.sqrt(radius, out=radius)
+        angle = uniforms[:, pairs:2 * pairs] * (2 * np.pi)
+        incomes = np.empty((rows, 2 * pairs))
+        np.cos(angle, out=incomes[:, :pairs])
+        np.sin(angle, out=incomes[:, pairs:])
+        incomes[:, :pairs] *= radius
+        incomes[:, pairs:] *= radius
+        incomes = incomes[:, :months]
+        incomes += base_income
+
+        # Occasional "shock" or "bonus" (10% chance each), same odds as generate_irregular_income
+        event_draw = uniforms[:, 2 * pairs:2 * pairs + months]
+        incomes *= np.where(event_draw < 0.1, 0.5, np.where(event_draw < 0.9, 1.0, 1.5))
+
+        np.maximum(incomes, 0, out=incomes)
+        np.floor(incomes, out=incomes)
+        yield start, incomes.astype(dtype, copy=False)
@@ -0,0 +1,340 @@
+"""
+Local async HTTP decision endpoint for the agent chain.
+
+    python -m utils.decision_service --port 8000
+
+POST /decide with a JSON borrower state:
+    {"income_history": [...], "principal": 400000, "tenure": 30,
+     "emi": 15000, "missed_payments": 0, "original_tenure": 36}
+returns the forecast, risk, new structure and contract message. Concurrent requests are
+collected into micro-batches (bounded by size and wait time) and run through the batch
+agent APIs together. When the queue is full, /decide answers 503 so callers back off
+instead of queueing without bound; malformed borrower states get 400 and a failed batch
+500. GET /health reports batching statistics (and cache statistics when the memoized
+pipeline is enabled with --cache-size).
+"""
+import argparse
+import asyncio
+import json
+
+import numpy as np
+
+from agents.cashflow_agent import CashflowForecastingAgent
+from agents.risk_agent import RiskIntelligenceAgent
+from agents.structuring_agent import LoanStructuringAgent, ACTION_CODES
+from agents.contract_agent import ContractEvolutionAgent
+from agents.records import ResultRecord
+from utils.memoized_pipeline import MemoizedPipeline
+
+REQUIRED_FIELDS = ('income_history', 'principal', 'tenure', 'emi')
+
+class ServiceOverloaded(Exception):
+    """
+    Raised by DecisionService.decide when the request queue is full.
+    """
+
+class DecisionService:
+    """
+    Micro-batching front of the agent chain. decide() may be awaited from many coroutines;
+    requests are grouped into batches of at most `max_batch_size`, waiting no longer than
+    `max_wait_ms` for a batch to fill. At most `max_queue_size` requests wait; beyond that
+    decide() raises ServiceOverloaded. Batches of at least `executor_batch_size` requests
+    run in a worker thread so the event loop keeps accepting and parsing connections.
+    With `cache_size` > 0, forecasts, risk scores and structures are served from a
+    MemoizedPipeline holding that many entries per stage.
+    """
+    def __init__(self, max_batch_size=256, max_wait_ms=2.0, target_dti=0.40,
+                 interest_rate_annual=0.12, lookback_period=3, cache_size=0, cache_precision=2,
+                 max_queue_size=4096, executor_batch_size=64):
+        self.max_batch_size = max_batch_size
+        self.max_queue_size = max_queue_size
+        self.executor_batch_size = executor_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.cashflow_agent = CashflowForecastingAgent(lookback_period=lookback_period)
+        self.risk_agent = RiskIntelligenceAgent()
+        self.structuring_agent = LoanStructuringAgent(target_dti=target_dti, interest_rate_annual=interest_rate_annual)
+        self.contract_agent = ContractEvolutionAgent()
+        self.pipeline = None
+        if cache_size > 0:
+            self.pipeline = MemoizedPipeline(
+                self.cashflow_agent, self.risk_agent, self.structuring_agent,
+                maxsize=cache_size, precision=cache_precision
+            )
+        self.batches = 0
+        self.requests = 0
+        self.rejected = 0
+        self._queue = None
+        self._worker = None
+
+    async def start(self):
+        if self._worker is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._worker = asyncio.create_task(self._batch_loop())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def decide(self, borrower_state):
+        """
+        Queues one borrower state and waits for its decision.
+        
+        Raises:
+            ValueError: If the borrower state is malformed (checked before batching).
+            ServiceOverloaded: If `max_queue_size` requests are already waiting.
+        """
+        return await self._submit(parse_borrower_state(borrower_state))
+
+    async def _submit(self, request):
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((request, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise ServiceOverloaded(f'{self.max_queue_size} requests already queued') from None
+        return await future
+
+    def stats(self):
+        stats = {
+            'requests': self.requests,
+            'batches': self.batches,
+            'rejected': self.rejected,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'max_queue_size': self.max_queue_size,
+            'mean_batch_size': (self.requests / self.batches) if self.batches else 0.0,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000
+        }
+        if self.pipeline is not None:
+            stats['cache'] = self.pipeline.stats()
+        return stats
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            pending = [(request, future) for request, future in batch if not future.cancelled()]
+            if not pending:
+                continue
+            requests = [request for request, _ in pending]
+            try:
+                if len(requests) >= self.executor_batch_size:
+                    # Large batches would stall accepting and parsing connections on the loop
+                    decisions = await loop.run_in_executor(None, self.decide_batch, requests)
+                else:
+                    decisions = self.decide_batch(requests)
+            except Exception as exc: # surface failures to every waiting caller
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.requests += len(pending)
+            for (_, future), decision in zip(pending, decisions):
+                if not future.done():
+                    future.set_result(decision)
+
+    def decide_batch(self, requests):
+        """
+        Runs parsed borrower states through the agents as one batch.
+        """
+        if self.pipeline is not None:
+            return self._decide_memoized(requests)
+        n = len(requests)
+        width = max(1, max(len(request['income_history']) for request in requests))
+        # Ragged histories are right-padded with NaN, which forecast_batch treats as missing months
+        incomes = np.full((n, width), np.nan)
+        for i, request in enumerate(requests):
+            history = request['income_history']
+            incomes[i, :len(history)] = history
+
+        principal = np.array([request['principal'] for request in requests], dtype=np.float64)
+        tenure = np.array([request['tenure'] for request in requests], dtype=np.int64)
+        original_tenure = np.array([request['original_tenure'] for request in requests], dtype=np.int64)
+        emi = np.array([request['emi'] for request in requests], dtype=np.float64)
+        missed = np.array([request['missed_payments'] for request in requests], dtype=np.int64)
+
+        forecast = self.cashflow_agent.forecast_batch(incomes)
+        risk = self.risk_agent.assess_batch(forecast, emi, missed)
+        structure = self.structuring_agent.structure_batch(forecast, principal, tenure, original_tenure)
+        contract = self.contract_agent.generate_batch(
+            structure['action_code'], structure['new_emi'], structure['new_tenure']
+        )
+
+        return [
+            {
+                'forecast': self.cashflow_agent.batch_row(forecast, i),
+                'risk': self.risk_agent.batch_row(risk, i),
+                'structure': self.structuring_agent.batch_row(structure, i, request['original_tenure']),
+                'contract': self.contract_agent.batch_row(contract, i)
+            }
+            for i, request in enumerate(requests)
+        ]
+
+    def _decide_memoized(self, requests):
+        decisions = self.pipeline.decide_batch(requests)
+        contract = self.contract_agent.generate_batch(
+            np.array([ACTION_CODES[d['structure']['action_taken']] for d in decisions], dtype=np.int8),
+            np.array([d['structure']['new_emi'] for d in decisions], dtype=np.float64),
+            np.array([d['structure']['new_tenure'] for d in decisions], dtype=np.int64)
+        )
+        for i, decision in enumerate(decisions):
+            decision['contract'] = self.contract_agent.batch_row(contract, i)
+        return decisions
+
+    async def handle(self, method, path, body):
+        """
+        Transport-independent request handler shared by the HTTP server and InProcessClient.
+        
+        Returns:
+            tuple: (status code, JSON-serializable payload)
+        """
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok', **self.stats()}
+        if path != '/decide':
+            return 404, {'error': f'unknown path {path}'}
+        if method != 'POST':
+            return 405, {'error': 'use POST'}
+        try:
+            request = parse_borrower_state(json.loads(body or b'null'))
+        except (ValueError, TypeError) as exc:
+            return 400, {'error': str(exc)}
+        try:
+            return 200, await self._submit(request)
+        except ServiceOverloaded as exc:
+            return 503, {'error': str(exc)}
+        except Exception as exc: # the request was valid, so a failed batch is a server fault
+            return 500, {'error': f'{type(exc).__name__}: {exc}'}
+
+def parse_borrower_state(payload):
+    """
+    Validates and normalizes one /decide payload.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError('request body must be a JSON object')
+    missing = [field for field in REQUIRED_FIELDS if field not in payload]
+    if missing:
+        raise ValueError(f"missing fields: {', '.join(missing)}")
+    history = [float(income) for income in payload['income_history']]
+    tenure = int(payload['tenure'])
+    if tenure <= 0:
+        raise ValueError('tenure must be positive')
+    return {
+        'income_history': history,
+        'principal': float(payload['principal']),
+        'tenure': tenure,
+        'original_tenure': int(payload.get('original_tenure', tenure)),
+        'emi': float(payload['emi']),
+        'missed_payments': int(payload.get('missed_payments', 0))
+    }
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, ResultRecord):
+        return value.to_dict()
+    return str(value)
+
+def encode_json(payload):
+    return json.dumps(payload, default=_json_default).encode()
+
+class InProcessClient:
+    """
+    Test client that exercises the service handlers (including JSON encoding) without sockets.
+    """
+    def __init__(self, service):
+        self.service = service
+
+    async def post(self, path, payload):
+        status, response = await self.service.handle('POST', path, encode_json(payload))
+        return status, json.loads(encode_json(response))
+
+    async def get(self, path):
+        status, response = await self.service.handle('GET', path, b'')
+        return status, json.loads(encode_json(response))
+
+# --- Minimal HTTP/1.1 transport (keep-alive, Content-Length bodies) ---
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+async def _serve_connection(service, reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, path, _ = request_line.decode('latin-1').split(' ', 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+            status, payload = await service.handle(method, path, body)
+            data = encode_json(payload)
+            keep_alive = headers.get('connection', '').lower() != 'close'
+            writer.write(
+                f'HTTP/1.1 {status} {REASONS.get(status, "")}\r\n'
+                f'Content-Type: application/json\r\nContent-Length: {len(data)}\r\n'
+                f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode('latin-1') + data
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+async def serve(service, host='127.0.0.1', port=8000):
+    """
+    Starts the HTTP endpoint; returns the asyncio server.
+    """
+    await service.start()
+    return await asyncio.start_server(lambda r, w: _serve_connection(service, r, w), host, port)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='SafeLoan decision service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch-size', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--cache-size', type=int, default=0, help='memoized entries per agent stage (0: off)')
+    parser.add_argument('--max-queue-size', type=int, default=4096, help='queued requests before answering 503')
+    args = parser.parse_args(argv)
+
+    async def run():
+        service = DecisionService(max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+                                  cache_size=args.cache_size, max_queue_size=args.max_queue_size)
+        server = await serve(service, args.host, args.port)
+        print(f'Decision service listening on http://{args.host}:{args.port}')
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import numpy as np
+
+class SimulationHistory:
+    """
+    Preallocated columnar store of simulated months for one borrower.
+    
+    Each field is a typed NumPy array that grows by doubling, so appends are amortized O(1).
+    Readers get views of the filled part (optionally reversed) instead of rebuilt lists.
+    """
+    COLUMNS = {
+        'month': np.int32,
+        'income': np.float64,
+        'safe_forecast': np.float64,
+        'risk_score': np.int8,
+        'zone_code': np.int8,
+        'emi': np.float64,
+        'tenure': np.int64,
+        'action_code': np.int8,
+        'distress': np.float64,
+        'fixed_distress': np.float64
+    }
+
+    def __init__(self, capacity=64):
+        self._size = 0
+        self._columns = {name: np.zeros(max(1, capacity), dtype=dtype) for name, dtype in self.COLUMNS.items()}
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self):
+        return len(self._columns['month'])
+
+    def append(self, **values):
+        """
+        Records one month. Every column in COLUMNS must be given.
+        """
+        if self._size == self.capacity:
+            self._grow()
+        for name, column in self._columns.items():
+            column[self._size] = values[name]
+        self._size += 1
+
+    def column(self, name, reverse=False):
+        """
+        View of one column, oldest month first (or newest first with reverse=True). No copy is made.
+        """
+        filled = self._columns[name][:self._size]
+        return filled[::-1] if reverse else filled
+
+    def columns(self, reverse=False):
+        return {name: self.column(name, reverse=reverse) for name in self._columns}
+
+    def last(self):
+        """
+        The most recent month as a dict of scalars.
+        """
+        if not self._size:
+            raise IndexError("history is empty")
+        return {name: column[self._size - 1] for name, column in self._columns.items()}
+
+    def to_frame(self):
+        """
+        Exports the history as a DataFrame backed by the column views.
+        """
+        import pandas as pd
+        return pd.DataFrame(self.columns(), copy=False)
+
+    def _grow(self):
+        for name, column in self._columns.items():
+            grown = np.zeros(2 * len(column), dtype=column.dtype)
+            grown[:len(column)] = column
+            self._columns[name] = grown
@@ -0,0 +1,201 @@
+import numpy as np
+
+from agents.cashflow_agent import CashflowForecastingAgent
+from agents.risk_agent import RiskIntelligenceAgent
+from agents.structuring_agent import LoanStructuringAgent
+from agents.contract_agent import ContractEvolutionAgent
+
+# Share of a payment that amortizes principal (same simplification as the simulation engine)
+PRINCIPAL_SHARE = 0.7
+
+# Agent stages in dependency order
+STAGES = ('forecast', 'risk', 'structure')
+
+class IncrementalPortfolio:
+    """
+    Event-driven portfolio state that re-evaluates only the borrowers whose inputs changed.
+
+    Events mark per-stage dirty sets: new income invalidates the forecast and everything
+    downstream of it, a payment invalidates the structure (principal and tenure moved),
+    a missed payment invalidates the risk score, and a newly adopted EMI invalidates the
+    risk score of the next run. run() pushes only the dirty rows through each agent and
+    scatters the results into full-book decision columns, so its cost scales with the
+    number of changed accounts. With income, a run and a payment of the new EMI for every
+    borrower each month, it reproduces PortfolioSimulationEngine.
+    """
+    def __init__(self, principal, tenure, n_borrowers=None, target_dti=0.40, interest_rate_annual=0.12,
+                 lookback_period=3, missed_payments=0, ledger=None):
+        """
+        Args:
+            principal (float or np.array): Outstanding loan per borrower.
+            tenure (int or np.array): Original tenure in months per borrower.
+            n_borrowers (int): Book size when principal and tenure are scalars.
+            target_dti (float): Affordability target handed to the structuring agent.
+            interest_rate_annual (float): Loan interest rate.
+            lookback_period (int): Forecast window of the cashflow agent.
+            missed_payments (int or np.array): Missed payments so far per borrower.
+            ledger (ContractLedger): Optional ledger receiving each run's new contracts.
+        """
+        if n_borrowers is None:
+            n_borrowers = np.broadcast(np.asarray(principal), np.asarray(tenure)).size
+        self.cashflow_agent = CashflowForecastingAgent(lookback_period=lookback_period)
+        self.risk_agent = RiskIntelligenceAgent()
+        self.structuring_agent = LoanStructuringAgent(target_dti=target_dti, interest_rate_annual=interest_rate_annual)
+        self.contract_agent = ContractEvolutionAgent()
+        self.forecast_state = self.cashflow_agent.create_rolling_state(n_borrowers)
+        self.ledger = ledger
+        self.runs = 0
+
+        # --- Portfolio State ---
+        self.original_tenure = np.broadcast_to(np.asarray(tenure, dtype=np.int64), (n_borrowers,)).copy()
+        self.principal = np.broadcast_to(np.asarray(principal, dtype=np.float64), (n_borrowers,)).copy()
+        self.tenure = self.original_tenure.copy()
+        self.emi = (self.principal / self.tenure) * 1.1
+        self.missed_payments = np.broadcast_to(np.asarray(missed_payments, dtype=np.int64), (n_borrowers,)).copy()
+
+        # --- Cached Decisions (full book, columnar like an engine month result) ---
+        self.decisions = {
+            'forecast': {key: np.zeros(n_borrowers) for key in ('safe_income', 'potential_income', 'volatility')},
+            'risk': {
+                'risk_score': np.zeros(n_borrowers, dtype=np.int8),
+                'zone_code': np.zeros(n_borrowers, dtype=np.int8),
+                'affordability_stress': np.zeros(n_borrowers, dtype=np.int32),
+                'income_volatility': np.zeros(n_borrowers, dtype=np.int32),
+                'missed_penalty': np.zeros(n_borrowers, dtype=np.int32)
+            },
+            'structure': {
+                'action_code': np.zeros(n_borrowers, dtype=np.int8),
+                'new_emi': np.zeros(n_borrowers),
+                'new_tenure': np.zeros(n_borrowers, dtype=np.int64),
+                'tenure_fallback': np.zeros(n_borrowers, dtype=bool)
+            },
+            'contract': {
+                'template_id': np.zeros(n_borrowers, dtype=np.int8),
+                'new_emi': np.zeros(n_borrowers),
+                'new_tenure': np.zeros(n_borrowers, dtype=np.int64)
+            }
+        }
+        # Nothing has been decided yet, so the first run evaluates the whole book
+        self.dirty = {stage: np.ones(n_borrowers, dtype=bool) for stage in STAGES}
+        self.evaluated = {stage: 0 for stage in STAGES}
+
+    @property
+    def n_borrowers(self):
+        return len(self.principal)
+
+    def record_income(self, borrowers, incomes):
+        """
+        Posts new income; the forecast and every stage after it become stale.
+        Indices must be unique.
+        """
+        borrowers = np.asarray(borrowers, dtype=np.int64)
+        self.forecast_state.update(incomes, borrowers=borrowers)
+        for stage in STAGES:
+            self.dirty[stage][borrowers] = True
+
+    def record_payment(self, borrowers, amounts=None):
+        """
+        Posts repayments (default: the EMI in force): principal amortizes and the tenure
+        counts down, so the structure becomes stale. Indices must be unique.
+        """
+        borrowers = np.asarray(borrowers, dtype=np.int64)
+        amounts = self.emi[borrowers] if amounts is None else amounts
+        self.principal[borrowers] = np.maximum(0, self.principal[borrowers] - (amounts * PRINCIPAL_SHARE))
+        tenure = self.tenure[borrowers]
+        self.tenure[borrowers] = np.where(tenure < 999, tenure - 1, 999)
+        self.dirty['structure'][borrowers] = True
+
+    def record_missed_payment(self, borrowers, count=1):
+        """
+        Counts missed payments; only the risk score becomes stale. Indices must be unique.
+        """
+        borrowers = np.asarray(borrowers, dtype=np.int64)
+        self.missed_payments[borrowers] += count
+        self.dirty['risk'][borrowers] = True
+
+    def pending(self):
+        """
+        Indices of the borrowers the next run will re-evaluate.
+        """
+        return np.flatnonzero(self.dirty['forecast'] | self.dirty['risk'] | self.dirty['structure'])
+
+    def run(self):
+        """
+        Re-evaluates the dirty rows of each stage; every other borrower keeps its cached decision.
+
+        Returns:
+            dict: {'run': int, 'forecast' / 'risk' / 'structure': indices re-evaluated per stage}
+        """
+        self.runs += 1
+        decisions = self.decisions
+        refreshed = {}
+
+        rows = refreshed['forecast'] = np.flatnonzero(self.dirty['forecast'])
+        if len(rows):
+            _scatter(decisions['forecast'], rows, self.forecast_state.forecast(rows))
+
+        rows = refreshed['risk'] = np.flatnonzero(self.dirty['risk'])
+        if len(rows):
+            forecast = _gather(decisions['forecast'], rows)
+            # Scored against the EMI in force, as the engine scores the previous month's terms
+            risk = self.risk_agent.assess_batch(forecast, self.emi[rows], self.missed_payments[rows])
+            _scatter(decisions['risk'], rows, risk)
+
+        rows = refreshed['structure'] = np.flatnonzero(self.dirty['structure'])
+        if len(rows):
+            forecast = _gather(decisions['forecast'], rows)
+            structure = self.structuring_agent.structure_batch(
+                forecast, self.principal[rows], self.tenure[rows], self.original_tenure[rows]
+            )
+            contract = self.contract_agent.generate_batch(
+                structure['action_code'], structure['new_emi'], structure['new_tenure']
+            )
+            _scatter(decisions['structure'], rows, structure)
+            _scatter(decisions['contract'], rows, contract)
+            if self.ledger is not None:
+                self.ledger.record_month(self.runs, rows, contract)
+
+        for stage in STAGES:
+            self.evaluated[stage] += len(refreshed[stage])
+            self.dirty[stage][:] = False
+
+        # --- ADOPT NEW TERMS ---
+        rows = refreshed['structure']
+        if len(rows):
+            new_emi = decisions['structure']['new_emi'][rows]
+            # A changed EMI is an input of the next risk score
+            self.dirty['risk'][rows[new_emi != self.emi[rows]]] = True
+            self.emi[rows] = new_emi
+            self.tenure[rows] = decisions['structure']['new_tenure'][rows]
+
+        refreshed['run'] = self.runs
+        return refreshed
+
+    def decision(self, index):
+        """
+        Expands one borrower's cached decision into the per-agent records the dashboard shows.
+        """
+        decisions = self.decisions
+        return {
+            'forecast': self.cashflow_agent.batch_row(decisions['forecast'], index),
+            'risk': self.risk_agent.batch_row(decisions['risk'], index),
+            'structure': self.structuring_agent.batch_row(
+                decisions['structure'], index, int(self.original_tenure[index])
+            ),
+            'contract': self.contract_agent.batch_row(decisions['contract'], index)
+        }
+
+    def stats(self):
+        return {
+            'runs': self.runs,
+            'borrowers': self.n_borrowers,
+            'pending': int(len(self.pending())),
+            'evaluated': dict(self.evaluated)
+        }
+
+def _gather(columns, rows):
+    return {key: column[rows] for key, column in columns.items()}
+
+def _scatter(columns, rows, values):
+    for key, column in columns.items():
+        column[rows] = values[key]
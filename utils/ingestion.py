@@ -0,0 +1,225 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Canonical integer literals: ids spelled like this in every row of a file are read as int64
+INTEGER_ID_PATTERN = r'-?(?:0|[1-9][0-9]*)'
+
+def iter_income_records(path, chunksize=1_000_000, borrower_col='borrower_id', month_col='month',
+                        income_col='income', file_format=None, id_kind=None, month_kind=None):
+    """
+    Streams a long-format income file (one row per borrower-month) in chunks.
+    
+    Args:
+        path (str): CSV or Parquet file.
+        chunksize (int): Rows per chunk.
+        borrower_col, month_col, income_col (str): Column names in the file.
+        file_format (str): 'csv' or 'parquet'; inferred from the extension by default.
+        id_kind (str): 'int' or 'str' borrower ids; month_kind (str): 'index' or 'date' months.
+            Both are properties of the whole file, detected by a first pass over it when not given.
+        
+    Yields:
+        pd.DataFrame: Chunks with columns 'borrower_id' (int64 or str, as spelled in the file),
+            'month' (int64 month index) and 'income' (float64, NaN where the value is missing
+            or not numeric). Rows without a borrower id or month are dropped.
+    """
+    if id_kind is None or month_kind is None:
+        schema = _scan_income_file(path, chunksize, borrower_col, month_col, income_col, file_format)
+        id_kind, month_kind = id_kind or schema['id_kind'], month_kind or schema['month_kind']
+
+    for chunk in _raw_chunks(path, chunksize, borrower_col, month_col, income_col, file_format):
+        yield pd.DataFrame({
+            'borrower_id': _coerce_ids(chunk['borrower_id'], id_kind),
+            'month': _coerce_months(chunk['month'], month_kind, month_col),
+            'income': pd.to_numeric(chunk['income'], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        })
+
+def load_income_matrix(path, cache_path=None, chunksize=1_000_000, dtype=np.float64, **columns):
+    """
+    Builds the borrowers x months income matrix the agents consume from a long-format file.
+    
+    Borrowers become rows (sorted by id) and months become columns from the earliest to the
+    latest month in the file. Months without a record stay NaN, so ragged histories flow
+    straight into forecast_batch and the simulation engine. The file is read twice in chunks
+    (ids and month range first, then values), so it never has to fit in memory at once.
+    
+    Args:
+        path (str): CSV or Parquet file, see iter_income_records.
+        cache_path (str): Optional '.npy' path. The matrix is written there as a memory map
+            (borrower ids next to it as '<cache>.ids.npy'); later calls reopen it read-only
+            without parsing, as long as it is newer than the source file and was built with
+            the same columns, file format and dtype ('<cache>.meta.json' records them).
+        chunksize (int): Rows per chunk.
+        dtype: Matrix dtype.
+        **columns: borrower_col / month_col / income_col / file_format overrides.
+        
+    Returns:
+        tuple: (income_matrix, borrower_ids, first_month)
+    """
+    file_format = columns.pop('file_format', None) or _infer_format(path)
+    names = {'borrower_col': 'borrower_id', 'month_col': 'month', 'income_col': 'income'}
+    names.update(columns)
+    settings = {'columns': names, 'file_format': file_format, 'dtype': np.dtype(dtype).str}
+    if cache_path is not None and _cache_is_fresh(path, cache_path, settings):
+        return _load_cache(cache_path)
+
+    # Pass 1: borrower ids, month range, and the id / month kinds of the whole file
+    schema = _scan_income_file(path, chunksize, file_format=file_format, **names)
+    ids, first_month, last_month = schema['ids'], schema['first_month'], schema['last_month']
+    kinds = {'id_kind': schema['id_kind'], 'month_kind': schema['month_kind']}
+
+    shape = (len(ids), last_month - first_month + 1)
+    if cache_path is not None:
+        matrix = np.lib.format.open_memmap(cache_path, mode='w+', dtype=dtype, shape=shape)
+        matrix[:] = np.nan
+    else:
+        matrix = np.full(shape, np.nan, dtype=dtype)
+
+    # Pass 2: scatter values into place (a repeated borrower-month keeps the last value)
+    for chunk in iter_income_records(path, chunksize=chunksize, file_format=file_format, **names, **kinds):
+        rows = np.searchsorted(ids, _id_values(chunk))
+        cols = chunk['month'].to_numpy() - first_month
+        matrix[rows, cols] = chunk['income'].to_numpy()
+
+    if cache_path is not None:
+        matrix.flush()
+        np.save(_ids_path(cache_path), ids)
+        np.save(_months_path(cache_path), np.array([first_month]))
+        with open(_meta_path(cache_path), 'w') as handle:
+            json.dump({**settings, **kinds}, handle)
+        del matrix
+        return _load_cache(cache_path)
+    return matrix, ids, first_month
+
+def _infer_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.parquet', '.pq'):
+        return 'parquet'
+    return 'csv'
+
+def _raw_chunks(path, chunksize, borrower_col, month_col, income_col, file_format):
+    file_format = file_format or _infer_format(path)
+    columns = [borrower_col, month_col, income_col]
+
+    if file_format == 'csv':
+        # Ids and months stay text until the file-wide kinds are known ('007' is not 7)
+        chunks = pd.read_csv(path, usecols=columns, chunksize=chunksize, dtype={borrower_col: str, month_col: str})
+    elif file_format == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Reading Parquet income files requires pyarrow (pip install pyarrow)") from exc
+        parquet = pq.ParquetFile(path)
+        chunks = (batch.to_pandas() for batch in parquet.iter_batches(batch_size=chunksize, columns=columns))
+    else:
+        raise ValueError(f"Unsupported income file format: {file_format}")
+
+    for chunk in chunks:
+        chunk = pd.DataFrame({
+            'borrower_id': chunk[borrower_col], 'month': chunk[month_col], 'income': chunk[income_col]
+        })
+        # Rows without a borrower id or month cannot be placed in the matrix
+        yield chunk[chunk['borrower_id'].notna() & chunk['month'].notna()]
+
+def _scan_income_file(path, chunksize, borrower_col, month_col, income_col, file_format):
+    """
+    First pass over a file: sorted unique ids, month range and the file-wide id / month kinds.
+    """
+    id_parts = []
+    month_kind = None
+    first_month, last_month = 0, -1
+    for chunk in _raw_chunks(path, chunksize, borrower_col, month_col, income_col, file_format):
+        if not len(chunk):
+            continue
+        id_parts.append(np.unique(_id_strings(chunk['borrower_id'])))
+        kind = _month_kind(chunk['month'])
+        if kind is None or kind != (month_kind or kind):
+            raise ValueError(f"Column '{month_col}' mixes integer month indexes with dates or other values")
+        months = _coerce_months(chunk['month'], kind, month_col)
+        low, high = int(months.min()), int(months.max())
+        first_month, last_month = (low, high) if month_kind is None else (min(first_month, low), max(last_month, high))
+        month_kind = kind
+
+    # One sort over the per-chunk uniques instead of re-merging the growing id set every chunk
+    ids = np.unique(np.concatenate(id_parts)) if id_parts else np.array([], dtype=str)
+    id_kind = 'int' if pd.Series(ids, dtype=object).str.fullmatch(INTEGER_ID_PATTERN).all() else 'str'
+    if id_kind == 'int':
+        ids = np.sort(ids.astype(np.int64))
+    return {
+        'ids': ids,
+        'id_kind': id_kind,
+        'month_kind': month_kind or 'index',
+        'first_month': first_month,
+        'last_month': last_month
+    }
+
+def _id_strings(values):
+    # Integer-valued numeric columns (Parquet ints, possibly widened to float by nulls) print as ints
+    if pd.api.types.is_numeric_dtype(values) and (values == np.floor(values)).all():
+        values = values.astype(np.int64)
+    return values.astype(str).to_numpy(dtype=str)
+
+def _coerce_ids(values, kind):
+    strings = _id_strings(values)
+    return strings.astype(np.int64) if kind == 'int' else strings
+
+def _id_values(chunk):
+    # pandas stores string ids as objects; fixed-width unicode keeps the ids cache pickle-free
+    ids = chunk['borrower_id'].to_numpy()
+    return ids.astype(str) if ids.dtype == object else ids
+
+def _month_kind(values):
+    """
+    'index' for integer month indexes, 'date' for dates (or 'YYYY-MM' strings), None when mixed.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return 'date'
+    numeric = pd.to_numeric(values, errors='coerce')
+    if numeric.notna().all():
+        return 'index' if (numeric == np.floor(numeric)).all() else None
+    return 'date' if numeric.isna().all() else None
+
+def _coerce_months(values, kind, column='month'):
+    """
+    Integer month indexes pass through; dates become months since year 0.
+    """
+    if kind == 'index':
+        numeric = pd.to_numeric(values, errors='coerce')
+        if numeric.isna().any() or not (numeric == np.floor(numeric)).all():
+            raise ValueError(f"Column '{column}' holds integer month indexes and other values")
+        return numeric.to_numpy(dtype=np.int64)
+    try:
+        dates = pd.to_datetime(values)
+    except (ValueError, TypeError) as exc:
+        raise ValueError(f"Column '{column}' holds dates and values that are not dates") from exc
+    return (dates.dt.year * 12 + dates.dt.month - 1).to_numpy(dtype=np.int64)
+
+def _ids_path(cache_path):
+    return cache_path + '.ids.npy'
+
+def _months_path(cache_path):
+    return cache_path + '.months.npy'
+
+def _meta_path(cache_path):
+    return cache_path + '.meta.json'
+
+def _cache_is_fresh(path, cache_path, settings):
+    cached = (cache_path, _ids_path(cache_path), _months_path(cache_path), _meta_path(cache_path))
+    if not all(os.path.exists(p) for p in cached):
+        return False
+    if min(os.path.getmtime(p) for p in cached) < os.path.getmtime(path):
+        return False
+    with open(_meta_path(cache_path)) as handle:
+        meta = json.load(handle)
+    # The id / month kinds follow from the file and its columns; a cache without them is stale
+    if 'id_kind' not in meta or 'month_kind' not in meta:
+        return False
+    return all(meta.get(key) == value for key, value in settings.items())
+
+def _load_cache(cache_path):
+    matrix = np.load(cache_path, mmap_mode='r')
+    ids = np.load(_ids_path(cache_path))
+    first_month = int(np.load(_months_path(cache_path))[0])
+    return matrix, ids, first_month
@@ -0,0 +1,196 @@
+import bisect
+import json
+import threading
+import time
+from functools import wraps
+
+import numpy as np
+
+from agents.contract_agent import EVENT_TYPES
+from agents.risk_agent import ZONES
+from agents.structuring_agent import ACTIONS
+
+# Upper bounds (seconds) of the call-latency histogram buckets
+LATENCY_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0)
+
+# Counter families and the label each one is keyed by
+COUNTERS = {
+    'structuring_actions': 'action',
+    'risk_zones': 'zone',
+    'contract_events': 'event_type',
+    'tenure_fallbacks': None
+}
+
+class AgentMetrics:
+    """
+    Wall-time histograms per agent method plus decision-path counters.
+    
+    Metrics are only collected for agents passed to instrument(); agents that were never
+    instrumented run their original methods untouched, so disabled instrumentation costs nothing.
+    """
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.latency = {}
+        self.counters = {family: {} for family in COUNTERS}
+        self._lock = threading.Lock()
+
+    def observe(self, method, seconds):
+        with self._lock:
+            histogram = self.latency.get(method)
+            if histogram is None:
+                histogram = self.latency[method] = {
+                    'buckets': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0
+                }
+            histogram['buckets'][bisect.bisect_left(self.buckets, seconds)] += 1
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+
+    def count(self, family, label=None, n=1):
+        with self._lock:
+            family_counts = self.counters[family]
+            family_counts[label] = family_counts.get(label, 0) + n
+
+    def snapshot(self):
+        """
+        JSON-friendly copy of every metric.
+        """
+        with self._lock:
+            return {
+                'latency_buckets': list(self.buckets),
+                'latency': {
+                    method: {'buckets': list(h['buckets']), 'sum': h['sum'], 'count': h['count']}
+                    for method, h in self.latency.items()
+                },
+                'counters': {
+                    family: {('total' if label is None else label): value for label, value in counts.items()}
+                    for family, counts in self.counters.items()
+                }
+            }
+
+    def to_prometheus(self, prefix='safeloan'):
+        """
+        Renders the metrics in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines = [
+            f'# HELP {prefix}_agent_call_seconds Wall time per agent method call.',
+            f'# TYPE {prefix}_agent_call_seconds histogram'
+        ]
+        bounds = [_format_bound(bound) for bound in self.buckets] + ['+Inf']
+        for method, histogram in sorted(snapshot['latency'].items()):
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, histogram['buckets']):
+                cumulative += bucket_count
+                lines.append(f'{prefix}_agent_call_seconds_bucket{{method="{method}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_agent_call_seconds_sum{{method="{method}"}} {histogram["sum"]!r}')
+            lines.append(f'{prefix}_agent_call_seconds_count{{method="{method}"}} {histogram["count"]}')
+
+        for family, label_name in COUNTERS.items():
+            name = f'{prefix}_{family}_total'
+            lines.append(f'# TYPE {name} counter')
+            for label, value in sorted(self.counters[family].items(), key=lambda item: str(item[0])):
+                labels = '' if label_name is None else f'{{{label_name}="{label}"}}'
+                lines.append(f'{name}{labels} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        with open(path, 'w') as f:
+            f.write(self.to_prometheus())
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+def _format_bound(bound):
+    return repr(float(bound))
+
+# --- Result inspectors: turn an agent return value into counter increments ---
+
+def _count_structure(metrics, agent, result):
+    metrics.count('structuring_actions', result['action_taken'])
+
+def _count_structure_batch(metrics, agent, result):
+    codes = result['action_code']
+    for code, n in enumerate(np.bincount(codes, minlength=len(ACTIONS))):
+        if n:
+            metrics.count('structuring_actions', ACTIONS[code], int(n))
+    fallbacks = int(np.count_nonzero(result['tenure_fallback']))
+    if fallbacks:
+        metrics.count('tenure_fallbacks', None, fallbacks)
+
+def _count_tenure(metrics, agent, result):
+    if result == 999:
+        metrics.count('tenure_fallbacks')
+
+def _count_risk(metrics, agent, result):
+    metrics.count('risk_zones', result.get('zone', result['status']))
+
+def _count_risk_batch(metrics, agent, result):
+    for code, n in enumerate(np.bincount(result['zone_code'], minlength=len(ZONES))):
+        if n:
+            metrics.count('risk_zones', ZONES[code], int(n))
+
+def _count_contract(metrics, agent, result):
+    metrics.count('contract_events', result['event_type'])
+
+def _count_contract_batch(metrics, agent, result):
+    for code, n in enumerate(np.bincount(result['template_id'], minlength=len(EVENT_TYPES))):
+        if n:
+            metrics.count('contract_events', EVENT_TYPES[code], int(n))
+
+INSTRUMENTED_METHODS = {
+    'forecast_income': None,
+    'forecast_batch': None,
+    'assess_risk': _count_risk,
+    'assess_batch': _count_risk_batch,
+    'structure_loan': _count_structure,
+    'structure_batch': _count_structure_batch,
+    '_calculate_tenure': _count_tenure,
+    'generate_contract_update': _count_contract,
+    'generate_batch': _count_contract_batch,
+    # RollingForecastState (the engine's streaming forecaster)
+    'update': None,
+    'forecast': None
+}
+
+ENGINE_AGENTS = ('cashflow_agent', 'forecast_state', 'risk_agent', 'structuring_agent', 'contract_agent')
+
+def instrument(metrics, *targets):
+    """
+    Installs timing/counting wrappers on agent instances (or on the agents of a
+    PortfolioSimulationEngine). Only the given instances are affected.
+    """
+    for target in targets:
+        agents = [getattr(target, name) for name in ENGINE_AGENTS if hasattr(target, name)] or [target]
+        for agent in agents:
+            for method_name, inspect in INSTRUMENTED_METHODS.items():
+                method = getattr(type(agent), method_name, None)
+                if method is not None and method_name not in vars(agent):
+                    setattr(agent, method_name, _wrap(metrics, agent, method_name, method.__get__(agent), inspect))
+    return metrics
+
+def uninstrument(*targets):
+    """
+    Removes the wrappers installed by instrument(), restoring the original methods.
+    """
+    for target in targets:
+        agents = [getattr(target, name) for name in ENGINE_AGENTS if hasattr(target, name)] or [target]
+        for agent in agents:
+            for method_name in INSTRUMENTED_METHODS:
+                if getattr(vars(agent).get(method_name), '__instrumented__', False):
+                    delattr(agent, method_name)
+
+def _wrap(metrics, agent, method_name, bound, inspect):
+    qualified = f'{type(agent).__name__}.{method_name}'
+
+    @wraps(bound)
+    def timed(*args, **kwargs):
+        started = time.perf_counter()
+        result = bound(*args, **kwargs)
+        metrics.observe(qualified, time.perf_counter() - started)
+        if inspect is not None:
+            inspect(metrics, agent, result)
+        return result
+
+    timed.__instrumented__ = True
+    return timed
@@ -0,0 +1,163 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from agents.contract_agent import ContractEvolutionAgent, EVENT_TYPES
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS contract_events (
+        borrower_id INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        event_type INTEGER NOT NULL,
+        emi REAL NOT NULL,
+        tenure INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_events_borrower_month ON contract_events (borrower_id, month)",
+    # Serves event listings in their ORDER BY month, borrower_id without a sort step
+    "CREATE INDEX IF NOT EXISTS idx_events_type_month_borrower ON contract_events (event_type, month, borrower_id)"
+)
+
+class ContractLedger:
+    """
+    Durable contract ledger in SQLite (WAL mode).
+    
+    Each simulated month is written with one batched insert in a single transaction. Two
+    indexes keep reads as index range scans however large the table grows: (borrower, month)
+    for audit trails, and (event_type, month, borrower_id) for event listings, which it
+    returns already in listing order when filtered by type.
+    Connections come from a small pool so several threads can read while one writes.
+    
+    Rows hold the event code (= template id) plus EMI and tenure; message text and contract
+    ids are rendered from the templates only when rows are read back.
+    """
+    def __init__(self, path, pool_size=4, timeout=30.0):
+        self.path = path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._pool = queue.LifoQueue()
+        self._created = 0
+        self._all = []
+        self._lock = threading.Lock()
+        self._renderer = ContractEvolutionAgent()
+        with self.connection() as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrows a pooled connection; commits on success and rolls back on error.
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.pool_size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                conn = self._connect()
+                self._all.append(conn)
+            else:
+                conn = self._pool.get(timeout=self.timeout)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.put(conn)
+
+    def record_month(self, month, borrower_ids, contracts):
+        """
+        Bulk-inserts one simulated month.
+        
+        Args:
+            month (int): Simulation month.
+            borrower_ids (np.array): Borrower id per contract.
+            contracts (dict): ContractEvolutionAgent.generate_batch result aligned with borrower_ids.
+            
+        Returns:
+            int: Number of rows written.
+        """
+        borrower_ids = np.asarray(borrower_ids).tolist()
+        rows = zip(
+            borrower_ids,
+            [int(month)] * len(borrower_ids),
+            np.asarray(contracts['template_id']).tolist(),
+            np.asarray(contracts['new_emi'], dtype=np.float64).tolist(),
+            np.asarray(contracts['new_tenure']).tolist()
+        )
+        with self.connection() as conn:
+            conn.executemany(
+                "INSERT INTO contract_events (borrower_id, month, event_type, emi, tenure) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(borrower_ids)
+
+    def borrower_history(self, borrower_id):
+        """
+        Audit trail of one borrower, oldest month first.
+        """
+        return self._query(
+            "SELECT * FROM contract_events WHERE borrower_id = ? ORDER BY month",
+            (int(borrower_id),)
+        )
+
+    def events(self, month=None, event_type=None, limit=None):
+        """
+        Lists events filtered by month and/or event type name (e.g. all 'Relief' events of a month).
+        """
+        where, params = _filters(month, event_type)
+        sql = "SELECT * FROM contract_events" + where + " ORDER BY month, borrower_id"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self._query(sql, params)
+
+    def count(self, month=None, event_type=None):
+        where, params = _filters(month, event_type)
+        with self.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM contract_events" + where, params).fetchone()[0]
+
+    def close(self):
+        for conn in self._all:
+            conn.close()
+        self._all.clear()
+        self._created = 0
+        self._pool = queue.LifoQueue()
+
+    def _query(self, sql, params):
+        with self.connection() as conn:
+            return [self._render(row) for row in conn.execute(sql, params)]
+
+    def _render(self, row):
+        entry = {'borrower_id': row['borrower_id'], 'month': row['month'], 'emi': row['emi'], 'tenure': row['tenure']}
+        entry.update(self._renderer.render(row['event_type'], row['emi'], row['tenure']))
+        return entry
+
+def _filters(month, event_type):
+    clauses, params = [], []
+    if month is not None:
+        clauses.append("month = ?")
+        params.append(int(month))
+    if event_type is not None:
+        clauses.append("event_type = ?")
+        params.append(EVENT_TYPES.index(event_type))
+    elif month is not None:
+        # Enumerating the event types lets a month filter search the (event_type, month, borrower_id) index
+        clauses.insert(0, f"event_type IN ({', '.join('?' * len(EVENT_TYPES))})")
+        params[:0] = range(len(EVENT_TYPES))
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
@@ -0,0 +1,207 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from agents.cashflow_agent import CashflowForecastingAgent
+from agents.risk_agent import RiskIntelligenceAgent
+from agents.structuring_agent import LoanStructuringAgent
+
+STAGES = ('forecast', 'risk', 'structure')
+
+class LRUCache:
+    """
+    Bounded, thread-safe LRU map with hit / miss / eviction counters.
+    """
+    def __init__(self, maxsize=65536):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Returns the cached value (refreshing its recency), or None on a miss.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+class MemoizedPipeline:
+    """
+    Opt-in memoization of the cashflow -> risk -> structuring chain.
+
+    Each stage has its own bounded LRU keyed only on what the stage reads: the forecast
+    on the last `lookback_period` observed (non-NaN) incomes, the risk score on the
+    forecast, EMI and missed payments, and the structure on the safe income, principal,
+    tenures and the structuring policy. Money inputs are rounded to `precision` decimals in the
+    keys and the agents run on the rounded values, so a cached decision is exactly the
+    one its key describes. Lower precision (e.g. -2, whole hundreds) raises the hit rate.
+    Misses of a batch are computed together through the batch agent APIs.
+    """
+    def __init__(self, cashflow_agent=None, risk_agent=None, structuring_agent=None,
+                 maxsize=65536, precision=2):
+        """
+        Args:
+            cashflow_agent, risk_agent, structuring_agent: Agents to memoize (default: new
+                agents with default settings).
+            maxsize (int): Entries kept per stage.
+            precision (int): Decimals kept of incomes, EMI and principal in the keys.
+        """
+        self.cashflow_agent = cashflow_agent or CashflowForecastingAgent()
+        self.risk_agent = risk_agent or RiskIntelligenceAgent()
+        self.structuring_agent = structuring_agent or LoanStructuringAgent()
+        self.precision = precision
+        self.caches = {stage: LRUCache(maxsize) for stage in STAGES}
+
+    def decide(self, income_history, current_emi, remaining_principal, current_tenure,
+               original_tenure, missed_payments=0):
+        """
+        One borrower through the chain.
+
+        Returns:
+            dict: {'forecast': IncomeForecast, 'risk': RiskAssessment, 'structure': LoanStructure}
+        """
+        return self.decide_batch([{
+            'income_history': income_history,
+            'emi': current_emi,
+            'principal': remaining_principal,
+            'tenure': current_tenure,
+            'original_tenure': original_tenure,
+            'missed_payments': missed_payments
+        }])[0]
+
+    def decide_batch(self, requests):
+        """
+        Many borrowers through the chain; each stage computes only its distinct cache misses.
+
+        Args:
+            requests (list of dicts): Borrower states as parsed by the decision service
+                ('income_history', 'emi', 'principal', 'tenure', 'original_tenure', 'missed_payments').
+
+        Returns:
+            list of dicts: One decide() result per request.
+        """
+        lookback = self.cashflow_agent.lookback_period
+        # forecast_batch skips missing (NaN) months, so the key is the last `lookback` observed incomes
+        window_keys = [
+            self._round([income for income in request['income_history'] if income == income][-lookback:])
+            for request in requests
+        ]
+        forecasts = self._lookup('forecast', window_keys, self._compute_forecasts)
+
+        risk_keys = [
+            (forecast['safe_income'], forecast['volatility'], self._round(request['emi']),
+             int(request.get('missed_payments', 0)))
+            for forecast, request in zip(forecasts, requests)
+        ]
+        risks = self._lookup('risk', risk_keys, self._compute_risks)
+
+        agent = self.structuring_agent
+        policy = (agent.target_dti, agent.interest_rate_monthly, agent.tenure_cap_multiple)
+        structure_keys = [
+            (forecast['safe_income'], self._round(request['principal']), int(request['tenure']),
+             int(request['original_tenure'])) + policy
+            for forecast, request in zip(forecasts, requests)
+        ]
+        structures = self._lookup('structure', structure_keys, self._compute_structures)
+
+        return [
+            {'forecast': forecast, 'risk': risk, 'structure': structure}
+            for forecast, risk, structure in zip(forecasts, risks, structures)
+        ]
+
+    def stats(self):
+        """
+        Per-stage cache statistics plus the combined hit rate.
+        """
+        stats = {stage: cache.stats() for stage, cache in self.caches.items()}
+        hits = sum(s['hits'] for s in stats.values())
+        lookups = hits + sum(s['misses'] for s in stats.values())
+        stats['hit_rate'] = (hits / lookups) if lookups else 0.0
+        return stats
+
+    def clear(self):
+        for cache in self.caches.values():
+            cache.clear()
+
+    def _round(self, value):
+        if np.ndim(value):
+            return tuple(np.round(np.asarray(value, dtype=np.float64), self.precision).tolist())
+        return float(np.round(float(value), self.precision))
+
+    def _lookup(self, stage, keys, compute):
+        cache = self.caches[stage]
+        results = [cache.get(key) for key in keys]
+        # Duplicate keys within a batch are computed once
+        missing = {}
+        for i, result in enumerate(results):
+            if result is None:
+                missing.setdefault(keys[i], []).append(i)
+        if missing:
+            for key, value in zip(missing, compute(list(missing))):
+                cache.put(key, value)
+                for i in missing[key]:
+                    results[i] = value
+        return results
+
+    def _compute_forecasts(self, windows):
+        width = max(1, max(len(window) for window in windows))
+        # Ragged windows are right-padded with NaN, which forecast_batch treats as missing months
+        incomes = np.full((len(windows), width), np.nan)
+        for i, window in enumerate(windows):
+            incomes[i, :len(window)] = window
+        forecast = self.cashflow_agent.forecast_batch(incomes)
+        return [self.cashflow_agent.batch_row(forecast, i) for i in range(len(windows))]
+
+    def _compute_risks(self, keys):
+        safe_income, volatility, emi, missed = (np.array(column) for column in zip(*keys))
+        risk = self.risk_agent.assess_batch({'safe_income': safe_income, 'volatility': volatility}, emi, missed)
+        return [self.risk_agent.batch_row(risk, i) for i in range(len(keys))]
+
+    def _compute_structures(self, keys):
+        columns = list(zip(*keys))
+        safe_income, principal = np.array(columns[0]), np.array(columns[1])
+        tenure, original_tenure = np.array(columns[2], dtype=np.int64), np.array(columns[3], dtype=np.int64)
+        structure = self.structuring_agent.structure_batch({'safe_income': safe_income}, principal, tenure, original_tenure)
+        return [
+            self.structuring_agent.batch_row(structure, i, int(original_tenure[i]))
+            for i in range(len(keys))
+        ]
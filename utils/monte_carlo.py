@@ -0,0 +1,167 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from agents.structuring_agent import ACTIONS
+from utils.data_generator import PROFILE_PRESETS, iter_income_blocks
+from utils.simulation_engine import PortfolioSimulationEngine
+
+# Distress buckets (INR) used for the per-profile distribution
+DISTRESS_BINS = (0, 1, 1000, 10000, 50000, 100000, np.inf)
+
+def run_monte_carlo(profiles=tuple(PROFILE_PRESETS), n_scenarios=1000, months=36,
+                    principal=500000, tenure=36, target_dti=0.40, interest_rate_annual=0.12,
+                    default_after=3, workers=None, shard_size=None, seed=42, return_paths=False):
+    """
+    Stress-tests the adaptive policy over many simulated income paths per borrower profile.
+    
+    Income paths and per-path results live in shared memory; worker processes attach to
+    them by name and each simulates a shard of paths with the headless engine, so nothing
+    large is pickled per task. Shard summaries are merged at the end.
+    
+    Args:
+        profiles (iterable): Names from PROFILE_PRESETS.
+        n_scenarios (int): Income paths simulated per profile.
+        months (int): Simulated months per path.
+        default_after (int): Shortfall months after which a path counts as a default.
+        workers (int): Worker processes (default: CPU count). 1 runs in-process.
+        shard_size (int): Paths per task (default: an even split, ~4 tasks per worker).
+        seed (int): Seed of the income paths; the same seed reproduces the same run.
+        return_paths (bool): Also return per-path 'distress', 'shortfall_months' and 'principal'.
+        
+    Returns:
+        dict: {
+            'profiles': {profile: summary}, 'overall': summary,
+            'paths': int, 'workers': int, 'elapsed': float
+        }
+        where a summary holds 'paths', 'defaults', 'default_rate', 'mean_distress',
+        'distress_histogram' (counts per DISTRESS_BINS bucket) and 'action_mix'.
+    """
+    profiles = list(profiles)
+    workers = workers or os.cpu_count() or 1
+    n_paths = len(profiles) * n_scenarios
+    started = time.perf_counter()
+
+    blocks = {}
+    try:
+        incomes = _create_block(blocks, 'incomes', (n_paths, months), np.float64)
+        _create_block(blocks, 'distress', (n_paths,), np.float64)
+        _create_block(blocks, 'shortfall_months', (n_paths,), np.int64)
+        _create_block(blocks, 'principal', (n_paths,), np.float64)
+
+        # Income paths are streamed straight into shared memory, one generator block at a time
+        for p, profile in enumerate(profiles):
+            offset = p * n_scenarios
+            for start, block in iter_income_blocks(n_scenarios, months, profile=profile, seed=(seed, p)):
+                incomes[offset + start:offset + start + len(block)] = block
+
+        if shard_size is None:
+            shard_size = max(1, -(-n_scenarios // (4 * workers)))
+        specs = {name: (block.name, shape, dtype) for name, (block, shape, dtype) in blocks.items()}
+        params = {
+            'principal': principal, 'tenure': tenure, 'target_dti': target_dti,
+            'interest_rate_annual': interest_rate_annual, 'default_after': default_after
+        }
+        # Shards never straddle two profiles, so summaries merge per profile
+        tasks = [
+            (specs, start, min(start + shard_size, (p + 1) * n_scenarios), profile, params)
+            for p, profile in enumerate(profiles)
+            for start in range(p * n_scenarios, (p + 1) * n_scenarios, shard_size)
+        ]
+
+        if workers == 1:
+            shard_summaries = [_simulate_shard(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                shard_summaries = list(pool.map(_simulate_shard, tasks))
+
+        per_path = {}
+        if return_paths:
+            for name in ('distress', 'shortfall_months', 'principal'):
+                block, shape, dtype = blocks[name]
+                per_path[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf).copy()
+    finally:
+        for block, _, _ in blocks.values():
+            block.close()
+            block.unlink()
+
+    by_profile = {
+        profile: _merge_summaries([s for s in shard_summaries if s['profile'] == profile])
+        for profile in profiles
+    }
+    result = {
+        'profiles': by_profile,
+        'overall': _merge_summaries(shard_summaries),
+        'paths': n_paths,
+        'workers': workers,
+        'elapsed': time.perf_counter() - started
+    }
+    result.update(per_path)
+    return result
+
+def _create_block(blocks, name, shape, dtype):
+    nbytes = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+    block = shared_memory.SharedMemory(create=True, size=nbytes)
+    blocks[name] = (block, shape, dtype)
+    return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+def _simulate_shard(task):
+    """
+    Worker entry point: attaches to the shared blocks and simulates rows [start, stop).
+    """
+    specs, start, stop, profile, params = task
+    attached = {name: shared_memory.SharedMemory(name=block_name) for name, (block_name, _, _) in specs.items()}
+    try:
+        arrays = {
+            name: np.ndarray(shape, dtype=dtype, buffer=attached[name].buf)
+            for name, (_, shape, dtype) in specs.items()
+        }
+        engine = PortfolioSimulationEngine(
+            arrays['incomes'][start:stop],
+            params['principal'],
+            params['tenure'],
+            target_dti=params['target_dti'],
+            interest_rate_annual=params['interest_rate_annual']
+        )
+        action_counts = np.zeros(len(ACTIONS), dtype=np.int64)
+
+        def count_actions(month_result):
+            action_counts[:] += np.bincount(month_result['structure']['action_code'], minlength=len(ACTIONS))
+
+        engine.run(on_step=count_actions)
+
+        arrays['distress'][start:stop] = engine.distress
+        arrays['shortfall_months'][start:stop] = engine.shortfall_months
+        arrays['principal'][start:stop] = engine.principal
+
+        histogram, _ = np.histogram(engine.distress, bins=DISTRESS_BINS)
+        summary = {
+            'profile': profile,
+            'paths': stop - start,
+            'defaults': int((engine.shortfall_months >= params['default_after']).sum()),
+            'distress_total': float(engine.distress.sum()),
+            'distress_histogram': histogram.tolist(),
+            'action_counts': action_counts.tolist()
+        }
+        del arrays, engine
+        return summary
+    finally:
+        for block in attached.values():
+            block.close()
+
+def _merge_summaries(summaries):
+    paths = sum(s['paths'] for s in summaries)
+    defaults = sum(s['defaults'] for s in summaries)
+    histogram = np.sum([s['distress_histogram'] for s in summaries], axis=0, dtype=np.int64)
+    action_counts = np.sum([s['action_counts'] for s in summaries], axis=0, dtype=np.int64)
+    return {
+        'paths': paths,
+        'defaults': defaults,
+        'default_rate': (defaults / paths) if paths else 0.0,
+        'mean_distress': (sum(s['distress_total'] for s in summaries) / paths) if paths else 0.0,
+        'distress_histogram': histogram.tolist(),
+        'action_mix': dict(zip(ACTIONS, action_counts.tolist()))
+    }
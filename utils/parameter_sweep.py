@@ -0,0 +1,184 @@
+import itertools
+
+import numpy as np
+
+from agents.cashflow_agent import CashflowForecastingAgent
+from agents.risk_agent import RiskIntelligenceAgent, ZONE_CRITICAL
+from agents.structuring_agent import LoanStructuringAgent
+
+# Policy parameters a sweep can vary, in grid order
+SWEEP_PARAMETERS = ('target_dti', 'interest_rate_annual', 'tenure_cap_multiple')
+
+# Per-borrower outcomes stored along the last axis of the result cube
+SWEEP_METRICS = (
+    'distress', 'shortfall_months', 'defaulted', 'critical_months',
+    'principal', 'emi', 'tenure', 'risk_score'
+)
+
+class SweepResult:
+    """
+    Tidy setting x borrower x metric cube of a policy sweep.
+
+    `params` holds one array per swept parameter with one entry per setting, and
+    cube[s, b, m] is metric SWEEP_METRICS[m] of borrower b under setting s.
+    """
+    def __init__(self, params, cube, default_after):
+        self.params = params
+        self.cube = cube
+        self.default_after = default_after
+
+    @property
+    def n_settings(self):
+        return self.cube.shape[0]
+
+    @property
+    def n_borrowers(self):
+        return self.cube.shape[1]
+
+    def metric(self, name):
+        """
+        Settings x borrowers view of one metric. No copy is made.
+        """
+        return self.cube[:, :, SWEEP_METRICS.index(name)]
+
+    def setting(self, index):
+        """
+        Parameter values of one setting as a dict of scalars.
+        """
+        return {name: values[index].item() for name, values in self.params.items()}
+
+    def summary(self):
+        """
+        Portfolio-level outcome per setting, in grid order.
+
+        Returns:
+            list of dicts: The setting's parameters plus 'default_rate', 'defaults',
+                'mean_distress', 'total_distress' and 'mean_critical_months'.
+        """
+        n = max(1, self.n_borrowers)
+        defaults = self.metric('defaulted').sum(axis=1)
+        distress = self.metric('distress').sum(axis=1)
+        critical = self.metric('critical_months').sum(axis=1)
+        return [
+            dict(
+                self.setting(s),
+                defaults=int(defaults[s]),
+                default_rate=float(defaults[s] / n),
+                mean_distress=float(distress[s] / n),
+                total_distress=float(distress[s]),
+                mean_critical_months=float(critical[s] / n)
+            )
+            for s in range(self.n_settings)
+        ]
+
+    def to_frame(self):
+        """
+        Exports the cube in long format: one row per (setting, borrower, metric).
+        """
+        import pandas as pd
+        n_settings, n_borrowers, n_metrics = self.cube.shape
+        setting = np.repeat(np.arange(n_settings), n_borrowers * n_metrics)
+        columns = {'setting': setting}
+        for name, values in self.params.items():
+            columns[name] = values[setting]
+        columns['borrower'] = np.tile(np.repeat(np.arange(n_borrowers), n_metrics), n_settings)
+        columns['metric'] = np.tile(np.array(SWEEP_METRICS), n_settings * n_borrowers)
+        columns['value'] = self.cube.reshape(-1)
+        return pd.DataFrame(columns)
+
+def run_parameter_sweep(income_matrix, principal, tenure, target_dti=(0.40,), interest_rate_annual=(0.12,),
+                        tenure_cap_multiple=(2,), lookback_period=3, missed_payments=0, default_after=3,
+                        months=None):
+    """
+    What-if simulation of every combination of policy parameters over one portfolio.
+
+    The income forecast does not depend on the policy, so it is streamed once per month
+    and shared by all settings. Risk scoring and structuring then run once per month on
+    settings x borrowers arrays, with the parameters broadcast along the settings axis.
+    A single setting reproduces PortfolioSimulationEngine.
+
+    Args:
+        income_matrix (np.array): Borrowers x months income; NaN marks a month without income data.
+        principal (float or np.array): Initial loan amount per borrower.
+        tenure (int or np.array): Initial tenure in months per borrower.
+        target_dti, interest_rate_annual, tenure_cap_multiple (iterable): Values to sweep;
+            the grid is their cartesian product.
+        lookback_period (int): Forecast window of the cashflow agent.
+        missed_payments (int or np.array): Missed payments fed to the risk agent.
+        default_after (int): Shortfall months after which a borrower counts as a default.
+        months (int): Simulated months (default: all months of income_matrix).
+
+    Returns:
+        SweepResult: settings x borrowers x SWEEP_METRICS cube.
+    """
+    incomes = np.asarray(income_matrix, dtype=np.float64)
+    if incomes.ndim == 1:
+        incomes = incomes[None, :]
+    n_borrowers = len(incomes)
+    n_months = incomes.shape[1] if months is None else min(months, incomes.shape[1])
+
+    grid = np.array(list(itertools.product(
+        np.atleast_1d(target_dti), np.atleast_1d(interest_rate_annual), np.atleast_1d(tenure_cap_multiple)
+    )), dtype=np.float64).reshape(-1, len(SWEEP_PARAMETERS))
+    params = {name: grid[:, i] for i, name in enumerate(SWEEP_PARAMETERS)}
+    shape = (len(grid), n_borrowers)
+    # Parameters as (settings, 1) columns broadcast against the borrower axis
+    policy = {
+        'target_dti': params['target_dti'][:, None],
+        'interest_rate_monthly': params['interest_rate_annual'][:, None] / 12,
+        'tenure_cap_multiple': params['tenure_cap_multiple'][:, None]
+    }
+
+    cashflow_agent = CashflowForecastingAgent(lookback_period=lookback_period)
+    risk_agent = RiskIntelligenceAgent()
+    structuring_agent = LoanStructuringAgent()
+    forecast_state = cashflow_agent.create_rolling_state(n_borrowers)
+
+    # --- Portfolio State (one row per setting) ---
+    original_tenure = np.broadcast_to(np.asarray(tenure, dtype=np.int64), (n_borrowers,)).copy()
+    principal = np.broadcast_to(np.asarray(principal, dtype=np.float64), shape).copy()
+    tenure = np.broadcast_to(original_tenure, shape).copy()
+    emi = (principal / tenure) * 1.1
+    distress = np.zeros(shape)
+    shortfall_months = np.zeros(shape, dtype=np.int64)
+    critical_months = np.zeros(shape, dtype=np.int64)
+    risk_score = np.zeros(shape, dtype=np.int64)
+    missed_payments = np.broadcast_to(np.asarray(missed_payments, dtype=np.int64), (n_borrowers,))
+
+    for month in range(n_months):
+        income = incomes[:, month]
+        observed = ~np.isnan(income)
+        if observed.all():
+            forecast_state.update(income)
+        else:
+            forecast_state.update(income[observed], borrowers=np.flatnonzero(observed))
+        # Computed once, viewed by every setting
+        forecast = {key: np.broadcast_to(column, shape) for key, column in forecast_state.forecast().items()}
+
+        risk = risk_agent.assess_batch(forecast, emi, missed_payments)
+        structure = structuring_agent.structure_batch(forecast, principal, tenure, original_tenure, **policy)
+
+        new_emi, new_tenure = structure['new_emi'], structure['new_tenure']
+        principal = np.maximum(0, principal - (new_emi * 0.7))
+        tenure = np.where(new_tenure < 999, new_tenure - 1, 999)
+        emi = new_emi
+
+        # Months without income data do not count as a shortfall
+        shortfall = np.fmax(0, new_emi - income)
+        distress = distress + shortfall
+        shortfall_months = shortfall_months + (shortfall > 0)
+        critical_months = critical_months + (risk['zone_code'] == ZONE_CRITICAL)
+        risk_score = risk['risk_score']
+
+    outcomes = {
+        'distress': distress,
+        'shortfall_months': shortfall_months,
+        'defaulted': shortfall_months >= default_after,
+        'critical_months': critical_months,
+        'principal': principal,
+        'emi': emi,
+        'tenure': tenure,
+        'risk_score': risk_score
+    }
+    cube = np.stack([np.asarray(outcomes[name], dtype=np.float64) for name in SWEEP_METRICS], axis=-1)
+    return SweepResult(params, cube, default_after)
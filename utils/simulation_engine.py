@@ -0,0 +1,153 @@
+import numpy as np
+
+from agents.cashflow_agent import CashflowForecastingAgent
+from agents.risk_agent import RiskIntelligenceAgent
+from agents.structuring_agent import LoanStructuringAgent
+from agents.contract_agent import ContractEvolutionAgent
+
+class PortfolioSimulationEngine:
+    """
+    Headless cashflow -> risk -> structuring -> contract loop for N borrowers.
+    
+    Portfolio state (principal, tenure, EMI, distress) lives in arrays and every month is
+    one vectorized pass through the agents, so the dashboard, batch jobs and benchmarks
+    can all drive the same engine.
+    """
+    def __init__(self, income_matrix, principal, tenure, target_dti=0.40,
+                 interest_rate_annual=0.12, lookback_period=3, missed_payments=0, ledger=None):
+        """
+        Args:
+            income_matrix (np.array): Borrowers x months income; NaN marks a month without income data.
+            principal (float or np.array): Initial loan amount per borrower.
+            tenure (int or np.array): Initial tenure in months per borrower.
+            target_dti (float): Affordability target handed to the structuring agent.
+            interest_rate_annual (float): Loan interest rate.
+            lookback_period (int): Forecast window of the cashflow agent.
+            missed_payments (int or np.array): Missed payments fed to the risk agent.
+            ledger (ContractLedger): Optional ledger receiving every month's contracts in bulk.
+        """
+        self.incomes = np.asarray(income_matrix, dtype=np.float64)
+        if self.incomes.ndim == 1:
+            self.incomes = self.incomes[None, :]
+        n_borrowers = len(self.incomes)
+
+        self.cashflow_agent = CashflowForecastingAgent(lookback_period=lookback_period)
+        self.risk_agent = RiskIntelligenceAgent()
+        self.structuring_agent = LoanStructuringAgent(target_dti=target_dti, interest_rate_annual=interest_rate_annual)
+        self.contract_agent = ContractEvolutionAgent()
+        self.forecast_state = self.cashflow_agent.create_rolling_state(n_borrowers)
+        self.ledger = ledger
+
+        # --- Portfolio State ---
+        self.month = 0
+        self.original_tenure = np.broadcast_to(np.asarray(tenure, dtype=np.int64), (n_borrowers,)).copy()
+        self.principal = np.broadcast_to(np.asarray(principal, dtype=np.float64), (n_borrowers,)).copy()
+        self.tenure = self.original_tenure.copy()
+        self.emi = (self.principal / self.tenure) * 1.1
+        self.distress = np.zeros(n_borrowers)
+        self.shortfall_months = np.zeros(n_borrowers, dtype=np.int64)
+        self.missed_payments = np.broadcast_to(np.asarray(missed_payments, dtype=np.int64), (n_borrowers,)).copy()
+
+    @property
+    def n_borrowers(self):
+        return self.incomes.shape[0]
+
+    @property
+    def n_months(self):
+        return self.incomes.shape[1]
+
+    @property
+    def is_complete(self):
+        return self.month >= self.n_months
+
+    def step(self):
+        """
+        Simulates the next month for every borrower.
+        
+        Returns:
+            dict: Columnar month result ('month', 'income', 'forecast', 'risk', 'structure',
+                'contract', 'shortfall' plus the pre-decision 'old_emi'/'old_tenure'), or None
+                once the income data is exhausted.
+        """
+        if self.is_complete:
+            return None
+        self.month += 1
+        income = self.incomes[:, self.month - 1]
+
+        # --- AGENT EXECUTION ---
+        observed = ~np.isnan(income)
+        if observed.all():
+            self.forecast_state.update(income)
+        else:
+            self.forecast_state.update(income[observed], borrowers=np.flatnonzero(observed))
+        forecast = self.forecast_state.forecast()
+        risk = self.risk_agent.assess_batch(forecast, self.emi, self.missed_payments)
+        structure = self.structuring_agent.structure_batch(
+            forecast, self.principal, self.tenure, self.original_tenure
+        )
+        contract = self.contract_agent.generate_batch(
+            structure['action_code'], structure['new_emi'], structure['new_tenure']
+        )
+        if self.ledger is not None:
+            self.ledger.record_month(self.month, np.arange(self.n_borrowers), contract)
+
+        # --- UPDATE STATE ---
+        # State arrays are rebound rather than mutated, so the old terms stay valid in the result
+        old_emi, old_tenure = self.emi, self.tenure
+        new_emi, new_tenure = structure['new_emi'], structure['new_tenure']
+        self.principal = np.maximum(0, self.principal - (new_emi * 0.7))
+        self.tenure = np.where(new_tenure < 999, new_tenure - 1, 999)
+        self.emi = new_emi
+
+        # Months without income data do not count as a shortfall
+        shortfall = np.fmax(0, new_emi - income)
+        self.distress = self.distress + shortfall
+        self.shortfall_months = self.shortfall_months + (shortfall > 0)
+
+        return {
+            'month': self.month,
+            'income': income,
+            'forecast': forecast,
+            'risk': risk,
+            'structure': structure,
+            'contract': contract,
+            'shortfall': shortfall,
+            'old_emi': old_emi,
+            'old_tenure': old_tenure
+        }
+
+    def run(self, months=None, on_step=None):
+        """
+        Advances up to `months` months (default: until the income data runs out).
+        
+        Args:
+            months (int): Number of months to simulate.
+            on_step (callable): Optional callback receiving each month result.
+            
+        Returns:
+            dict: The last month result, or None if nothing was simulated.
+        """
+        remaining = self.n_months - self.month if months is None else months
+        result = None
+        for _ in range(remaining):
+            month_result = self.step()
+            if month_result is None:
+                break
+            result = month_result
+            if on_step is not None:
+                on_step(month_result)
+        return result
+
+    def decision(self, month_result, index):
+        """
+        Expands one borrower of a month result into the per-agent dicts the dashboard shows.
+        Rationale and contract text are only rendered here.
+        """
+        return {
+            'forecast': self.cashflow_agent.batch_row(month_result['forecast'], index),
+            'risk': self.risk_agent.batch_row(month_result['risk'], index),
+            'structure': self.structuring_agent.batch_row(
+                month_result['structure'], index, int(self.original_tenure[index])
+            ),
+            'contract': self.contract_agent.batch_row(month_result['contract'], index)
+        }
@@ -1,16 +1,128 @@
-import plotly.graph_objects as go
-import pandas as pd
+import numpy as np
+
+from agents.risk_agent import ZONES, ZONE_COLORS
+
+# plotly is imported inside the figure functions, so headless users of the downsampling and
+# density helpers (and the agents) never load it
+
+# Traces with more points than this render through WebGL instead of SVG
+WEBGL_THRESHOLD = 1000
+# Series longer than this are downsampled before they are shipped to the browser
+MAX_POINTS = 2000
+# Risk score buckets (0-100) for the portfolio density heatmap
+RISK_BINS = np.arange(0, 101, 5)
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling: keeps the first and last point and, from
+    each bucket in between, the point spanning the largest triangle with its neighbours.
+    
+    Returns:
+        np.array: Sorted indices of the kept points.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (n_out - 2)
+    edges = (np.arange(n_out - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        cx = x[stop:next_stop].mean()
+        cy = np.nanmean(y[stop:next_stop]) if np.isfinite(y[stop:next_stop]).any() else y[a]
+        area = np.abs((x[a] - cx) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (cy - y[a]))
+        a = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        kept[i + 1] = a
+    return kept
+
+def minmax_indices(y, n_out):
+    """
+    Min/max downsampling: keeps the lowest and highest point of each of n_out / 2 buckets,
+    so spikes survive. Cheaper than LTTB and fully vectorized.
+    
+    Returns:
+        np.array: Sorted indices of the kept points.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    n_buckets = n_out // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+
+    size = -(-n // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    lows = offsets + np.argmin(np.where(np.isnan(buckets), np.inf, buckets), axis=1)
+    highs = offsets + np.argmax(np.where(np.isnan(buckets), -np.inf, buckets), axis=1)
+    return np.unique(np.minimum(np.concatenate([lows, highs]), n - 1))
+
+def downsample(x, y, max_points=MAX_POINTS, method='lttb'):
+    """
+    Reduces a series to at most max_points points ('lttb' or 'minmax'). Short series are returned as-is.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(y) <= max_points:
+        return x, y
+    if method == 'minmax':
+        kept = minmax_indices(y, max_points)
+    elif method == 'lttb':
+        positions = x if np.issubdtype(x.dtype, np.number) else np.arange(len(x))
+        kept = lttb_indices(positions, y, max_points)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return x[kept], y[kept]
+
+def scatter_trace(x, y, max_points=MAX_POINTS, method='lttb', **kwargs):
+    """
+    Line/marker trace that scales with the series: downsampled above max_points and drawn
+    with WebGL (Scattergl) above WEBGL_THRESHOLD points. Short series give a plain go.Scatter.
+    """
+    import plotly.graph_objects as go
+    x, y = downsample(x, y, max_points=max_points, method=method)
+    trace = go.Scattergl if len(y) > WEBGL_THRESHOLD else go.Scatter
+    return trace(x=x, y=y, **kwargs)
+
+def bar_trace(x, y, max_points=WEBGL_THRESHOLD, stackgroup=None, **kwargs):
+    """
+    Bar trace for short series. Bars have no WebGL variant, so long series fall back to a
+    min/max-downsampled filled line that keeps the peaks. Filled lines ignore barmode='stack',
+    so stacked callers pass a stackgroup: every series is then sampled at the same evenly
+    spaced points and plotly stacks the lines.
+    """
+    import plotly.graph_objects as go
+    if len(y) <= max_points:
+        return go.Bar(x=x, y=y, **kwargs)
+    color = kwargs.pop('marker_color', None)
+    if stackgroup is not None:
+        kept = np.unique(np.linspace(0, len(y) - 1, max_points).astype(np.int64))
+        return go.Scatter(x=np.asarray(x)[kept], y=np.asarray(y)[kept], mode='lines', stackgroup=stackgroup,
+                          line=dict(color=color), **kwargs)
+    return scatter_trace(x, y, max_points=max_points, method='minmax', mode='lines', fill='tozeroy',
+                         line=dict(color=color), **kwargs)
 
 def plot_income_forecast(history_df, forecast_min, forecast_max, current_month):
     """
     Plots historical income versus the forecasted safe range for the next month.
     """
+    import plotly.graph_objects as go
     fig = go.Figure()
     
     # Historical Data
-    fig.add_trace(go.Scatter(
-        x=history_df['Month'], 
-        y=history_df['Income'],
+    fig.add_trace(scatter_trace(
+        history_df['Month'], 
+        history_df['Income'],
         mode='lines+markers',
         name='Historical Income',
         line=dict(color='#636EFA')
@@ -41,6 +153,7 @@ def plot_risk_gauge(risk_score):
     """
     Plots a gauge chart for the risk score.
     """
+    import plotly.graph_objects as go
     fig = go.Figure(go.Indicator(
         mode = "gauge+number",
         value = risk_score,
@@ -64,3 +177,109 @@ def plot_risk_gauge(risk_score):
     
     fig.update_layout(height=300)
     return fig
+
+def plot_distress_comparison(months, fixed_distress, safeloan_distress):
+    """
+    Plots cumulative distress of the traditional loan against SafeLoan by month.
+    """
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    fig.add_trace(bar_trace(months, fixed_distress, name='Traditional Distress', marker_color='#EF553B'))
+    fig.add_trace(bar_trace(months, safeloan_distress, name='SafeLoan Distress', marker_color='#00CC96'))
+    fig.update_layout(title="Stress Accumulation Analysis", barmode='group', template='plotly_white', height=400)
+    return fig
+
+def plot_affordability(months, emis, safe_incomes, target_dti):
+    """
+    Plots the EMI burden as a share of safe income against the target DTI limit.
+    """
+    import plotly.graph_objects as go
+    # Calculate Ratios (Handle div by 0: default to 0 for chart safety)
+    emis = np.asarray(emis, dtype=np.float64)
+    safe_incomes = np.asarray(safe_incomes, dtype=np.float64)
+    ratios = np.divide(emis, safe_incomes, out=np.zeros_like(emis), where=safe_incomes > 0) * 100
+    
+    target_line = np.full(len(months), target_dti * 100)
+    
+    fig = go.Figure()
+    fig.add_trace(scatter_trace(months, ratios, mode='lines+markers', name='Actual EMI Burden (%)', line=dict(color='#636EFA', width=3)))
+    fig.add_trace(scatter_trace(months, target_line, mode='lines', name=f'Target DTI Limit ({int(target_dti*100)}%)', line=dict(color='gray', dash='dot')))
+    
+    fig.update_layout(
+        yaxis_title="Percentage of Safe Income",
+        xaxis_title="Month",
+        template='plotly_white',
+        height=350,
+        yaxis=dict(range=[0, 100]) # Fix range to 0-100% for clarity
+    )
+    return fig
+
+def risk_score_histogram(risk_scores, bins=RISK_BINS):
+    """
+    Counts one month of portfolio risk scores per bucket. Meant for engine.run(on_step=...),
+    so a long run keeps only len(bins) - 1 counts per month instead of every score.
+    """
+    counts, _ = np.histogram(np.asarray(risk_scores), bins=bins)
+    return counts
+
+def risk_density(risk_scores, bins=RISK_BINS):
+    """
+    Risk score distribution per month, computed server-side.
+    
+    Args:
+        risk_scores (np.array): Borrowers x months risk scores.
+        bins (np.array): Bucket edges; the last bucket includes its upper edge.
+        
+    Returns:
+        np.array: (len(bins) - 1) x months counts.
+    """
+    risk_scores = np.asarray(risk_scores)
+    n_bins = len(bins) - 1
+    buckets = np.clip(np.searchsorted(bins, risk_scores, side='right') - 1, 0, n_bins - 1)
+    months = np.broadcast_to(np.arange(risk_scores.shape[1]), risk_scores.shape)
+    counts = np.bincount((months * n_bins + buckets).ravel(), minlength=risk_scores.shape[1] * n_bins)
+    return counts.reshape(risk_scores.shape[1], n_bins).T
+
+def plot_risk_heatmap(density, months=None, bins=RISK_BINS):
+    """
+    Plots a portfolio risk density heatmap (score bucket x month) from risk_density counts,
+    so the browser receives one cell per bucket and month rather than one point per borrower.
+    """
+    import plotly.graph_objects as go
+    density = np.asarray(density)
+    months = np.arange(1, density.shape[1] + 1) if months is None else months
+    labels = [f"{int(low)}-{int(high)}" for low, high in zip(bins[:-1], bins[1:])]
+    
+    fig = go.Figure(go.Heatmap(
+        x=months,
+        y=labels,
+        z=density,
+        colorscale='YlOrRd',
+        colorbar=dict(title='Borrowers'),
+        hovertemplate='Month %{x}<br>Risk %{y}<br>%{z} borrowers<extra></extra>'
+    ))
+    fig.update_layout(
+        title="Portfolio Risk Density",
+        xaxis_title="Month",
+        yaxis_title="Risk Score",
+        template='plotly_white',
+        height=400
+    )
+    return fig
+
+def plot_zone_mix(months, zone_counts):
+    """
+    Plots the number of borrowers in each risk zone per month as stacked bars.
+    
+    Args:
+        months (np.array): Month numbers.
+        zone_counts (np.array): Months x len(ZONES) borrower counts.
+    """
+    import plotly.graph_objects as go
+    zone_counts = np.asarray(zone_counts)
+    fig = go.Figure()
+    for i, (zone, color) in enumerate(zip(ZONES, ZONE_COLORS)):
+        fig.add_trace(bar_trace(months, zone_counts[:, i], name=zone, marker_color=color, stackgroup='zones'))
+    fig.update_layout(title="Risk Zone Mix", barmode='stack', xaxis_title="Month", yaxis_title="Borrowers",
+                      template='plotly_white', height=400)
+    return fig